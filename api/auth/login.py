@@ -17,25 +17,27 @@ async def login(request: Request, payload: LoginRequest) -> LoginResponse:
             """,
             payload.username,
         )
-        if not user or not AuthUtils.verify_password(payload.password, user["hashed_password"]):
-            raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid credentials")
-        
-        claims = {
-            "sub": user["username"],
-            "user_id": user["user_id"],
-            "role": user["role"]
-        }
-        access_token = AuthUtils.create_access_token(claims)
-        refresh_token = AuthUtils.create_refresh_token(claims)
-        
-        return LoginResponse(
-            access_token=access_token,
-            refresh_token=refresh_token,
-            user=UserInfo(
-                user_id=user["user_id"],
-                username=user["username"],
-                email=user["email"],
-                full_name=user["full_name"],
-                role=user["role"]
-            )
-        )
\ No newline at end of file
+    
+    # connection is back in the pool before bcrypt runs, a login storm shouldnt starve the other routes of connections
+    if not user or not await AuthUtils.verify_password_async(payload.password, user["hashed_password"]):
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid credentials")
+    
+    claims = {
+        "sub": user["username"],
+        "user_id": user["user_id"],
+        "role": user["role"]
+    }
+    access_token = AuthUtils.create_access_token(claims)
+    refresh_token = AuthUtils.create_refresh_token(claims)
+    
+    return LoginResponse(
+        access_token=access_token,
+        refresh_token=refresh_token,
+        user=UserInfo(
+            user_id=user["user_id"],
+            username=user["username"],
+            email=user["email"],
+            full_name=user["full_name"],
+            role=user["role"]
+        )
+    )
\ No newline at end of file
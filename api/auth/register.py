@@ -12,7 +12,7 @@ async def register(request: Request, payload: RegisterRequest) -> UserOut:
     
     user_create = UserCreate(
         username=payload.username,
-        hashed_password=AuthUtils.hash_password(payload.password),
+        hashed_password=await AuthUtils.hash_password_async(payload.password),
         email=payload.email,
         full_name=payload.full_name,
         role=payload.role,
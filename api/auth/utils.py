@@ -4,11 +4,70 @@ import os
 import bcrypt
 import cryptography
 import datetime
+import hashlib
+import time
 from datetime import timedelta
-from typing import Optional, List
+from typing import NamedTuple, Optional, List
 import uuid
 from jose import JWTError, jwt
 from fastapi import HTTPException, Header, status
+from api.services.response_cache import get_cache
+from api.auth.password_pool import run_password_op
+
+
+class SigningConfig(NamedTuple):
+    secret_key: str
+    refresh_secret_key: str
+    algorithm: str
+
+
+_signing_config: Optional[SigningConfig] = None
+
+# verified access token payloads keyed by sha256 of the token, each kept until its own exp.
+# saves a full jwt.decode (signature check) on every request that reuses a token
+_verified_tokens = get_cache("verified_tokens", ttl=300, max_entries=4096)
+
+
+def load_signing_config() -> SigningConfig:
+    """
+    Read SECRET_KEY / REFRESH_SECRET_KEY / ALGORITHM from the environment once and keep them.
+    called from lifespan at startup, and lazily on first use if it wasnt (scripts and tests).
+    """
+    global _signing_config
+    # Enforce environment variables - no defaults for security
+    secret_key = os.environ.get("SECRET_KEY")
+    if not secret_key:
+        raise ValueError("SECRET_KEY environment variable must be set")
+    _signing_config = SigningConfig(
+        secret_key=secret_key,
+        refresh_secret_key=os.environ.get("REFRESH_SECRET_KEY") or secret_key,
+        algorithm=os.environ.get("ALGORITHM", "HS256"),
+    )
+    # anything verified against the old key shouldnt be trusted any more
+    _verified_tokens.clear()
+    return _signing_config
+
+
+def get_signing_config() -> SigningConfig:
+    return _signing_config or load_signing_config()
+
+
+def _verify_access_token(token: str) -> dict:
+    """
+    jwt.decode with the verified token cache in front. only tokens that decoded fine and have an
+    exp are cached, and only until that exp, so a hit accepts exactly what jwt.decode would have.
+    raises JWTError / ValueError the same way jwt.decode does on a miss.
+    """
+    key = hashlib.sha256(token.encode('utf-8')).hexdigest()
+    hit, payload = _verified_tokens.get(key)
+    if not hit:
+        config = get_signing_config()
+        payload = jwt.decode(token, config.secret_key, algorithms=[config.algorithm])
+        exp = payload.get("exp")
+        if isinstance(exp, (int, float)) and exp > time.time():
+            _verified_tokens.set(key, payload, ttl=exp - time.time())
+    # copy so a route changing its user dict cant change the cached one
+    return dict(payload)
 
 
 class AuthUtils:
@@ -20,6 +79,16 @@ class AuthUtils:
     @staticmethod
     def verify_password(password: str, hashed: str) -> bool:
         return bcrypt.checkpw(password.encode('utf-8'), hashed.encode('utf-8'))
+
+    # async versions for route handlers, bcrypt runs on the password thread pool instead of the event loop.
+    # raise a 503 HTTPException if that pool is already saturated
+    @staticmethod
+    async def hash_password_async(password: str) -> str:
+        return await run_password_op(AuthUtils.hash_password, password)
+
+    @staticmethod
+    async def verify_password_async(password: str, hashed: str) -> bool:
+        return await run_password_op(AuthUtils.verify_password, password, hashed)
     
     @staticmethod
     def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
@@ -40,12 +109,8 @@ class AuthUtils:
             expire = datetime.datetime.now(datetime.timezone.utc) + timedelta(hours=24)
         to_encode.update({"exp": expire})
         
-        # Enforce environment variables - no defaults for security
-        secret_key = os.environ.get("SECRET_KEY")
-        if not secret_key:
-            raise ValueError("SECRET_KEY environment variable must be set")
-        algorithm = os.environ.get("ALGORITHM", "HS256")
-        encoded_jwt = jwt.encode(to_encode, secret_key, algorithm=algorithm)
+        config = get_signing_config()
+        encoded_jwt = jwt.encode(to_encode, config.secret_key, algorithm=config.algorithm)
         return encoded_jwt
     
     @staticmethod
@@ -59,11 +124,7 @@ class AuthUtils:
             return {"error": "Authorization header missing"}
         try:
             token = authorization.split(" ")[1]
-            secret_key = os.environ.get("SECRET_KEY")
-            if not secret_key:
-                raise ValueError("SECRET_KEY environment variable must be set")
-            algorithm = os.environ.get("ALGORITHM", "HS256")
-            payload = jwt.decode(token, secret_key, algorithms=[algorithm])
+            payload = _verify_access_token(token)
             # ensure this is an access token
             if payload.get("type") != "access":
                 return {"error": "Invalid token type"}
@@ -88,11 +149,8 @@ class AuthUtils:
             expire = datetime.datetime.now(datetime.timezone.utc) + timedelta(days=30)
         to_encode.update({"exp": expire})
         # Use separate refresh secret or fall back to main secret (but no default)
-        secret_key = os.environ.get("REFRESH_SECRET_KEY") or os.environ.get("SECRET_KEY")
-        if not secret_key:
-            raise ValueError("SECRET_KEY environment variable must be set")
-        algorithm = os.environ.get("ALGORITHM", "HS256")
-        return jwt.encode(to_encode, secret_key, algorithm=algorithm)
+        config = get_signing_config()
+        return jwt.encode(to_encode, config.refresh_secret_key, algorithm=config.algorithm)
 
     @staticmethod
     def decode_refresh_token(token: str) -> dict:
@@ -101,11 +159,8 @@ class AuthUtils:
         Ensures the token 'type' is 'refresh'.
         """
         try:
-            secret_key = os.environ.get("REFRESH_SECRET_KEY") or os.environ.get("SECRET_KEY")
-            if not secret_key:
-                raise ValueError("SECRET_KEY environment variable must be set")
-            algorithm = os.environ.get("ALGORITHM", "HS256")
-            payload = jwt.decode(token, secret_key, algorithms=[algorithm])
+            config = get_signing_config()
+            payload = jwt.decode(token, config.refresh_secret_key, algorithms=[config.algorithm])
             if payload.get("type") != "refresh":
                 return {"error": "Invalid token type"}
             return payload
@@ -137,12 +192,8 @@ class AuthUtils:
                     detail="Invalid authentication scheme"
                 )
             
-            # Decode and verify token
-            secret_key = os.environ.get("SECRET_KEY")
-            if not secret_key:
-                raise ValueError("SECRET_KEY environment variable must be set")
-            algorithm = os.environ.get("ALGORITHM", "HS256")
-            payload = jwt.decode(token, secret_key, algorithms=[algorithm])
+            # Decode and verify token (cached by token hash until it expires)
+            payload = _verify_access_token(token)
             
             # Ensure this is an access token
             if payload.get("type") != "access":
@@ -1,3 +1,3 @@
-from .database import get_pg_dsn, lifespan
+from .database import get_pg_dsn, get_pool_settings, init_connection, lifespan
 
-__all__ = ["get_pg_dsn", "lifespan"]
+__all__ = ["get_pg_dsn", "get_pool_settings", "init_connection", "lifespan"]
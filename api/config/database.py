@@ -1,7 +1,16 @@
 import os
 from contextlib import asynccontextmanager
+from typing import Optional
 import asyncpg
 from fastapi import FastAPI
+from api.auth.utils import load_signing_config
+from api.auth.password_pool import shutdown_password_executor
+from api.services.event_bus import get_event_bus
+from api.services.queries import PreparedConnection
+
+
+# enum types the app reads and writes. codecs get registered per connection in init_connection
+ENUM_TYPES = ("game_states", "user_role", "join_request_status")
 
 
 def get_pg_dsn() -> dict:
@@ -16,9 +25,85 @@ def get_pg_dsn() -> dict:
     }
 
 
+def _optional_float(name: str) -> Optional[float]:
+    value = os.environ.get(name)
+    return float(value) if value else None
+
+
+def get_pool_settings() -> dict:
+    """
+    Pool sizing and tuning from PGPOOL_* environment variables (per worker process).
+    defaults are asyncpg's own so nothing changes unless a variable is set.
+    """
+    server_settings = {
+        "application_name": os.environ.get("PGAPPNAME", "volleyleague-api"),
+    }
+    # server side timeouts in ms, "0" (postgres default) means off
+    statement_timeout = os.environ.get("PGPOOL_STATEMENT_TIMEOUT_MS")
+    if statement_timeout:
+        server_settings["statement_timeout"] = statement_timeout
+    idle_in_transaction_timeout = os.environ.get("PGPOOL_IDLE_IN_TRANSACTION_TIMEOUT_MS")
+    if idle_in_transaction_timeout:
+        server_settings["idle_in_transaction_session_timeout"] = idle_in_transaction_timeout
+
+    return {
+        "min_size": int(os.environ.get("PGPOOL_MIN_SIZE", 10)),
+        "max_size": int(os.environ.get("PGPOOL_MAX_SIZE", 10)),
+        "max_inactive_connection_lifetime": float(os.environ.get("PGPOOL_MAX_INACTIVE_LIFETIME", 300.0)),
+        "statement_cache_size": int(os.environ.get("PGPOOL_STATEMENT_CACHE_SIZE", 100)),
+        "command_timeout": _optional_float("PGPOOL_COMMAND_TIMEOUT"),
+        "server_settings": server_settings,
+    }
+
+
+async def init_connection(connection: asyncpg.Connection) -> None:
+    """
+    Runs once on every new pool connection.
+
+    registers text codecs for the enum types up front, otherwise asyncpg introspects each
+    enum the first time a query on that connection touches it. per connection server
+    settings (application_name, timeouts) go in with the startup packet via server_settings.
+    then prepares the shared query registry (api/services/queries.py), skipped when the
+    statement cache is off since that means a pooler that cant keep prepared statements.
+    """
+    for enum_type in ENUM_TYPES:
+        await connection.set_type_codec(
+            enum_type,
+            encoder=str,
+            decoder=str,
+            schema="public",
+            format="text",
+        )
+    if isinstance(connection, PreparedConnection) and get_pool_settings()["statement_cache_size"]:
+        await connection.prepare_registry()
+
+
+async def connect_event_listener() -> asyncpg.Connection:
+    """
+    The event bus's LISTEN connection. its own connection rather than one taken from the pool for
+    good, so the pool keeps every slot for requests and the bus can reopen it on its own.
+    """
+    application_name = get_pool_settings()["server_settings"]["application_name"]
+    return await asyncpg.connect(**get_pg_dsn(), server_settings={"application_name": f"{application_name}-events"})
+
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Manage database connection pool lifecycle."""
-    app.state.pool = await asyncpg.create_pool(**get_pg_dsn())
+    try:
+        load_signing_config()
+    except ValueError as exc:
+        # same as before, protected routes just answer 401 until SECRET_KEY is set
+        print(f"Warning: {exc}")
+    app.state.pool = await asyncpg.create_pool(
+        **get_pg_dsn(),
+        **get_pool_settings(),
+        init=init_connection,
+        connection_class=PreparedConnection,
+    )
+    # cache invalidations and live match events reach the other workers through this
+    await get_event_bus().start(app.state.pool, connect_event_listener)
     yield
+    await get_event_bus().stop()
     await app.state.pool.close()
+    shutdown_password_executor()
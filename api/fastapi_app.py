@@ -7,12 +7,16 @@ from api.routes.teams import router as teams_router
 from api.routes.leagues import router as leagues_router
 from api.routes.seasons import router as seasons_router
 from api.routes.matches import router as matches_router
+from api.routes.exports import router as exports_router
+from api.routes.health import router as health_router
+from api.services.serialization import FastJSONResponse
 from api.auth.routes import router as auth_router
 from api.auth.register import router as register_router
 from api.auth.login import router as login_router
 
 
-app = FastAPI(title="VolleyLeague API", lifespan=lifespan)
+# orjson (when installed) instead of json.dumps for every response the routes dont build themselves
+app = FastAPI(title="VolleyLeague API", lifespan=lifespan, default_response_class=FastJSONResponse)
 
 # fixes dumb cors middleware issue when running in chrome do not remove
 setup_cors(app)
@@ -28,4 +32,8 @@ app.include_router(teams_router, prefix="/api", tags=["teams"])
 app.include_router(leagues_router, prefix="/api", tags=["leagues"])
 app.include_router(seasons_router, prefix="/api", tags=["seasons"])
 app.include_router(matches_router, prefix="/api", tags=["matches"])
+app.include_router(exports_router, prefix="/api", tags=["exports"])
+
+#monitoring
+app.include_router(health_router, prefix="/api", tags=["health"])
 
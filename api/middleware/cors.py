@@ -15,4 +15,6 @@ def setup_cors(app: FastAPI) -> None:
         allow_credentials=True,
         allow_methods=["*"],
         allow_headers=["*"], 
+        # GET /matches pages through these, browsers hide any response header not listed here
+        expose_headers=["X-Next-Cursor", "X-Prev-Cursor"],
     )
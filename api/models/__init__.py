@@ -8,6 +8,7 @@ from .schemas import (
     UserCreate,
     TeamOut,
     TeamCreate,
+    TeamUpdate,
     TeamMemberOut,
     TeamMemberUpdate,
     TeamJoinRequest,
@@ -31,12 +32,17 @@ from .schemas import (
     MatchUpdate,
     SetCreate,
     SetOut,
+    MatchResultRequest,
+    MatchResultResponse,
     GenerateFixturesRequest,
     GenerateFixturesResponse,
     StandingOut,
+    StandingsRoundOut,
+    StandingsTimelineOut,
     ProcessMatchRequest,
     ProcessMatchResponse,
     RecalculateStandingsResponse,
+    ProcessFinishedMatchesResponse,
     TeamStandingUpdate,
     MatchProcessingResult,
     InvitationCodeResponse,
@@ -56,6 +62,7 @@ __all__ = [
     "UserCreate",
     "TeamOut",
     "TeamCreate",
+    "TeamUpdate",
     "TeamMemberOut",
     "TeamMemberUpdate",
     "TeamJoinRequest",
@@ -73,12 +80,17 @@ __all__ = [
     "MatchUpdate",
     "SetCreate",
     "SetOut",
+    "MatchResultRequest",
+    "MatchResultResponse",
     "GenerateFixturesRequest",
     "GenerateFixturesResponse",
     "StandingOut",
+    "StandingsRoundOut",
+    "StandingsTimelineOut",
     "ProcessMatchRequest",
     "ProcessMatchResponse",
     "RecalculateStandingsResponse",
+    "ProcessFinishedMatchesResponse",
     "TeamStandingUpdate",
     "MatchProcessingResult",
     "InvitationCodeResponse",
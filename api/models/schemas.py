@@ -1,4 +1,4 @@
-from datetime import datetime
+from datetime import date, datetime
 from typing import Optional, Annotated, Literal, List
 from pydantic import BaseModel, EmailStr, Field, constr, field_validator
 
@@ -78,7 +78,7 @@ class TeamOut(BaseModel):
   name: str
   created_by_user_id: int
   logo_url: Optional[str]
-    home_ground: Optional[str]
+  home_ground: Optional[str]
   created_at: Optional[datetime]
 
 
@@ -86,7 +86,7 @@ class TeamCreate(BaseModel):
   name: Annotated[str, constr(strip_whitespace=True, min_length=1)]
   created_by_user_id: int
   logo_url: Optional[Annotated[str, constr(strip_whitespace=True, min_length=1)]] = None
-    home_ground: Optional[Annotated[str, constr(strip_whitespace=True, min_length=1)]] = None
+  home_ground: Optional[Annotated[str, constr(strip_whitespace=True, min_length=1)]] = None
 
 
 class TeamUpdate(BaseModel):
@@ -279,6 +279,17 @@ class SetOut(BaseModel):
     away_team_score: int
 
 
+class MatchResultRequest(BaseModel):
+    """Every set of a finished match, sets won and the winner are worked out from these."""
+    sets: List[SetCreate] = Field(..., min_length=3, max_length=5)
+
+
+class MatchResultResponse(BaseModel):
+    match: MatchOut
+    sets: List[SetOut]
+    message: str
+
+
 class GenerateFixturesRequest(BaseModel):
     start_date: str  # Format: "YYYY-MM-DD"
     matches_per_week_per_team: int = 1
@@ -314,6 +325,18 @@ class StandingOut(BaseModel):
     position: Optional[int] = None
 
 
+class StandingsRoundOut(BaseModel):
+    round: int
+    week_start: date
+    standings: List[StandingOut]
+
+
+class StandingsTimelineOut(BaseModel):
+    """Standings after every week that had a processed match, for position history charts."""
+    season_id: int
+    rounds: List[StandingsRoundOut]
+
+
 class ProcessMatchRequest(BaseModel):
     match_id: int
 
@@ -334,6 +357,13 @@ class RecalculateStandingsResponse(BaseModel):
     message: str
 
 
+class ProcessFinishedMatchesResponse(BaseModel):
+    season_id: int
+    matches_processed: int
+    teams_updated: int
+    message: str
+
+
 class TeamStandingUpdate(BaseModel):
     wins: int
     sets: int
@@ -349,6 +379,8 @@ class MatchProcessingResult(BaseModel):
     winner_team_id: int
     home_updates: TeamStandingUpdate
     away_updates: TeamStandingUpdate
+    # the match row as it is after processing, for the live score watchers
+    match: MatchOut
 
 
 class InvitationCodeResponse(BaseModel):
@@ -0,0 +1,163 @@
+from fastapi import APIRouter, HTTPException, Request, status, Depends, Query
+from fastapi.responses import StreamingResponse
+from api.auth import AuthUtils
+from api.services.export_stream import EXPORT_FORMATS, stream_rows
+
+router = APIRouter()
+
+
+# every match with its sets nested, one row per match. sets come from a single json_agg per
+# match (ndjson) plus a "25-20 18-25" summary for csv, instead of a GET /matches/{id}/sets each
+MATCH_EXPORT_QUERY = """
+    SELECT m.match_id, m.season_id, m.match_datetime, m.status,
+           m.home_team_id, ht.name AS home_team_name,
+           m.away_team_id, awt.name AS away_team_name,
+           m.venue, m.winner_team_id, m.home_sets_won, m.away_sets_won,
+           COALESCE(s.sets, '[]'::json) AS sets,
+           COALESCE(s.set_scores, '') AS set_scores
+    FROM "Matches" m
+    JOIN "Teams" ht ON ht.team_id = m.home_team_id
+    JOIN "Teams" awt ON awt.team_id = m.away_team_id
+    LEFT JOIN LATERAL (
+        SELECT json_agg(
+                   json_build_object(
+                       'set_number', set_number,
+                       'home_team_score', home_team_score,
+                       'away_team_score', away_team_score
+                   ) ORDER BY set_number
+               ) AS sets,
+               string_agg(home_team_score || '-' || away_team_score, ' ' ORDER BY set_number) AS set_scores
+        FROM "Sets"
+        WHERE match_id = m.match_id
+    ) s ON true
+    WHERE {where}
+    ORDER BY m.season_id, m.match_datetime NULLS LAST, m.match_id
+"""
+
+MATCH_COLUMNS = (
+    "match_id", "season_id", "match_datetime", "status",
+    "home_team_id", "home_team_name", "away_team_id", "away_team_name",
+    "venue", "winner_team_id", "home_sets_won", "away_sets_won",
+)
+
+STANDING_COLUMNS = (
+    "position", "team_id", "team_name", "matches_played", "wins", "losses",
+    "sets_won", "sets_lost", "set_diff", "points_won", "points_lost", "point_diff",
+    "league_points",
+)
+
+
+def _check_format(export_format: str) -> None:
+    if export_format not in EXPORT_FORMATS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"format must be one of {', '.join(EXPORT_FORMATS)}"
+        )
+
+
+def _export_response(request: Request, query: str, params: list, export_format: str, columns, filename: str, json_columns=()) -> StreamingResponse:
+    return StreamingResponse(
+        stream_rows(request.app.state.pool, query, params, export_format, columns, json_columns),
+        media_type=EXPORT_FORMATS[export_format],
+        headers={"Content-Disposition": f'attachment; filename="{filename}.{export_format}"'},
+    )
+
+
+def _match_export_columns(export_format: str):
+    # csv cant nest so it gets the flat set summary instead
+    if export_format == "csv":
+        return MATCH_COLUMNS + ("set_scores",)
+    return MATCH_COLUMNS + ("sets",)
+
+
+@router.get("/exports/seasons/{season_id}/matches")
+async def export_season_matches(
+    request: Request,
+    season_id: int,
+    export_format: str = Query("ndjson", alias="format", description="ndjson or csv"),
+    user: dict = Depends(AuthUtils.get_current_user)
+) -> StreamingResponse:
+    """Stream every match of a season with its sets as NDJSON or CSV"""
+    _check_format(export_format)
+    pool = request.app.state.pool
+    async with pool.acquire() as connection:
+        season = await connection.fetchrow(
+            'SELECT season_id FROM "Seasons" WHERE season_id = $1',
+            season_id
+        )
+    if not season:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Season not found")
+
+    return _export_response(
+        request,
+        MATCH_EXPORT_QUERY.format(where="m.season_id = $1"),
+        [season_id],
+        export_format,
+        _match_export_columns(export_format),
+        f"season-{season_id}-matches",
+        json_columns=("sets",),
+    )
+
+
+@router.get("/exports/leagues/{league_id}/matches")
+async def export_league_matches(
+    request: Request,
+    league_id: int,
+    export_format: str = Query("ndjson", alias="format", description="ndjson or csv"),
+    user: dict = Depends(AuthUtils.get_current_user)
+) -> StreamingResponse:
+    """Stream every match of every season in a league with its sets as NDJSON or CSV"""
+    _check_format(export_format)
+    pool = request.app.state.pool
+    async with pool.acquire() as connection:
+        league = await connection.fetchrow(
+            'SELECT league_id FROM "Leagues" WHERE league_id = $1',
+            league_id
+        )
+    if not league:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="League not found")
+
+    return _export_response(
+        request,
+        MATCH_EXPORT_QUERY.format(where='m.season_id IN (SELECT season_id FROM "Seasons" WHERE league_id = $1)'),
+        [league_id],
+        export_format,
+        _match_export_columns(export_format),
+        f"league-{league_id}-matches",
+        json_columns=("sets",),
+    )
+
+
+@router.get("/exports/seasons/{season_id}/standings")
+async def export_season_standings(
+    request: Request,
+    season_id: int,
+    export_format: str = Query("ndjson", alias="format", description="ndjson or csv"),
+    user: dict = Depends(AuthUtils.get_current_user)
+) -> StreamingResponse:
+    """Stream the current standings table of a season as NDJSON or CSV"""
+    _check_format(export_format)
+    pool = request.app.state.pool
+    async with pool.acquire() as connection:
+        season = await connection.fetchrow(
+            'SELECT season_id FROM "Seasons" WHERE season_id = $1',
+            season_id
+        )
+    if not season:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Season not found")
+
+    return _export_response(
+        request,
+        """
+        SELECT position, team_id, team_name, matches_played, wins, losses,
+               sets_won, sets_lost, set_diff, points_won, points_lost, point_diff,
+               league_points
+        FROM "StandingsProjection"
+        WHERE season_id = $1
+        ORDER BY position ASC
+        """,
+        [season_id],
+        export_format,
+        STANDING_COLUMNS,
+        f"season-{season_id}-standings",
+    )
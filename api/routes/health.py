@@ -0,0 +1,81 @@
+import asyncio
+import time
+import asyncpg
+from fastapi import APIRouter, Depends, Request, Response, status
+from api.auth import AuthUtils
+from api.services.response_cache import cache_stats
+from api.auth.password_pool import password_pool_stats
+from api.services.live_feed import live_feed_stats
+from api.services.event_bus import event_bus_stats
+
+router = APIRouter()
+
+# pool sizes, worker ids, queue depths and listener state are for operators, not the public
+# (AuthUtils.require_role(["ADMIN"]) on every route below)
+
+# how long /health/db waits for a free connection before calling the pool saturated
+DB_HEALTH_ACQUIRE_TIMEOUT = 2.0
+
+
+@router.get("/health/db")
+async def get_db_health(
+    request: Request,
+    response: Response,
+    user: dict = Depends(AuthUtils.require_role(["ADMIN"]))
+) -> dict:
+    """
+    Pool utilisation for this worker process plus a SELECT 1 round trip.
+    503 if no connection frees up within DB_HEALTH_ACQUIRE_TIMEOUT or the database is unreachable.
+    """
+    pool = request.app.state.pool
+    # snapshot before the ping borrows a connection of its own
+    size = pool.get_size()
+    idle = pool.get_idle_size()
+    max_size = pool.get_max_size()
+    health = {
+        "min_size": pool.get_min_size(),
+        "max_size": max_size,
+        "size": size,
+        "idle": idle,
+        "in_use": size - idle,
+        "utilisation": round((size - idle) / max_size, 4) if max_size else 0.0,
+    }
+
+    start = time.perf_counter()
+    try:
+        async with pool.acquire(timeout=DB_HEALTH_ACQUIRE_TIMEOUT) as connection:
+            await connection.fetchval("SELECT 1")
+        health["status"] = "ok"
+        health["ping_ms"] = round((time.perf_counter() - start) * 1000, 2)
+    except asyncio.TimeoutError:
+        response.status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+        health["status"] = "saturated"
+    except (OSError, asyncpg.PostgresError) as exc:
+        response.status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+        health["status"] = "unreachable"
+        health["error"] = str(exc)
+    return health
+
+
+@router.get("/health/cache")
+async def get_cache_stats(user: dict = Depends(AuthUtils.require_role(["ADMIN"]))) -> dict:
+    """Hit/miss counters for each response cache namespace, for this worker process."""
+    return {"caches": cache_stats()}
+
+
+@router.get("/health/password-pool")
+async def get_password_pool_stats(user: dict = Depends(AuthUtils.require_role(["ADMIN"]))) -> dict:
+    """How busy the bcrypt thread pool is (in_flight counts running + queued hashes)."""
+    return password_pool_stats()
+
+
+@router.get("/health/live-feed")
+async def get_live_feed_stats(user: dict = Depends(AuthUtils.require_role(["ADMIN"]))) -> dict:
+    """Live score watchers connected to this worker and events fanned out to them."""
+    return live_feed_stats()
+
+
+@router.get("/health/event-bus")
+async def get_event_bus_stats(user: dict = Depends(AuthUtils.require_role(["ADMIN"]))) -> dict:
+    """Whether this worker is listening for other workers' events, and how many went each way."""
+    return event_bus_stats()
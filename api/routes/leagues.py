@@ -1,5 +1,5 @@
 from typing import List
-from fastapi import APIRouter, HTTPException, Request, status, Depends
+from fastapi import APIRouter, HTTPException, Request, Response, status, Depends
 from asyncpg.exceptions import UniqueViolationError
 from api.models import (
     LeagueOut,
@@ -13,12 +13,18 @@ from api.models import (
 )
 from api.auth import AuthUtils
 from api.services.standings_engine import initialise_season_standings
-from api.services.team_invitation_code_engine import TeamInvitationCodeEngine
+from api.services.team_invitation_code_engine import team_invitation_code_index
+from api.services.response_cache import cached, invalidate
+from api.services.query_batch import gather_reads
+from api.services.checked_write import Check, execute_checked
+from api.services.queries import SEASON_COLUMNS, statement
+from api.services.serialization import json_response, model_rows
 
 router = APIRouter()
 
 
 @router.get("/leagues", response_model=List[LeagueOut])
+@cached("leagues", ttl=300)
 async def list_leagues(request: Request, user: dict = Depends(AuthUtils.get_current_user)) -> List[LeagueOut]:
     pool = request.app.state.pool
     async with pool.acquire() as connection:
@@ -70,34 +76,23 @@ async def create_league(request: Request, payload: LeagueCreate, user: dict = De
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
                 detail="Failed to create league.",
             ) from exc
+    invalidate("leagues")
     return LeagueOut(**row)
 
 
 @router.get("/leagues/{league_id}/seasons", response_model=List[SeasonOut])
+@cached("seasons", ttl=300)
 async def list_league_seasons(request: Request, league_id: int, user: dict = Depends(AuthUtils.get_current_user)) -> List[SeasonOut]:
     """Get all seasons for a specific league"""
     pool = request.app.state.pool
     async with pool.acquire() as connection:
         # First verify league exists
-        league = await connection.fetchrow(
-            'SELECT league_id FROM "Leagues" WHERE league_id = $1',
-            league_id
-        )
+        league = await statement(connection, "league_exists").fetchrow(league_id)
         if not league:
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="League not found")
         
         # Get all seasons for this league
-        rows = await connection.fetch(
-            """
-                 SELECT season_id, league_id, name, start_date, end_date,
-                     matches_per_week_per_team, weeks_between_matches,
-                     double_round_robin, allowed_weekdays, is_archived
-            FROM "Seasons"
-            WHERE league_id = $1
-            ORDER BY start_date DESC;
-            """,
-            league_id,
-        )
+        rows = await statement(connection, "list_league_seasons").fetch(league_id)
     return [SeasonOut(**row) for row in rows]
 
 
@@ -123,15 +118,13 @@ async def create_league_season(request: Request, league_id: int, payload: Season
         
         try:
             row = await connection.fetchrow(
-                """
+                f"""
                 INSERT INTO "Seasons"
                     (league_id, name, start_date, end_date,
                      matches_per_week_per_team, weeks_between_matches,
                      double_round_robin, allowed_weekdays)
                 VALUES ($1, $2, $3, $4, $5, $6, $7, $8)
-                RETURNING season_id, league_id, name, start_date, end_date,
-                          matches_per_week_per_team, weeks_between_matches,
-                          double_round_robin, allowed_weekdays, is_archived;
+                RETURNING {SEASON_COLUMNS};
                 """,
                 league_id,
                 payload.name,
@@ -147,10 +140,12 @@ async def create_league_season(request: Request, league_id: int, payload: Season
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
                 detail="Failed to create season.",
             ) from exc
+    invalidate("seasons")
     return SeasonOut(**row)
 
 
 @router.get("/seasons/{season_id}/teams", response_model=List[LeagueTeamOut])
+@cached("season_teams", ttl=300)
 async def list_season_teams(
     request: Request,
     season_id: int,
@@ -235,18 +230,19 @@ async def add_team_to_season(
                     season_id,
                     team_id,
                 )
-                
-                # Combine with team name
-                result = dict(row)
-                result['team_name'] = team['name']
-                
-                return LeagueTeamOut(**result)
-            
         except UniqueViolationError:
             raise HTTPException(
                 status_code=status.HTTP_409_CONFLICT,
                 detail="Team is already in this season"
             )
+    
+    invalidate("season_teams")
+    
+    # Combine with team name
+    result = dict(row)
+    result['team_name'] = team['name']
+    
+    return LeagueTeamOut(**result)
 
 
 @router.delete("/seasons/{season_id}/teams/{team_id}", status_code=status.HTTP_204_NO_CONTENT)
@@ -258,43 +254,35 @@ async def remove_team_from_season(
 ):
     """Remove a team from a season. Only admins can do this."""
     pool = request.app.state.pool
-    
+
     async with pool.acquire() as connection:
-        # Verify season exists and is not archived
-        season = await connection.fetchrow(
-            'SELECT season_id, is_archived FROM "Seasons" WHERE season_id = $1',
-            season_id
-        )
-        if not season:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="Season not found"
-            )
-        
-        if season['is_archived']:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Cannot remove teams from an archived season"
-            )
-        
-        # Check if team is in season
-        season_team = await connection.fetchrow(
-            'SELECT season_id, team_id FROM "SeasonTeams" WHERE season_id = $1 AND team_id = $2',
-            season_id,
-            team_id,
-        )
-        if not season_team:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="Team is not in this season"
+        # Verify season exists and is not archived, and the team is in it, then remove it
+        await execute_checked(
+            connection,
+            """
+            WITH season AS (
+                SELECT season_id, is_archived FROM "Seasons" WHERE season_id = $1
+            ),
+            deleted AS (
+                DELETE FROM "SeasonTeams" st
+                USING season
+                WHERE st.season_id = season.season_id AND st.team_id = $2 AND NOT season.is_archived
+                RETURNING st.team_id
             )
-        
-        # Remove team from season
-        await connection.execute(
-            'DELETE FROM "SeasonTeams" WHERE season_id = $1 AND team_id = $2',
+            SELECT
+                EXISTS (SELECT 1 FROM season) AS season_found,
+                NOT EXISTS (SELECT 1 FROM season WHERE is_archived) AS not_archived,
+                EXISTS (SELECT 1 FROM "SeasonTeams" WHERE season_id = $1 AND team_id = $2) AS team_in_season;
+            """,
             season_id,
             team_id,
+            checks=(
+                Check("season_found", status.HTTP_404_NOT_FOUND, "Season not found"),
+                Check("not_archived", status.HTTP_400_BAD_REQUEST, "Cannot remove teams from an archived season"),
+                Check("team_in_season", status.HTTP_404_NOT_FOUND, "Team is not in this season"),
+            ),
         )
+    invalidate("season_teams")
 
 
 # ==================== LEAGUE INVITATION ENDPOINTS ====================
@@ -317,46 +305,59 @@ async def create_league_invitation(
     pool = request.app.state.pool
     admin_user_id = user.get("user_id")
 
-    async with pool.acquire() as connection:
-        # Verify league exists and admin owns it (or user is ADMIN)
-        league = await connection.fetchrow(
-            'SELECT league_id, name, admin_user_id FROM "Leagues" WHERE league_id = $1;',
-            payload.league_id,
-        )
-        if not league:
-            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="League not found")
+    # league and season are independent, fetch both at once
+    league, season = await gather_reads(
+        pool,
+        ("fetchrow", 'SELECT league_id, name, admin_user_id FROM "Leagues" WHERE league_id = $1;', payload.league_id),
+        ("fetchrow", 'SELECT season_id, name, league_id, is_archived FROM "Seasons" WHERE season_id = $1;', payload.season_id),
+    )
 
-        if league["admin_user_id"] != admin_user_id:
-            raise HTTPException(
-                status_code=status.HTTP_403_FORBIDDEN,
-                detail="You don't have permission to invite teams to this league"
-            )
+    # Verify league exists and admin owns it (or user is ADMIN)
+    if not league:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="League not found")
 
-        # Verify season exists, belongs to league, and not archived
-        season = await connection.fetchrow(
-            'SELECT season_id, name, league_id, is_archived FROM "Seasons" WHERE season_id = $1;',
-            payload.season_id,
+    if league["admin_user_id"] != admin_user_id:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="You don't have permission to invite teams to this league"
         )
-        if not season or season["league_id"] != payload.league_id:
-            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Season not found for this league")
 
-        if season["is_archived"]:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Cannot invite teams to an archived season"
-            )
+    # Verify season exists, belongs to league, and not archived
+    if not season or season["league_id"] != payload.league_id:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Season not found for this league")
 
-        # Validate invitation code to find team
-        teams_rows = await connection.fetch(
-            'SELECT team_id, name FROM "Teams" ORDER BY team_id;'
+    if season["is_archived"]:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Cannot invite teams to an archived season"
         )
 
+    async with pool.acquire() as connection:
+        # Validate invitation code to find team
+        # today's code -> team map is precomputed so this is a dict lookup, not an hmac per team
+        candidate_ids = await team_invitation_code_index.lookup(connection, payload.invitation_code)
         team = None
-        for row in teams_rows:
-            test_team_id = row["team_id"]
-            if TeamInvitationCodeEngine.validate_code(test_team_id, payload.invitation_code):
-                team = row
-                break
+        if candidate_ids:
+            # the team plus both conflict checks in one statement
+            team = await connection.fetchrow(
+                '''
+                SELECT t.team_id, t.name,
+                       EXISTS (
+                           SELECT 1 FROM "SeasonTeams" st
+                           WHERE st.season_id = $2 AND st.team_id = t.team_id
+                       ) AS in_season,
+                       EXISTS (
+                           SELECT 1 FROM "LeagueJoinRequests" ljr
+                           WHERE ljr.season_id = $2 AND ljr.team_id = t.team_id AND ljr.status = 'PENDING'
+                       ) AS has_pending_invitation
+                FROM "Teams" t
+                WHERE t.team_id = ANY($1)
+                ORDER BY t.team_id
+                LIMIT 1;
+                ''',
+                candidate_ids,
+                payload.season_id,
+            )
 
         if team is None:
             raise HTTPException(
@@ -365,25 +366,14 @@ async def create_league_invitation(
             )
 
         # Check if team already in season
-        existing_team = await connection.fetchrow(
-            'SELECT season_id FROM "SeasonTeams" WHERE season_id = $1 AND team_id = $2;',
-            payload.season_id,
-            team["team_id"],
-        )
-        if existing_team:
+        if team["in_season"]:
             raise HTTPException(
                 status_code=status.HTTP_409_CONFLICT,
                 detail="Team is already in this season"
             )
 
         # Check for existing pending invitation
-        existing_invitation = await connection.fetchrow(
-            '''SELECT join_request_id FROM "LeagueJoinRequests"
-               WHERE season_id = $1 AND team_id = $2 AND status = 'PENDING';''',
-            payload.season_id,
-            team["team_id"],
-        )
-        if existing_invitation:
+        if team["has_pending_invitation"]:
             raise HTTPException(
                 status_code=status.HTTP_409_CONFLICT,
                 detail="Team already has a pending invitation for this season"
@@ -419,7 +409,7 @@ async def get_sent_league_invitations(
     league_id: int = None,
     season_id: int = None,
     user: dict = Depends(AuthUtils.require_role(["ADMIN"]))
-) -> dict:
+) -> Response:
     """Get invitations sent by the current league admin."""
     pool = request.app.state.pool
     admin_user_id = user.get("user_id")
@@ -453,15 +443,14 @@ async def get_sent_league_invitations(
 
         rows = await connection.fetch(query, *params)
 
-    invitations = [LeagueJoinRequestOut(**row) for row in rows]
-    return {"invitations": invitations}
+    return json_response({"invitations": model_rows(LeagueJoinRequestOut, rows)})
 
 
 @router.get("/leagues/invitations/received", response_model=dict)
 async def get_received_league_invitations(
     request: Request,
     user: dict = Depends(AuthUtils.require_role(["COACH", "ADMIN"]))
-) -> dict:
+) -> Response:
     """Get invitations received by teams owned by the current user."""
     pool = request.app.state.pool
     current_user_id = user.get("user_id")
@@ -484,8 +473,7 @@ async def get_received_league_invitations(
             current_user_id,
         )
 
-    invitations = [LeagueJoinRequestOut(**row) for row in rows]
-    return {"invitations": invitations}
+    return json_response({"invitations": model_rows(LeagueJoinRequestOut, rows)})
 
 
 @router.post("/leagues/invitations/{join_request_id}/respond", response_model=LeagueJoinRequestOut)
@@ -571,7 +559,9 @@ async def respond_to_league_invitation(
         result["team_name"] = invitation["team_name"]
         result["invited_by_username"] = invitation["invited_by_username"]
 
-        return LeagueJoinRequestOut(**result)
+    if payload.accept:
+        invalidate("season_teams", "standings")
+    return LeagueJoinRequestOut(**result)
 
 
 @router.delete("/leagues/invitations/{join_request_id}", status_code=status.HTTP_204_NO_CONTENT)
@@ -1,72 +1,236 @@
-from typing import List, Optional
-from fastapi import APIRouter, HTTPException, Request, status, Depends
-from api.models import MatchOut, MatchCreate, MatchUpdate, SetCreate, SetOut, ProcessMatchRequest, ProcessMatchResponse
+import asyncio
+import datetime
+from typing import List, Optional, Tuple
+from fastapi import APIRouter, HTTPException, Header, Request, Response, status, Depends, Query
+from fastapi.responses import StreamingResponse
+from api.models import MatchOut, MatchCreate, MatchUpdate, SetCreate, SetOut, MatchResultRequest, MatchResultResponse, ProcessMatchRequest, ProcessMatchResponse
 from api.auth import AuthUtils
-from api.services.standings_engine import process_match_result
+from api.services.standings_engine import process_match_result, retract_match_result
+from api.services.match_result import record_match_result
+from api.services.idempotency import claim_idempotency_key, store_idempotent_response
+from api.services.live_feed import HEARTBEAT_SECONDS, LiveFeedHub, get_live_feed, publish_match_event, format_sse
+from api.services.response_cache import cached, invalidate
+from api.services.pagination import NEXT, PREV, encode_cursor, decode_cursor, naive_utc
+from api.services.queries import MATCH_COLUMNS, match_page_statement, statement
+from api.services.serialization import dump_json, model_rows, rows_response
 
 router = APIRouter()
 
 
+# how many matches a page returns when the caller doesnt say, and the most it can ask for.
+# a whole 20 team double round robin (380 matches) still fits in one default page
+DEFAULT_MATCH_PAGE_SIZE = 500
+MAX_MATCH_PAGE_SIZE = 1000
+MATCH_STATUSES = ('UNSCHEDULED', 'SCHEDULED', 'FINISHED', 'PROCESSED')
+
+# Idempotency-Key scopes, a key is only matched against earlier requests to the same endpoint
+PROCESS_SCOPE = "POST /matches/process"
+RESULT_SCOPE = "POST /matches/{match_id}/result"
+
+
+@cached("matches", ttl=30)
+async def _fetch_match_page(
+    request: Request,
+    season_id: Optional[int],
+    team_id: Optional[int],
+    status_filter: Optional[str],
+    date_from: Optional[datetime.datetime],
+    date_to: Optional[datetime.datetime],
+    cursor: Optional[str],
+    limit: int
+) -> Tuple[bytes, Optional[str], Optional[str]]:
+    """
+    One keyset page of matches as a JSON body plus its (next, prev) cursors. cached as a whole
+    so the headers come back on a hit too and a hit doesnt serialise anything.
+    """
+    decoded = None
+    direction = NEXT
+    if cursor is not None:
+        try:
+            decoded = decode_cursor(cursor)
+        except ValueError:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+        direction = decoded[2]
+    
+    # date_from inclusive, date_to exclusive. one extra row tells us whether there is another
+    # page without a COUNT(*)
+    name, params = match_page_statement(
+        decoded,
+        (season_id, team_id, status_filter, date_from, date_to),
+        limit + 1,
+    )
+    
+    pool = request.app.state.pool
+    async with pool.acquire() as connection:
+        rows = await statement(connection, name).fetch(*params)
+    
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    if direction == PREV:
+        rows = rows[::-1]
+    
+    # rows come straight from "Matches" so they already have MatchOut's types, no model per row
+    matches = model_rows(MatchOut, rows)
+    body = dump_json(matches)
+    if not matches:
+        return body, None, None
+    
+    first, last = matches[0], matches[-1]
+    if direction == NEXT:
+        next_cursor = encode_cursor(last['match_datetime'], last['match_id'], NEXT) if has_more else None
+        prev_cursor = encode_cursor(first['match_datetime'], first['match_id'], PREV) if cursor is not None else None
+    else:
+        next_cursor = encode_cursor(last['match_datetime'], last['match_id'], NEXT)
+        prev_cursor = encode_cursor(first['match_datetime'], first['match_id'], PREV) if has_more else None
+    return body, next_cursor, prev_cursor
+
+
 @router.get("/matches", response_model=List[MatchOut])
 async def list_matches(
     request: Request,
     season_id: Optional[int] = None,
     team_id: Optional[int] = None,
+    status_filter: Optional[str] = Query(None, alias="status", description="UNSCHEDULED, SCHEDULED, FINISHED or PROCESSED"),
+    date_from: Optional[datetime.datetime] = Query(None, description="Only matches on or after this time"),
+    date_to: Optional[datetime.datetime] = Query(None, description="Only matches before this time"),
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor or X-Prev-Cursor from a previous page"),
+    limit: int = Query(DEFAULT_MATCH_PAGE_SIZE, ge=1, le=MAX_MATCH_PAGE_SIZE),
     user: dict = Depends(AuthUtils.get_current_user)
-) -> List[MatchOut]:
-    """List matches with optional filtering by season_id or team_id"""
-    pool = request.app.state.pool
-    async with pool.acquire() as connection:
-        query = """
-            SELECT match_id, season_id, home_team_id, away_team_id, match_datetime,
-                   venue, status, winner_team_id, home_sets_won, away_sets_won
-            FROM "Matches"
-            WHERE 1=1
-        """
-        params = []
-        
-        if season_id is not None:
-            params.append(season_id)
-            query += f" AND season_id = ${len(params)}"
-        
-        if team_id is not None:
-            params.append(team_id)
-            query += f" AND (home_team_id = ${len(params)} OR away_team_id = ${len(params)})"
-        
-        query += " ORDER BY match_datetime DESC;"
-        rows = await connection.fetch(query, *params)
-    return [MatchOut(**row) for row in rows]
+) -> Response:
+    """
+    List matches newest first with optional filtering by season_id, team_id, status and date range.
+    Paginated by keyset: the body is still a plain list, the cursors for the neighbouring pages
+    come back in the X-Next-Cursor / X-Prev-Cursor headers (missing when there is no such page).
+    """
+    if status_filter is not None and status_filter not in MATCH_STATUSES:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"status must be one of {', '.join(MATCH_STATUSES)}"
+        )
+    
+    body, next_cursor, prev_cursor = await _fetch_match_page(
+        request=request,
+        season_id=season_id,
+        team_id=team_id,
+        status_filter=status_filter,
+        date_from=naive_utc(date_from),
+        date_to=naive_utc(date_to),
+        cursor=cursor,
+        limit=limit,
+    )
+    response = Response(content=body, media_type="application/json")
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    if prev_cursor:
+        response.headers["X-Prev-Cursor"] = prev_cursor
+    return response
 
 
 @router.get("/matches/{match_id}", response_model=MatchOut)
 async def get_match(request: Request, match_id: int, user: dict = Depends(AuthUtils.get_current_user)) -> MatchOut:
     pool = request.app.state.pool
     async with pool.acquire() as connection:
-        row = await connection.fetchrow(
-            """
-            SELECT match_id, season_id, home_team_id, away_team_id, match_datetime,
-                   venue, status, winner_team_id, home_sets_won, away_sets_won
-            FROM "Matches"
-            WHERE match_id = $1;
-            """,
-            match_id,
-        )
+        row = await statement(connection, "get_match").fetchrow(match_id)
     if not row:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Match not found")
     return MatchOut(**row)
 
 
+async def _live_events(request: Request, queue: asyncio.Queue, snapshot: dict):
+    yield format_sse("snapshot", snapshot)
+    while True:
+        try:
+            event, data = await asyncio.wait_for(queue.get(), timeout=HEARTBEAT_SECONDS)
+        except asyncio.TimeoutError:
+            if await request.is_disconnected():
+                break
+            yield ": ping\n\n"
+            continue
+        yield format_sse(event, data)
+
+
+class _LiveEventsResponse(StreamingResponse):
+    """
+    The SSE stream, unsubscribing its watcher however the response ends. done here rather than
+    in the generator because a client that leaves before the first chunk means the generator
+    never starts, so its finally would never run and the queue would stay subscribed.
+    """
+
+    def __init__(self, request: Request, hub: LiveFeedHub, match_id: int, queue: asyncio.Queue, snapshot: dict):
+        super().__init__(
+            _live_events(request, queue, snapshot),
+            media_type="text/event-stream",
+            # no caching or proxy buffering, events have to go out as they happen
+            headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+        )
+        self._unsubscribe = lambda: hub.unsubscribe(match_id, queue)
+
+    async def __call__(self, scope, receive, send) -> None:
+        try:
+            await super().__call__(scope, receive, send)
+        finally:
+            self._unsubscribe()
+
+
+@router.get("/matches/{match_id}/live")
+async def watch_match(
+    request: Request,
+    match_id: int,
+    user: dict = Depends(AuthUtils.get_current_user)
+) -> StreamingResponse:
+    """
+    Server-Sent Events stream of a match's score. sends a "snapshot" event (match + sets) first,
+    then "match", "set" and "sets" events as update_match / create_set / result submissions
+    write them. replaces polling GET /matches/{id} and /matches/{id}/sets.
+    """
+    hub = get_live_feed()
+    # subscribe before reading so nothing published during the read is missed
+    queue = hub.subscribe(match_id)
+    snapshot = hub.snapshot(match_id)
+    
+    if snapshot is None:
+        version = hub.version(match_id)
+        pool = request.app.state.pool
+        try:
+            async with pool.acquire() as connection:
+                match = await statement(connection, "get_match").fetchrow(match_id)
+                if not match:
+                    raise HTTPException(
+                        status_code=status.HTTP_404_NOT_FOUND,
+                        detail="Match not found"
+                    )
+                sets = await connection.fetch(
+                    """
+                    SELECT set_id, match_id, set_number, home_team_score, away_team_score
+                    FROM "Sets"
+                    WHERE match_id = $1
+                    ORDER BY set_number
+                    """,
+                    match_id
+                )
+        except BaseException:
+            hub.unsubscribe(match_id, queue)
+            raise
+        snapshot = hub.seed_snapshot(
+            match_id,
+            MatchOut(**match).model_dump(mode="json"),
+            [SetOut(**row).model_dump(mode="json") for row in sets],
+            version
+        )
+    
+    return _LiveEventsResponse(request, hub, match_id, queue, snapshot)
+
+
 @router.post("/matches", response_model=MatchOut, status_code=status.HTTP_201_CREATED)
 async def create_match(request: Request, payload: MatchCreate, user: dict = Depends(AuthUtils.require_role(["ADMIN"]))) -> MatchOut:
     pool = request.app.state.pool
     async with pool.acquire() as connection:
         try:
             row = await connection.fetchrow(
-                """
+                f"""
                 INSERT INTO "Matches" (season_id, home_team_id, away_team_id, match_datetime, venue, status)
                 VALUES ($1, $2, $3, $4, $5, 'SCHEDULED'::game_states)
-                RETURNING match_id, season_id, home_team_id, away_team_id, match_datetime,
-                          venue, status, winner_team_id, home_sets_won, away_sets_won;
+                RETURNING {MATCH_COLUMNS};
                 """,
                 payload.season_id,
                 payload.home_team_id,
@@ -79,6 +243,7 @@ async def create_match(request: Request, payload: MatchCreate, user: dict = Depe
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
                 detail="Failed to create match.",
             ) from exc
+    invalidate("matches")
     return MatchOut(**row)
 
 
@@ -128,8 +293,7 @@ async def update_match(
             UPDATE "Matches"
             SET {', '.join(updates)}
             WHERE match_id = ${param_count}
-            RETURNING match_id, season_id, home_team_id, away_team_id, match_datetime,
-                      venue, status, winner_team_id, home_sets_won, away_sets_won
+            RETURNING {MATCH_COLUMNS}
         """
         
         row = await connection.fetchrow(query, *params)
@@ -139,7 +303,11 @@ async def update_match(
                 detail="Match not found"
             )
         
-        return MatchOut(**row)
+    # a status or date change moves the match in or out of the ?as_of= standings
+    invalidate("matches", "standings")
+    match = MatchOut(**row)
+    publish_match_event(match_id, "match", match.model_dump(mode="json"))
+    return match
 
 
 @router.post("/matches/{match_id}/sets", response_model=SetOut, status_code=status.HTTP_201_CREATED)
@@ -169,8 +337,10 @@ async def create_set(
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
                 detail=f"Failed to create set: {str(exc)}"
             ) from exc
-        
-        return SetOut(**row)
+    
+    set_out = SetOut(**row)
+    publish_match_event(match_id, "set", set_out.model_dump(mode="json"))
+    return set_out
 
 
 @router.get("/matches/{match_id}/sets", response_model=List[SetOut])
@@ -178,7 +348,7 @@ async def get_match_sets(
     request: Request,
     match_id: int,
     user: dict = Depends(AuthUtils.get_current_user)
-) -> List[SetOut]:
+) -> Response:
     """Get all sets for a match"""
     pool = request.app.state.pool
     async with pool.acquire() as connection:
@@ -191,32 +361,158 @@ async def get_match_sets(
             """,
             match_id
         )
-        return [SetOut(**row) for row in rows]
+    return rows_response(SetOut, rows)
+
+
+@router.post("/matches/{match_id}/result", response_model=MatchResultResponse)
+async def submit_match_result(
+    request: Request,
+    match_id: int,
+    payload: MatchResultRequest,
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key"),
+    user: dict = Depends(AuthUtils.require_role(["ADMIN", "REFEREE"]))
+) -> MatchResultResponse:
+    """
+    Record a finished match in one go: all its sets, the derived sets won / winner, and the
+    standings update. replaces PUT /matches/{id} + POST .../sets per set + POST /matches/process,
+    everything runs in one transaction on one connection so a rejected result writes nothing.
+    submitting for a match that already has a result corrects it (only that match is retracted
+    and re-applied).
+    send an Idempotency-Key header to make retries safe, a repeat gets the original response.
+    """
+    pool = request.app.state.pool
+    fingerprint = f"{match_id}:{payload.model_dump_json()}"
+    replayed = None
+    
+    async with pool.acquire() as connection:
+        async with connection.transaction():
+            try:
+                if idempotency_key:
+                    replayed = await claim_idempotency_key(
+                        connection, user.get("user_id"), RESULT_SCOPE, idempotency_key, fingerprint
+                    )
+                if replayed is None:
+                    match_row, set_rows, _ = await record_match_result(
+                        connection,
+                        match_id,
+                        [set_.model_dump() for set_ in payload.sets]
+                    )
+                    response = MatchResultResponse(
+                        match=MatchOut(**match_row),
+                        sets=[SetOut(**row) for row in set_rows],
+                        message=f"Match {match_id} result recorded. Standings updated."
+                    )
+                    if idempotency_key:
+                        await store_idempotent_response(
+                            connection, user.get("user_id"), RESULT_SCOPE, idempotency_key,
+                            response.model_dump(mode="json")
+                        )
+            except LookupError as e:
+                raise HTTPException(
+                    status_code=status.HTTP_404_NOT_FOUND,
+                    detail=str(e)
+                )
+            except ValueError as e:
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail=str(e)
+                )
+            except Exception as e:
+                raise HTTPException(
+                    status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                    detail=f"Failed to record match result: {str(e)}"
+                )
+    
+    if replayed is not None:
+        return MatchResultResponse(**replayed)
+    invalidate("matches", "standings")
+    publish_match_event(match_id, "sets", {"sets": [set_.model_dump(mode="json") for set_ in response.sets]})
+    publish_match_event(match_id, "match", response.match.model_dump(mode="json"))
+    return response
+
+
+@router.post("/matches/{match_id}/retract")
+async def retract_match(
+    request: Request,
+    match_id: int,
+    user: dict = Depends(AuthUtils.require_role(["ADMIN"]))
+) -> dict:
+    """
+    Take a processed match's result back out of the standings (just that match, from the
+    StandingDeltas log) and reopen it so a corrected result can be submitted.
+    """
+    pool = request.app.state.pool
+    
+    async with pool.acquire() as connection:
+        async with connection.transaction():
+            try:
+                result = await retract_match_result(connection, match_id)
+            except LookupError as e:
+                raise HTTPException(
+                    status_code=status.HTTP_404_NOT_FOUND,
+                    detail=str(e)
+                )
+            except ValueError as e:
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail=str(e)
+                )
+            except Exception as e:
+                raise HTTPException(
+                    status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                    detail=f"Failed to retract match: {str(e)}"
+                )
+    
+    invalidate("matches", "standings")
+    publish_match_event(match_id, "match", MatchOut(**result['match']).model_dump(mode="json"))
+    return {
+        "match_id": match_id,
+        "season_id": result['season_id'],
+        "teams_updated": result['teams_updated'],
+        "message": f"Match {match_id} result retracted. Submit the corrected result to POST /matches/{match_id}/result."
+    }
 
 
 @router.post("/matches/process", response_model=ProcessMatchResponse)
 async def process_match(
     request: Request,
     payload: ProcessMatchRequest,
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key"),
     user: dict = Depends(AuthUtils.require_role(["ADMIN", "REFEREE"]))
 ) -> ProcessMatchResponse:
-    """Process a finished match and update league standings"""
+    """
+    Process a finished match and update league standings.
+    concurrent calls for the same match are safe (only one of them counts it). with an
+    Idempotency-Key header a retry after a timeout gets the original response back instead of
+    a "already processed" error.
+    """
     pool = request.app.state.pool
+    fingerprint = payload.model_dump_json()
+    replayed = None
     
     async with pool.acquire() as connection:
         async with connection.transaction():
             try:
-                result = await process_match_result(connection, payload.match_id)
-                
-                return ProcessMatchResponse(
-                    match_id=result.match_id,
-                    season_id=result.season_id,
-                    home_team_id=result.home_team_id,
-                    away_team_id=result.away_team_id,
-                    winner_team_id=result.winner_team_id,
-                    status='PROCESSED',
-                    message=f"Match {payload.match_id} processed successfully. Standings updated."
-                )
+                if idempotency_key:
+                    replayed = await claim_idempotency_key(
+                        connection, user.get("user_id"), PROCESS_SCOPE, idempotency_key, fingerprint
+                    )
+                if replayed is None:
+                    result = await process_match_result(connection, payload.match_id)
+                    response = ProcessMatchResponse(
+                        match_id=result.match_id,
+                        season_id=result.season_id,
+                        home_team_id=result.home_team_id,
+                        away_team_id=result.away_team_id,
+                        winner_team_id=result.winner_team_id,
+                        status='PROCESSED',
+                        message=f"Match {payload.match_id} processed successfully. Standings updated."
+                    )
+                    if idempotency_key:
+                        await store_idempotent_response(
+                            connection, user.get("user_id"), PROCESS_SCOPE, idempotency_key,
+                            response.model_dump(mode="json")
+                        )
             except ValueError as e:
                 raise HTTPException(
                     status_code=status.HTTP_400_BAD_REQUEST,
@@ -227,4 +523,10 @@ async def process_match(
                     status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
                     detail=f"Failed to process match: {str(e)}"
                 )
-
+    
+    if replayed is not None:
+        return ProcessMatchResponse(**replayed)
+    # only after the commit, otherwise a read could cache the old standings again before it lands
+    invalidate("matches", "standings")
+    publish_match_event(payload.match_id, "match", result.match.model_dump(mode="json"))
+    return response
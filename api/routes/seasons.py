@@ -1,27 +1,28 @@
 from typing import List, Optional
 import datetime
-from fastapi import APIRouter, HTTPException, Request, status, Depends, Query
-from api.models import SeasonOut, SeasonCreate, SeasonUpdate, GenerateFixturesRequest, GenerateFixturesResponse, StandingOut, RecalculateStandingsResponse
+from fastapi import APIRouter, HTTPException, Request, Response, status, Depends, Query
+from api.models import SeasonOut, SeasonCreate, SeasonUpdate, GenerateFixturesRequest, GenerateFixturesResponse, StandingOut, StandingsTimelineOut, RecalculateStandingsResponse, ProcessFinishedMatchesResponse
 from api.auth import AuthUtils
-from api.services.fixture_generator import generate_round_robin, assign_match_dates
-from api.services.standings_engine import recalculate_season_standings, initialise_season_standings
+from api.services.fixture_generator import schedule_round_robin
+from api.services.standings_engine import recalculate_season_standings, initialise_season_standings, process_finished_matches
+from api.services.fixture_helpers import insert_fixtures
+from api.services.standings_helpers import fetch_standings_as_of, fetch_standings_timeline, group_timeline
+from api.services.response_cache import cached, invalidate
+from api.services.query_batch import gather_reads
+from api.services.checked_write import Check, execute_checked
+from api.services.queries import SEASON_COLUMNS, statement
+from api.services.serialization import rows_response
+from api.services.live_feed import publish_match_rows
 
 router = APIRouter()
 
 
 @router.get("/seasons", response_model=List[SeasonOut])
+@cached("seasons", ttl=300)
 async def list_seasons(request: Request, user: dict = Depends(AuthUtils.get_current_user)) -> List[SeasonOut]:
     pool = request.app.state.pool
     async with pool.acquire() as connection:
-        rows = await connection.fetch(
-            """
-                 SELECT season_id, league_id, name, start_date, end_date,
-                     matches_per_week_per_team, weeks_between_matches,
-                     double_round_robin, allowed_weekdays, is_archived
-            FROM "Seasons"
-            ORDER BY start_date DESC;
-            """
-        )
+        rows = await statement(connection, "list_seasons").fetch()
     return [SeasonOut(**row) for row in rows]
 
 
@@ -29,16 +30,7 @@ async def list_seasons(request: Request, user: dict = Depends(AuthUtils.get_curr
 async def get_season(request: Request, season_id: int, user: dict = Depends(AuthUtils.get_current_user)) -> SeasonOut:
     pool = request.app.state.pool
     async with pool.acquire() as connection:
-        row = await connection.fetchrow(
-            """
-                 SELECT season_id, league_id, name, start_date, end_date,
-                     matches_per_week_per_team, weeks_between_matches,
-                     double_round_robin, allowed_weekdays, is_archived
-            FROM "Seasons"
-            WHERE season_id = $1;
-            """,
-            season_id,
-        )
+        row = await statement(connection, "get_season").fetchrow(season_id)
     if not row:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Season not found")
     return SeasonOut(**row)
@@ -50,15 +42,13 @@ async def create_season(request: Request, payload: SeasonCreate, user: dict = De
     async with pool.acquire() as connection:
         try:
             row = await connection.fetchrow(
-                """
+                f"""
                 INSERT INTO "Seasons"
                     (league_id, name, start_date, end_date,
                      matches_per_week_per_team, weeks_between_matches,
                      double_round_robin, allowed_weekdays)
                 VALUES ($1, $2, $3, $4, $5, $6, $7, $8)
-                RETURNING season_id, league_id, name, start_date, end_date,
-                          matches_per_week_per_team, weeks_between_matches,
-                          double_round_robin, allowed_weekdays, is_archived;
+                RETURNING {SEASON_COLUMNS};
                 """,
                 payload.league_id,
                 payload.name,
@@ -74,6 +64,7 @@ async def create_season(request: Request, payload: SeasonCreate, user: dict = De
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
                 detail="Failed to create season.",
             ) from exc
+    invalidate("seasons")
     return SeasonOut(**row)
 
 
@@ -87,7 +78,7 @@ async def update_season(
     pool = request.app.state.pool
     async with pool.acquire() as connection:
         row = await connection.fetchrow(
-            """
+            f"""
             UPDATE "Seasons"
             SET name = $1,
                 start_date = $2,
@@ -97,9 +88,7 @@ async def update_season(
                 double_round_robin = $6,
                 allowed_weekdays = $7
             WHERE season_id = $8
-            RETURNING season_id, league_id, name, start_date, end_date,
-                      matches_per_week_per_team, weeks_between_matches,
-                      double_round_robin, allowed_weekdays, is_archived;
+            RETURNING {SEASON_COLUMNS};
             """,
             payload.name,
             payload.start_date,
@@ -114,6 +103,7 @@ async def update_season(
     if not row:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Season not found")
 
+    invalidate("seasons")
     return SeasonOut(**row)
 
 
@@ -125,30 +115,26 @@ async def delete_season(
 ) -> None:
     pool = request.app.state.pool
     async with pool.acquire() as connection:
-        season = await connection.fetchrow(
-            'SELECT season_id FROM "Seasons" WHERE season_id = $1',
-            season_id,
-        )
-        if not season:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="Season not found",
-            )
-
-        match_exists = await connection.fetchval(
-            'SELECT 1 FROM "Matches" WHERE season_id = $1 LIMIT 1',
-            season_id,
-        )
-        if match_exists:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Cannot delete a season that has matches.",
+        await execute_checked(
+            connection,
+            """
+            WITH deleted AS (
+                DELETE FROM "Seasons" s
+                WHERE s.season_id = $1
+                  AND NOT EXISTS (SELECT 1 FROM "Matches" m WHERE m.season_id = s.season_id)
+                RETURNING s.season_id
             )
-
-        await connection.execute(
-            'DELETE FROM "Seasons" WHERE season_id = $1',
+            SELECT
+                EXISTS (SELECT 1 FROM "Seasons" WHERE season_id = $1) AS season_found,
+                EXISTS (SELECT 1 FROM deleted) AS deleted;
+            """,
             season_id,
+            checks=(
+                Check("season_found", status.HTTP_404_NOT_FOUND, "Season not found"),
+                Check("deleted", status.HTTP_400_BAD_REQUEST, "Cannot delete a season that has matches."),
+            ),
         )
+    invalidate("seasons", "season_teams", "standings")
 
 
 @router.post("/seasons/{season_id}/generate-fixtures", response_model=GenerateFixturesResponse, status_code=status.HTTP_201_CREATED)
@@ -159,137 +145,126 @@ async def generate_fixtures(
     user: dict = Depends(AuthUtils.require_role(["ADMIN"]))
 ) -> GenerateFixturesResponse:
     pool = request.app.state.pool
-    
-    async with pool.acquire() as connection:
-        season = await connection.fetchrow(
-            'SELECT season_id, name FROM "Seasons" WHERE season_id = $1',
-            season_id
-        )
-        
-        if not season:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail=f"Season {season_id} not found"
-            )
-        
-        team_rows = await connection.fetch(
+
+    # the season and its teams (with home grounds) at once, on two pooled connections
+    season, team_rows = await gather_reads(
+        pool,
+        ("fetchrow", 'SELECT season_id, name FROM "Seasons" WHERE season_id = $1', season_id),
+        (
+            "fetch",
             """
-            SELECT team_id 
-            FROM "SeasonTeams" 
-            WHERE season_id = $1
-            ORDER BY team_id
+            SELECT st.team_id, t.home_ground
+            FROM "SeasonTeams" st
+            JOIN "Teams" t ON t.team_id = st.team_id
+            WHERE st.season_id = $1
+            ORDER BY st.team_id
             """,
-            season_id
+            season_id,
+        ),
+    )
+
+    if not season:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Season {season_id} not found"
         )
-        
-        team_ids = [row['team_id'] for row in team_rows]
-        
-        if len(team_ids) < 2:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail=f"Need at least 2 teams to generate fixtures. Found {len(team_ids)} teams."
-            )
-        
-        matches = generate_round_robin(team_ids, double=payload.double_round_robin)
-        
-        if not matches:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="No matches generated. Check team configuration."
-            )
-        
-        try:
-            start_date = datetime.datetime.strptime(payload.start_date, "%Y-%m-%d").date()
-        except ValueError:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Invalid start_date format. Use YYYY-MM-DD."
-            )
-        
-        allowed_weekdays = payload.allowed_weekdays
-        if allowed_weekdays is not None:
-            if len(allowed_weekdays) == 7 and all(day in (0, 1) for day in allowed_weekdays):
-                normalized_weekdays = allowed_weekdays
-            else:
-                try:
-                    days = {int(day) for day in allowed_weekdays}
-                except (TypeError, ValueError) as exc:
-                    raise HTTPException(
-                        status_code=status.HTTP_400_BAD_REQUEST,
-                        detail="allowed_weekdays must be a list of integers",
-                    ) from exc
-
-                if not days:
-                    raise HTTPException(
-                        status_code=status.HTTP_400_BAD_REQUEST,
-                        detail="allowed_weekdays must include at least one day",
-                    )
-
-                if any(day < 1 or day > 7 for day in days):
-                    raise HTTPException(
-                        status_code=status.HTTP_400_BAD_REQUEST,
-                        detail="allowed_weekdays values must be between 1 and 7",
-                    )
-
-                normalized_weekdays = [1 if (index + 1) in days else 0 for index in range(7)]
-        else:
-            normalized_weekdays = None
 
-        team_rows = await connection.fetch(
-            'SELECT team_id, home_ground FROM "Teams" WHERE team_id = ANY($1);',
-            team_ids,
+    team_ids = [row['team_id'] for row in team_rows]
+    team_home_grounds = {row["team_id"]: row["home_ground"] for row in team_rows}
+
+    if len(team_ids) < 2:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Need at least 2 teams to generate fixtures. Found {len(team_ids)} teams."
         )
-        team_home_grounds = {row["team_id"]: row["home_ground"] for row in team_rows}
 
-        scheduled_matches = assign_match_dates(
-            matches,
+    try:
+        start_date = datetime.datetime.strptime(payload.start_date, "%Y-%m-%d").date()
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid start_date format. Use YYYY-MM-DD."
+        )
+    
+    allowed_weekdays = payload.allowed_weekdays
+    if allowed_weekdays is not None:
+        if len(allowed_weekdays) == 7 and all(day in (0, 1) for day in allowed_weekdays):
+            normalized_weekdays = allowed_weekdays
+        else:
+            try:
+                days = {int(day) for day in allowed_weekdays}
+            except (TypeError, ValueError) as exc:
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail="allowed_weekdays must be a list of integers",
+                ) from exc
+
+            if not days:
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail="allowed_weekdays must include at least one day",
+                )
+
+            if any(day < 1 or day > 7 for day in days):
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail="allowed_weekdays values must be between 1 and 7",
+                )
+
+            normalized_weekdays = [1 if (index + 1) in days else 0 for index in range(7)]
+    else:
+        normalized_weekdays = None
+
+    # circle method rounds packed into periods, same output as generate_round_robin + assign_match_dates
+    try:
+        scheduled_matches = schedule_round_robin(
+            team_ids,
             start_date,
+            double=payload.double_round_robin,
             matches_per_week_per_team=payload.matches_per_week_per_team,
             weeks_between_matches=payload.weeks_between_matches,
             allowed_weekdays=normalized_weekdays
         )
-        
+    except ValueError as exc:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(exc)
+        ) from exc
+    
+    if not scheduled_matches:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="No matches generated. Check team configuration."
+        )
+    
+    async with pool.acquire() as connection:
         async with connection.transaction():
             existing_count = await connection.fetchval(
                 'SELECT COUNT(*) FROM "Matches" WHERE season_id = $1',
                 season_id
             )
-            
+        
             if existing_count > 0:
                 raise HTTPException(
                     status_code=status.HTTP_400_BAD_REQUEST,
                     detail=f"Fixtures already exist for season {season_id}. Delete existing fixtures first."
                 )
-            
-            for match in scheduled_matches:
-                match_datetime = datetime.datetime.combine(match['match_date'], datetime.time(19, 0))  # defaults to 1900, js a common time no particular reason
-                
-                venue = team_home_grounds.get(match['team_a_id'])
-                await connection.execute(
-                    """
-                    INSERT INTO "Matches" 
-                    (season_id, home_team_id, away_team_id, match_datetime, venue, status)
-                    VALUES ($1, $2, $3, $4, $5, $6::game_states)
-                    """,
-                    season_id,
-                    match['team_a_id'],
-                    match['team_b_id'],
-                    match_datetime,
-                    venue,
-                    match['status']
-                )
-        
-        dates = [m['match_date'] for m in scheduled_matches]
-        first_match = min(dates).isoformat()
-        last_match = max(dates).isoformat()
         
-        return GenerateFixturesResponse(
-            matches_created=len(scheduled_matches),
-            start_date=first_match,
-            end_date=last_match,
-            season_id=season_id,
-            message=f"Successfully generated {len(scheduled_matches)} fixtures for {season['name']}"
-        )
+            # one unnest insert for the whole fixture list instead of a round trip per match
+            await insert_fixtures(connection, season_id, scheduled_matches, team_home_grounds)
+    invalidate("matches")
+    
+    dates = [m['match_date'] for m in scheduled_matches]
+    first_match = min(dates).isoformat()
+    last_match = max(dates).isoformat()
+    
+    return GenerateFixturesResponse(
+        matches_created=len(scheduled_matches),
+        start_date=first_match,
+        end_date=last_match,
+        season_id=season_id,
+        message=f"Successfully generated {len(scheduled_matches)} fixtures for {season['name']}"
+    )
     
 
 @router.post("/seasons/{season_id}/reset", status_code=status.HTTP_200_OK)
@@ -322,11 +297,12 @@ async def reset_season(request: Request, season_id: int, user: dict = Depends(Au
                     ROW_NUMBER() OVER (
                         ORDER BY league_points DESC, 
                         (sets_won - sets_lost) DESC, 
-                        (points_won - points_lost) DESC
+                        (points_won - points_lost) DESC,
+                        team_id
                     ) as final_position
                 FROM "LeagueStandings"
                 WHERE season_id = $1
-                ORDER BY league_points DESC, set_diff DESC, point_diff DESC
+                ORDER BY final_position
                 """,
                 season_id
             )
@@ -367,12 +343,21 @@ async def reset_season(request: Request, season_id: int, user: dict = Depends(Au
                 'DELETE FROM "LeagueStandings" WHERE season_id = $1',
                 season_id
             )
+            await connection.execute(
+                'DELETE FROM "StandingsProjection" WHERE season_id = $1',
+                season_id
+            )
+            await connection.execute(
+                'DELETE FROM "StandingDeltas" WHERE season_id = $1',
+                season_id
+            )
             
             await connection.execute(
                 'UPDATE "Seasons" SET is_archived = TRUE WHERE season_id = $1',
                 season_id
             )
         
+    invalidate("seasons", "standings")
     return {
         "message": f"Season '{season['name']}' has been reset successfully.",
         "season_id": season_id,
@@ -382,27 +367,41 @@ async def reset_season(request: Request, season_id: int, user: dict = Depends(Au
 
 
 @router.get("/seasons/{season_id}/standings", response_model=List[StandingOut])
+@cached("standings", ttl=60)
 async def get_season_standings(
     request: Request,
     season_id: int,
     archived: bool = Query(False, description="Return archived standings instead of current"),
+    as_of: Optional[datetime.date] = Query(None, description="Standings after the matches played up to and including this date"),
     user: dict = Depends(AuthUtils.get_current_user)
-) -> List[StandingOut]:
-    """Get league standings for a season. Set archived=true to get historical data."""
+) -> Response:
+    """
+    Get league standings for a season. Set archived=true to get historical data,
+    or as_of=YYYY-MM-DD for the table as it stood at the end of that day.
+    """
+    if archived and as_of is not None:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="archived and as_of cannot be combined"
+        )
     pool = request.app.state.pool
     
     async with pool.acquire() as connection:
-        season = await connection.fetchrow(
-            'SELECT season_id, name FROM "Seasons" WHERE season_id = $1',
-            season_id
-        )
+        season = await statement(connection, "season_exists").fetchrow(season_id)
         if not season:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="Season not found"
             )
         
-        if archived:
+        if as_of is not None:
+            # from the finished matches and their sets, everything before midnight after as_of
+            rows = await fetch_standings_as_of(
+                connection,
+                season_id,
+                datetime.datetime.combine(as_of + datetime.timedelta(days=1), datetime.time.min)
+            )
+        elif archived:
             rows = await connection.fetch(
                 """
                 SELECT 
@@ -429,37 +428,36 @@ async def get_season_standings(
                 season_id
             )
         else:
-            rows = await connection.fetch(
-                """
-                SELECT 
-                    ls.standing_id,
-                    ls.season_id,
-                    ls.team_id,
-                    t.name as team_name,
-                    ls.matches_played,
-                    ls.wins,
-                    ls.losses,
-                    ls.sets_won,
-                    ls.sets_lost,
-                    (ls.sets_won - ls.sets_lost) as set_diff,
-                    ls.points_won,
-                    ls.points_lost,
-                    (ls.points_won - ls.points_lost) as point_diff,
-                    ls.league_points,
-                    ROW_NUMBER() OVER (
-                        ORDER BY ls.league_points DESC,
-                        (ls.sets_won - ls.sets_lost) DESC,
-                        (ls.points_won - ls.points_lost) DESC
-                    ) as position
-                FROM "LeagueStandings" ls
-                JOIN "Teams" t ON ls.team_id = t.team_id
-                WHERE ls.season_id = $1
-                ORDER BY position ASC;
-                """,
-                season_id
+            # ranked projection, a primary key range scan
+            rows = await statement(connection, "season_standings").fetch(season_id)
+        
+        return rows_response(StandingOut, rows)
+
+
+@router.get("/seasons/{season_id}/standings/timeline", response_model=StandingsTimelineOut)
+@cached("standings", ttl=60)
+async def get_season_standings_timeline(
+    request: Request,
+    season_id: int,
+    user: dict = Depends(AuthUtils.get_current_user)
+) -> StandingsTimelineOut:
+    """
+    The standings table after every round (week with finished matches) of the season in one
+    request, for charting position history instead of one ?as_of= call per week.
+    """
+    pool = request.app.state.pool
+    
+    async with pool.acquire() as connection:
+        season = await statement(connection, "season_exists").fetchrow(season_id)
+        if not season:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Season not found"
             )
         
-        return [StandingOut(**row) for row in rows]
+        rows = await fetch_standings_timeline(connection, season_id)
+    
+    return StandingsTimelineOut(season_id=season_id, rounds=group_timeline(rows))
 
 
 @router.post("/seasons/{season_id}/recalculate-standings", response_model=RecalculateStandingsResponse)
@@ -485,17 +483,67 @@ async def recalculate_standings(
         async with connection.transaction():
             try:
                 result = await recalculate_season_standings(connection, season_id)
-                
-                return RecalculateStandingsResponse(
-                    season_id=season_id,
-                    matches_processed=result['matches_processed'],
-                    message=f"Standings recalculated for {season['name']}. Processed {result['matches_processed']} matches."
-                )
             except Exception as e:
                 raise HTTPException(
                     status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
                     detail=f"Failed to recalculate standings: {str(e)}"
                 )
+    
+    invalidate("standings", "matches")
+    publish_match_rows(result['matches'])
+    return RecalculateStandingsResponse(
+        season_id=season_id,
+        matches_processed=result['matches_processed'],
+        message=f"Standings recalculated for {season['name']}. Processed {result['matches_processed']} matches."
+    )
+
+
+@router.post("/seasons/{season_id}/process-finished", response_model=ProcessFinishedMatchesResponse)
+async def process_finished(
+    request: Request,
+    season_id: int,
+    user: dict = Depends(AuthUtils.require_role(["ADMIN", "REFEREE"]))
+) -> ProcessFinishedMatchesResponse:
+    """
+    Process every FINISHED match in a season in one transaction (end of a matchday),
+    one standings write per team instead of two per match through /matches/process
+    """
+    pool = request.app.state.pool
+    
+    async with pool.acquire() as connection:
+        season = await connection.fetchrow(
+            'SELECT season_id, name FROM "Seasons" WHERE season_id = $1',
+            season_id
+        )
+        if not season:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Season not found"
+            )
+        
+        async with connection.transaction():
+            try:
+                result = await process_finished_matches(connection, season_id)
+            except ValueError as e:
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail=str(e)
+                )
+            except Exception as e:
+                raise HTTPException(
+                    status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                    detail=f"Failed to process matches: {str(e)}"
+                )
+    
+    if result['matches_processed']:
+        invalidate("standings", "matches")
+        publish_match_rows(result['matches'])
+    return ProcessFinishedMatchesResponse(
+        season_id=season_id,
+        matches_processed=result['matches_processed'],
+        teams_updated=result['teams_updated'],
+        message=f"Processed {result['matches_processed']} finished matches in {season['name']}. Updated standings for {result['teams_updated']} teams."
+    )
 
 
 @router.post("/seasons/{season_id}/initialize-standings")
@@ -521,14 +569,15 @@ async def initialize_standings(
         async with connection.transaction():
             try:
                 rows_inserted = await initialise_season_standings(connection, season_id)
-                
-                return {
-                    "season_id": season_id,
-                    "teams_initialized": rows_inserted,
-                    "message": f"Initialized standings for {rows_inserted} teams in {season['name']}"
-                }
             except Exception as e:
                 raise HTTPException(
                     status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
                     detail=f"Failed to initialize standings: {str(e)}"
-                )
\ No newline at end of file
+                )
+    
+    invalidate("standings")
+    return {
+        "season_id": season_id,
+        "teams_initialized": rows_inserted,
+        "message": f"Initialized standings for {rows_inserted} teams in {season['name']}"
+    }
\ No newline at end of file
@@ -1,6 +1,5 @@
 from typing import List
-from datetime import datetime
-from fastapi import APIRouter, HTTPException, Request, status, Depends
+from fastapi import APIRouter, HTTPException, Request, Response, status, Depends
 from asyncpg.exceptions import UniqueViolationError
 from api.models import (
     TeamOut,
@@ -15,24 +14,28 @@ from api.models import (
     TeamInvitationCodeResponse,
 )
 from api.auth import AuthUtils
-from api.services.invitation_code_engine import InvitationCodeEngine
-from api.services.team_invitation_code_engine import TeamInvitationCodeEngine
+from api.services.invitation_code_engine import invitation_code_index
+from api.services.team_invitation_code_engine import TeamInvitationCodeEngine, team_invitation_code_index
+from api.services.daily_code_index import utc_today
+from api.services.response_cache import invalidate
+from api.services.checked_write import Check, execute_checked
+from api.services.serialization import json_response, model_rows, query_list_response
 
 router = APIRouter()
 
 
 @router.get("/teams", response_model=List[TeamOut])
-async def list_teams(request: Request, user: dict = Depends(AuthUtils.get_current_user)) -> List[TeamOut]:
-    pool = request.app.state.pool
-    async with pool.acquire() as connection:
-        rows = await connection.fetch(
-            """
-            SELECT team_id, name, created_by_user_id, logo_url, home_ground, created_at
-            FROM "Teams"
-            ORDER BY name;
-            """
-        )
-    return [TeamOut(**row) for row in rows]
+async def list_teams(request: Request, user: dict = Depends(AuthUtils.get_current_user)) -> Response:
+    """Every team by name. not paginated, so a big list is read and streamed in chunks (query_list_response)"""
+    return await query_list_response(
+        request.app.state.pool,
+        TeamOut,
+        """
+        SELECT team_id, name, created_by_user_id, logo_url, home_ground, created_at
+        FROM "Teams"
+        ORDER BY name
+        """
+    )
 
 
 @router.get("/teams/{team_id}", response_model=TeamOut)
@@ -73,6 +76,7 @@ async def create_team(request: Request, payload: TeamCreate, user: dict = Depend
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
                 detail="Failed to create team.",
             ) from exc
+    team_invitation_code_index.add(row["team_id"])
     return TeamOut(**row)
 
 
@@ -115,6 +119,16 @@ async def update_team(
             team_id,
         )
 
+        if payload.name is not None:
+            await connection.execute(
+                'UPDATE "StandingsProjection" SET team_name = $1 WHERE team_id = $2;',
+                row["name"],
+                team_id,
+            )
+
+    if payload.name is not None:
+        invalidate("season_teams", "standings")
+
     return TeamOut(**row)
 
 
@@ -166,56 +180,50 @@ async def update_team_member(
     current_user_id = user.get("user_id")
 
     async with pool.acquire() as connection:
-        team = await connection.fetchrow(
-            'SELECT team_id, created_by_user_id FROM "Teams" WHERE team_id = $1;',
-            team_id,
-        )
-        if not team:
-            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Team not found")
-
-        if team["created_by_user_id"] != current_user_id and user.get("role") != "ADMIN":
-            raise HTTPException(
-                status_code=status.HTTP_403_FORBIDDEN,
-                detail="You don't have permission to update this team",
-            )
-
-        member = await connection.fetchrow(
-            'SELECT team_id, user_id FROM "TeamMembers" WHERE team_id = $1 AND user_id = $2;',
-            team_id,
-            user_id,
-        )
-        if not member:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="Team member not found",
-            )
-
-        await connection.execute(
-            'UPDATE "TeamMembers" SET player_number = $1 WHERE team_id = $2 AND user_id = $3;',
-            payload.player_number,
-            team_id,
-            user_id,
-        )
-
-        row = await connection.fetchrow(
+        # permission check, update and the joined member row in one statement
+        row = await execute_checked(
+            connection,
             """
-            SELECT 
-                tm.team_id,
-                tm.user_id,
-                tm.role_in_team,
-                tm.player_number,
-                tm.is_captain,
-                tm.is_libero,
+            WITH team AS (
+                SELECT team_id FROM "Teams"
+                WHERE team_id = $1 AND (created_by_user_id = $4 OR $5::boolean)
+            ),
+            updated AS (
+                UPDATE "TeamMembers" tm
+                SET player_number = $3
+                FROM team
+                WHERE tm.team_id = team.team_id AND tm.user_id = $2
+                RETURNING tm.team_id, tm.user_id, tm.role_in_team, tm.player_number,
+                          tm.is_captain, tm.is_libero
+            )
+            SELECT
+                EXISTS (SELECT 1 FROM "Teams" WHERE team_id = $1) AS team_found,
+                EXISTS (SELECT 1 FROM team) AS allowed,
+                updated.team_id IS NOT NULL AS member_found,
+                updated.team_id,
+                updated.user_id,
+                updated.role_in_team,
+                updated.player_number,
+                updated.is_captain,
+                updated.is_libero,
                 u.username,
                 u.email,
                 u.full_name,
                 u.role as user_role
-            FROM "TeamMembers" tm
-            JOIN "Users" u ON tm.user_id = u.user_id
-            WHERE tm.team_id = $1 AND tm.user_id = $2;
+            FROM (SELECT 1) AS one
+            LEFT JOIN updated ON true
+            LEFT JOIN "Users" u ON u.user_id = updated.user_id;
             """,
             team_id,
             user_id,
+            payload.player_number,
+            current_user_id,
+            user.get("role") == "ADMIN",
+            checks=(
+                Check("team_found", status.HTTP_404_NOT_FOUND, "Team not found"),
+                Check("allowed", status.HTTP_403_FORBIDDEN, "You don't have permission to update this team"),
+                Check("member_found", status.HTTP_404_NOT_FOUND, "Team member not found"),
+            ),
         )
 
     return TeamMemberOut(**row)
@@ -379,31 +387,23 @@ async def remove_team_member(
         )
     
     async with pool.acquire() as connection:
-        team = await connection.fetchrow(
-            'SELECT team_id FROM "Teams" WHERE team_id = $1;',
-            team_id,
-        )
-        if not team:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="Team not found"
-            )
-        
-        member = await connection.fetchrow(
-            'SELECT team_id, user_id FROM "TeamMembers" WHERE team_id = $1 AND user_id = $2;',
-            team_id,
-            user_id,
-        )
-        if not member:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="User is not a member of this team"
+        await execute_checked(
+            connection,
+            """
+            WITH deleted AS (
+                DELETE FROM "TeamMembers" WHERE team_id = $1 AND user_id = $2
+                RETURNING user_id
             )
-        
-        await connection.execute(
-            'DELETE FROM "TeamMembers" WHERE team_id = $1 AND user_id = $2;',
+            SELECT
+                EXISTS (SELECT 1 FROM "Teams" WHERE team_id = $1) AS team_found,
+                EXISTS (SELECT 1 FROM deleted) AS member_found;
+            """,
             team_id,
             user_id,
+            checks=(
+                Check("team_found", status.HTTP_404_NOT_FOUND, "Team not found"),
+                Check("member_found", status.HTTP_404_NOT_FOUND, "User is not a member of this team"),
+            ),
         )
 
 
@@ -437,7 +437,7 @@ async def get_team_invitation_code(
     return TeamInvitationCodeResponse(
         team_id=team_id,
         invitation_code=code,
-        code_generated_date=datetime.utcnow().strftime("%Y-%m-%d"),
+        code_generated_date=utc_today(),
     )
 @router.post("/teams/invitations", response_model=TeamJoinRequestOut, status_code=status.HTTP_201_CREATED)
 async def create_team_invitation(
@@ -478,20 +478,22 @@ async def create_team_invitation(
             )
         
         # Validate invitation code - find which player owns this code
-        users_rows = await connection.fetch(
-            'SELECT user_id, username FROM "Users" WHERE role = \'PLAYER\' ORDER BY user_id;'
-        )
-        
-        player_user_id = None
-        player_username = None
-        
-        for row in users_rows:
-            test_user_id = row["user_id"]
-            if InvitationCodeEngine.validate_code(test_user_id, payload.invitation_code):
-                player_user_id = test_user_id
-                player_username = row["username"]
-                break
-        
+        # the daily index hands back the owners straight away, the db then only has to
+        # confirm which of them (almost always just one) is a player
+        candidate_ids = await invitation_code_index.lookup(connection, payload.invitation_code)
+        player = None
+        if candidate_ids:
+            player = await connection.fetchrow(
+                '''SELECT user_id, username FROM "Users"
+                   WHERE user_id = ANY($1) AND role = 'PLAYER'
+                   ORDER BY user_id
+                   LIMIT 1;''',
+                candidate_ids,
+            )
+
+        player_user_id = player["user_id"] if player else None
+        player_username = player["username"] if player else None
+
         if player_user_id is None:
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
@@ -560,7 +562,7 @@ async def get_sent_invitations(
     request: Request,
     team_id: int = None,
     user: dict = Depends(AuthUtils.require_role(["COACH", "ADMIN"]))
-) -> dict:
+) -> Response:
     """
     Get all invitations sent by the current user (admin/coach checking sent invitations).
     Optionally filter by team_id.
@@ -628,15 +630,14 @@ async def get_sent_invitations(
                 user_id,
             )
         
-        invitations = [TeamJoinRequestOut(**dict(row)) for row in rows]
-        return {"invitations": [inv.model_dump() for inv in invitations]}
+        return json_response({"invitations": model_rows(TeamJoinRequestOut, rows)})
 
 
 @router.get("/teams/invitations/received", response_model=dict)
 async def get_received_invitations(
     request: Request,
     user: dict = Depends(AuthUtils.require_role(["PLAYER"]))
-) -> dict:
+) -> Response:
     """Get all invitations received by the current user (player checking their invitations)."""
     pool = request.app.state.pool
     user_id = user.get("user_id")
@@ -661,8 +662,7 @@ async def get_received_invitations(
             user_id,
         )
         
-        invitations = [TeamJoinRequestOut(**dict(row)) for row in rows]
-        return {"invitations": [inv.model_dump() for inv in invitations]}
+        return json_response({"invitations": model_rows(TeamJoinRequestOut, rows)})
 
 
 @router.post("/teams/invitations/{join_request_id}/respond", response_model=TeamJoinRequestOut)
@@ -772,35 +772,33 @@ async def delete_invitation(
     user_id = user.get("user_id")
     
     async with pool.acquire() as connection:
-        invitation = await connection.fetchrow(
-            'SELECT user_id, invited_by_user_id, status FROM "TeamJoinRequests" WHERE join_request_id = $1;',
-            join_request_id,
-        )
-        
-        if not invitation:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="Invitation not found"
-            )
-        
-        # Admin who sent it or player who received it can delete
-        is_sender = invitation['invited_by_user_id'] == user_id
-        is_recipient = invitation['user_id'] == user_id
-        
-        if not (is_sender or is_recipient):
-            raise HTTPException(
-                status_code=status.HTTP_403_FORBIDDEN,
-                detail="You can only delete invitations you sent or received"
-            )
-        
-        # Can only delete pending invitations
-        if invitation['status'] != 'PENDING':
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Can only delete pending invitations"
+        # Admin who sent it or player who received it can delete, and only while pending
+        await execute_checked(
+            connection,
+            """
+            WITH invitation AS (
+                SELECT join_request_id, user_id, invited_by_user_id, status
+                FROM "TeamJoinRequests"
+                WHERE join_request_id = $1
+            ),
+            deleted AS (
+                DELETE FROM "TeamJoinRequests" tjr
+                USING invitation i
+                WHERE tjr.join_request_id = i.join_request_id
+                  AND $2 IN (i.user_id, i.invited_by_user_id)
+                  AND i.status = 'PENDING'
+                RETURNING tjr.join_request_id
             )
-        
-        await connection.execute(
-            'DELETE FROM "TeamJoinRequests" WHERE join_request_id = $1;',
+            SELECT
+                EXISTS (SELECT 1 FROM invitation) AS found,
+                EXISTS (SELECT 1 FROM invitation WHERE $2 IN (user_id, invited_by_user_id)) AS allowed,
+                EXISTS (SELECT 1 FROM invitation WHERE status = 'PENDING') AS pending;
+            """,
             join_request_id,
+            user_id,
+            checks=(
+                Check("found", status.HTTP_404_NOT_FOUND, "Invitation not found"),
+                Check("allowed", status.HTTP_403_FORBIDDEN, "You can only delete invitations you sent or received"),
+                Check("pending", status.HTTP_400_BAD_REQUEST, "Can only delete pending invitations"),
+            ),
         )
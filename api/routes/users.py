@@ -1,11 +1,11 @@
 from typing import List
-from datetime import datetime
 import asyncpg
 from asyncpg import UniqueViolationError
 from fastapi import APIRouter, HTTPException, Request, status, Depends
 from api.models import UserCreate, UserOut, InvitationCodeResponse, InvitationCodeValidation, InvitationCodeRedeemResponse
 from api.auth import AuthUtils
-from api.services.invitation_code_engine import InvitationCodeEngine
+from api.services.invitation_code_engine import InvitationCodeEngine, invitation_code_index
+from api.services.daily_code_index import utc_today
 
 router = APIRouter()
 
@@ -62,6 +62,8 @@ async def create_user(request: Request, payload: UserCreate) -> UserOut:
           detail="Failed to create user.",
       ) from exc
 
+  invitation_code_index.add(row["user_id"])
+
   return UserOut(
       user_id=row["user_id"],
       username=row["username"],
@@ -80,7 +82,7 @@ async def get_invitation_code(request: Request, user: dict = Depends(AuthUtils.r
   The code changes daily and is deterministic based on the user ID and current date.
   """
   user_id = user.get("user_id")
-  today = datetime.utcnow().strftime("%Y-%m-%d")
+  today = utc_today()
   
   # Generate the invitation code
   invitation_code = InvitationCodeEngine.generate_code(user_id)
@@ -105,54 +107,26 @@ async def redeem_invitation_code(
   """
   invited_user_id = user.get("user_id")
   invitation_code = payload.invitation_code.strip()
-  today = datetime.utcnow().strftime("%Y-%m-%d")
+  today = utc_today()
   
   pool = request.app.state.pool
   
   try:
     async with pool.acquire() as connection:
-      # We need to find which user this invitation code belongs to
-      # Try checking all users to find whose code matches (brute force approach)
-      # Alternatively, use a more efficient lookup
-      
-      # Get the sender's user_id by trying to reverse-engineer
-      # Since we don't know the sender_user_id, we need to check if there's
-      # additional context or ask for it in the payload
-      
-      # For now, we'll implement a lookup by checking recent invitations
-      # or by having the frontend provide the sender_user_id
-      
-      # Better approach: Backend should validate and the frontend should know
-      # who invited them (from context), so let's check the code format
-      
       if not invitation_code or len(invitation_code) != 6 or not invitation_code.isdigit():
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Invalid invitation code format. Must be 6 digits.",
         )
       
-      # Since we need the sender's user_id to validate, we need another approach
-      # Option 1: Store the sender_user_id in the request payload
-      # Option 2: Have a table that maps codes to users (defeats the purpose)
-      # Option 3: Return a failure and ask for more context
-      
-      # For security, we should require the sender's user_id be provided or known
-      # Let's update this to search for valid users with this code on today's date
-      
-      users_rows = await connection.fetch(
-          """
-          SELECT user_id FROM "Users"
-          ORDER BY user_id;
-          """
-      )
-      
+      # today's code -> user map is built once a day, so this is a dict lookup
+      # not an hmac per user. lowest user_id wins if two users share a code
       sender_user_id = None
-      for row in users_rows:
-        test_user_id = row["user_id"]
-        if InvitationCodeEngine.validate_code_for_date(test_user_id, invitation_code, today):
-          sender_user_id = test_user_id
+      for candidate_id in await invitation_code_index.lookup(connection, invitation_code):
+        if InvitationCodeEngine.validate_code_for_date(candidate_id, invitation_code, today):
+          sender_user_id = candidate_id
           break
-      
+
       if sender_user_id is None:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -1,3 +1,3 @@
-from .fixture_generator import generate_round_robin, assign_match_dates
+from .fixture_generator import generate_round_robin, assign_match_dates, generate_round_robin_rounds, schedule_round_robin
 
-__all__ = ["generate_round_robin", "assign_match_dates"]
+__all__ = ["generate_round_robin", "assign_match_dates", "generate_round_robin_rounds", "schedule_round_robin"]
@@ -0,0 +1,39 @@
+from typing import NamedTuple, Sequence
+import asyncpg
+from fastapi import HTTPException
+
+
+class Check(NamedTuple):
+    """A boolean column of a checked statement and the error to raise when it comes back false."""
+    column: str
+    status_code: int
+    detail: str
+
+
+async def execute_checked(
+    connection: asyncpg.Connection,
+    query: str,
+    *params,
+    checks: Sequence[Check]
+) -> asyncpg.Record:
+    """
+    Run a write together with the checks that guard it, in one round trip.
+
+    query is a single statement (usually a DELETE/UPDATE ... RETURNING inside a CTE) that always
+    returns exactly one row, with a boolean column per check, e.g.
+
+        WITH deleted AS (DELETE FROM ... WHERE <every condition> RETURNING ...)
+        SELECT EXISTS (SELECT 1 FROM "Teams" WHERE team_id = $1) AS team_found,
+               EXISTS (SELECT 1 FROM deleted) AS member_found
+
+    the write itself has to repeat every condition so nothing changes when a check fails. the
+    outer SELECT sees the table as it was before the write, so existence checks still work on
+    a row the same statement deleted. checks are tried in order and the first false one is
+    raised as an HTTPException, so the routes answer with the same 404/403/400 as before.
+    returns the row for any other columns the statement returned.
+    """
+    row = await connection.fetchrow(query, *params)
+    for check in checks:
+        if not row[check.column]:
+            raise HTTPException(status_code=check.status_code, detail=check.detail)
+    return row
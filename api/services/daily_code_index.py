@@ -0,0 +1,112 @@
+import asyncio
+import time
+from datetime import datetime, timezone
+from typing import Callable, Dict, Iterable, List, Optional
+
+
+# a miss runs the catch up query at most this often. wrong or guessed codes are misses too,
+# so without it every bad code would be a DB round trip queued behind the lock
+NEW_IDS_RECHECK_SECONDS = 5.0
+
+
+def utc_today() -> str:
+    """Current UTC date in the YYYY-MM-DD format the code engines sign."""
+    return datetime.now(timezone.utc).strftime("%Y-%m-%d")
+
+
+class DailyCodeIndex:
+    """
+    Reverse lookup from a daily 6-digit code to the ids that own it.
+
+    The codes only change at the UTC day rollover so the whole map is built
+    once per day (one HMAC per id) and every lookup after that is a dict hit
+    instead of recomputing the HMAC for every row in the table.
+    Two ids can land on the same code (1 in a million per pair), so each code
+    keeps a sorted list of owners rather than a single id.
+
+    add() only patches this worker's map, ids created by another worker, a script or the seed
+    after the map was built are picked up on a miss: new_ids_query ($1 = highest id in the map)
+    fetches just the ids past the ones already indexed, at most once every recheck_seconds
+    (counted from the last build or catch up), other misses in between are answered from the map.
+    """
+
+    def __init__(
+        self,
+        code_for_date: Callable[[int, str], str],
+        ids_query: str,
+        new_ids_query: str,
+        recheck_seconds: float = NEW_IDS_RECHECK_SECONDS,
+    ):
+        self._code_for_date = code_for_date
+        self._ids_query = ids_query
+        self._new_ids_query = new_ids_query
+        self._recheck_seconds = recheck_seconds
+        self._date: Optional[str] = None
+        self._owners: Dict[str, List[int]] = {}
+        self._max_id = 0
+        self._checked_at = float("-inf")
+        self._lock = asyncio.Lock()
+
+    @property
+    def date(self) -> Optional[str]:
+        return self._date
+
+    def build(self, ids: Iterable[int], date_str: str) -> None:
+        """Rebuild the map for date_str from scratch."""
+        owners: Dict[str, List[int]] = {}
+        max_id = 0
+        for owner_id in ids:
+            owners.setdefault(self._code_for_date(owner_id, date_str), []).append(owner_id)
+            max_id = max(max_id, owner_id)
+        for bucket in owners.values():
+            bucket.sort()
+        self._owners = owners
+        self._max_id = max_id
+        self._date = date_str
+        self._checked_at = time.monotonic()
+
+    def add(self, owner_id: int) -> None:
+        """
+        Patch a newly created id into today's map.
+        if the map hasnt been built yet theres nothing to patch, the next lookup builds it anyway
+        """
+        if self._date is None:
+            return
+        bucket = self._owners.setdefault(self._code_for_date(owner_id, self._date), [])
+        if owner_id not in bucket:
+            bucket.append(owner_id)
+            bucket.sort()
+        self._max_id = max(self._max_id, owner_id)
+
+    def owners(self, code: str) -> List[int]:
+        """Ids whose code matches in the currently built map (lowest id first)."""
+        return list(self._owners.get(code, ()))
+
+    async def lookup(self, connection, code: str) -> List[int]:
+        """
+        Return the ids owning code today, rebuilding the map first if the UTC day has rolled over.
+        a code nobody in the map owns is rechecked against the ids created since it was built,
+        unless that was done less than recheck_seconds ago.
+        """
+        today = utc_today()
+        if self._date != today:
+            async with self._lock:
+                # another request may have rebuilt it while we waited for the lock
+                if self._date != today:
+                    rows = await connection.fetch(self._ids_query)
+                    self.build((row[0] for row in rows), today)
+        owners = self.owners(code)
+        if not owners and self._recheck_due():
+            async with self._lock:
+                # misses that queued on the lock while another one caught up dont query again
+                if self._recheck_due():
+                    # a primary key range scan, usually empty
+                    rows = await connection.fetch(self._new_ids_query, self._max_id)
+                    for row in rows:
+                        self.add(row[0])
+                    self._checked_at = time.monotonic()
+            owners = self.owners(code)
+        return owners
+
+    def _recheck_due(self) -> bool:
+        return time.monotonic() - self._checked_at >= self._recheck_seconds
@@ -0,0 +1,222 @@
+import asyncio
+import json
+import uuid
+from typing import Awaitable, Callable, Dict, List, Optional, Set
+import asyncpg
+
+
+# one postgres channel for everything, the message type says what it is
+EVENT_CHANNEL = "volleyleague_events"
+# NOTIFY payloads are capped at 8000 bytes by postgres, bigger events are dropped with a warning
+# and the other workers fall back on their cache ttl / the next update
+MAX_PAYLOAD_BYTES = 7900
+# how often the listener connection is pinged, a half open connection never reports itself lost
+LISTENER_CHECK_SECONDS = 30.0
+LISTENER_CHECK_TIMEOUT = 5.0
+# waits between attempts while the listener cant reconnect, the last one repeats
+RECONNECT_DELAYS = (0.5, 1.0, 2.0, 5.0, 10.0)
+# run locally (never sent) after the listener comes back, events sent while it was down were
+# missed so handlers should drop whatever those events would have corrected
+RESYNC_EVENT = "resync"
+
+EventHandler = Callable[[dict], None]
+
+
+def encode_event(origin: str, event_type: str, data: dict) -> str:
+    return json.dumps({"origin": origin, "type": event_type, "data": data}, separators=(',', ':'), default=str)
+
+
+def decode_event(payload: str) -> Optional[dict]:
+    """The message from a NOTIFY payload, None if it isnt one of ours."""
+    try:
+        message = json.loads(payload)
+    except ValueError:
+        return None
+    if not isinstance(message, dict) or not {"origin", "type", "data"} <= message.keys():
+        return None
+    return message
+
+
+class EventBus:
+    """
+    Cross-worker events over postgres LISTEN/NOTIFY.
+
+    every worker listens on EVENT_CHANNEL on its own connection (not one of the pool's), opened
+    with the connect function given to start(). broadcast() sends an event to the other workers
+    from the pool, the worker that sent it has already acted on it itself so its own messages
+    are skipped when they come back. handlers are plain functions run on the event loop, they
+    should only touch in-memory state.
+
+    if the listener connection drops (postgres restart, failover, idle timeout) or stops answering
+    the periodic ping it is reopened, backing off while that fails, and RESYNC_EVENT handlers run
+    once it is back.
+    """
+
+    def __init__(self):
+        self.worker_id = uuid.uuid4().hex
+        self._handlers: Dict[str, List[EventHandler]] = {}
+        self._pool: Optional[asyncpg.Pool] = None
+        self._connect: Optional[Callable[[], Awaitable[asyncpg.Connection]]] = None
+        self._listener: Optional[asyncpg.Connection] = None
+        self._lost = asyncio.Event()
+        self._supervisor: Optional[asyncio.Task] = None
+        # pending NOTIFY sends, kept so they arent garbage collected half way
+        self._sends: Set[asyncio.Task] = set()
+        self.sent = 0
+        self.received = 0
+        self.failed = 0
+        self.reconnects = 0
+
+    def subscribe(self, event_type: str, handler: EventHandler) -> None:
+        self._handlers.setdefault(event_type, []).append(handler)
+
+    @property
+    def running(self) -> bool:
+        return self._pool is not None
+
+    @property
+    def listening(self) -> bool:
+        return self._listener is not None and not self._listener.is_closed()
+
+    async def start(self, pool: asyncpg.Pool, connect: Callable[[], Awaitable[asyncpg.Connection]]) -> None:
+        """
+        pool sends the NOTIFYs, connect() opens the listener connection (asyncpg.connect with the
+        app's settings). the first connect has to work, after that the bus keeps reconnecting.
+        """
+        self._pool = pool
+        self._connect = connect
+        self._lost = asyncio.Event()
+        await self._listen()
+        self._supervisor = asyncio.get_running_loop().create_task(self._supervise())
+
+    async def stop(self) -> None:
+        if self._supervisor is not None:
+            self._supervisor.cancel()
+            await asyncio.gather(self._supervisor, return_exceptions=True)
+            self._supervisor = None
+        if self._sends:
+            await asyncio.gather(*self._sends, return_exceptions=True)
+        await self._close_listener()
+        self._pool = None
+
+    async def _listen(self) -> None:
+        listener = await self._connect()
+        try:
+            listener.add_termination_listener(self._on_terminated)
+            await listener.add_listener(EVENT_CHANNEL, self._on_notification)
+        except BaseException:
+            listener.terminate()
+            raise
+        self._lost.clear()
+        self._listener = listener
+
+    async def _close_listener(self) -> None:
+        listener, self._listener = self._listener, None
+        if listener is None or listener.is_closed():
+            return
+        listener.remove_termination_listener(self._on_terminated)
+        try:
+            await listener.remove_listener(EVENT_CHANNEL, self._on_notification)
+            await listener.close(timeout=LISTENER_CHECK_TIMEOUT)
+        except (OSError, asyncio.TimeoutError, asyncpg.PostgresError, asyncpg.InterfaceError):
+            listener.terminate()
+
+    def _on_terminated(self, connection) -> None:
+        if connection is self._listener:
+            self._lost.set()
+
+    async def _supervise(self) -> None:
+        """Ping the listener every LISTENER_CHECK_SECONDS and reopen it when it is gone."""
+        while True:
+            try:
+                await asyncio.wait_for(self._lost.wait(), timeout=LISTENER_CHECK_SECONDS)
+            except asyncio.TimeoutError:
+                try:
+                    await self._listener.fetchval("SELECT 1", timeout=LISTENER_CHECK_TIMEOUT)
+                    continue
+                except (OSError, asyncio.TimeoutError, asyncpg.PostgresError, asyncpg.InterfaceError):
+                    pass
+
+            print("Warning: event bus listener connection lost, reconnecting")
+            await self._close_listener()
+            attempt = 0
+            while True:
+                try:
+                    await self._listen()
+                    break
+                except (OSError, asyncio.TimeoutError, asyncpg.PostgresError, asyncpg.InterfaceError) as exc:
+                    delay = RECONNECT_DELAYS[min(attempt, len(RECONNECT_DELAYS) - 1)]
+                    print(f"Warning: event bus could not reconnect ({exc}), retrying in {delay}s")
+                    attempt += 1
+                    await asyncio.sleep(delay)
+            self.reconnects += 1
+            self._run_handlers(RESYNC_EVENT, {})
+
+    def broadcast(self, event_type: str, data: dict) -> None:
+        """
+        Send an event to every other worker. doesnt wait, the NOTIFY goes out on a pooled
+        connection in the background. call it after the write has committed, a no-op when the
+        bus isnt running (tests, scripts).
+        """
+        if not self.running:
+            return
+        payload = encode_event(self.worker_id, event_type, data)
+        if len(payload.encode()) > MAX_PAYLOAD_BYTES:
+            self.failed += 1
+            print(f"Warning: {event_type} event too large to broadcast ({len(payload)} bytes)")
+            return
+        task = asyncio.get_running_loop().create_task(self._notify(payload))
+        self._sends.add(task)
+        task.add_done_callback(self._sends.discard)
+
+    async def _notify(self, payload: str) -> None:
+        try:
+            async with self._pool.acquire() as connection:
+                await connection.execute("SELECT pg_notify($1, $2)", EVENT_CHANNEL, payload)
+            self.sent += 1
+        except (OSError, asyncpg.PostgresError, asyncpg.InterfaceError) as exc:
+            self.failed += 1
+            print(f"Warning: could not broadcast event: {exc}")
+
+    def _on_notification(self, connection, pid: int, channel: str, payload: str) -> None:
+        self.dispatch(payload)
+
+    def dispatch(self, payload: str) -> int:
+        """Run the handlers for a received payload. returns how many ran (0 for our own events)."""
+        message = decode_event(payload)
+        if message is None or message["origin"] == self.worker_id:
+            return 0
+        self.received += 1
+        return self._run_handlers(message["type"], message["data"])
+
+    def _run_handlers(self, event_type: str, data: dict) -> int:
+        handlers = self._handlers.get(event_type, ())
+        for handler in handlers:
+            try:
+                handler(data)
+            except Exception as exc:
+                # one bad handler mustnt take the listener connection down with it
+                print(f"Warning: {event_type} event handler failed: {exc}")
+        return len(handlers)
+
+    def stats(self) -> dict:
+        return {
+            "running": self.running,
+            "listening": self.listening,
+            "worker_id": self.worker_id,
+            "reconnects": self.reconnects,
+            "events_sent": self.sent,
+            "events_received": self.received,
+            "events_failed": self.failed,
+        }
+
+
+_bus = EventBus()
+
+
+def get_event_bus() -> EventBus:
+    return _bus
+
+
+def event_bus_stats() -> dict:
+    return _bus.stats()
@@ -0,0 +1,84 @@
+import csv
+import datetime
+import decimal
+import io
+import json
+from typing import AsyncIterator, Iterable, Mapping, Sequence
+
+
+# format name -> media type
+EXPORT_FORMATS = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv",
+}
+
+# rows asyncpg pulls from the server side cursor per round trip
+EXPORT_PREFETCH = 500
+# rows joined into one chunk before it is handed to the response, one write per row is slow
+EXPORT_CHUNK_ROWS = 200
+
+
+def _jsonable(value):
+    if isinstance(value, (datetime.datetime, datetime.date, datetime.time)):
+        return value.isoformat()
+    if isinstance(value, decimal.Decimal):
+        return float(value)
+    return value
+
+
+def to_ndjson(record: Mapping, columns: Sequence[str], json_columns: Iterable[str] = ()) -> str:
+    """
+    One NDJSON line for a row. json_columns hold json text from postgres (json_agg etc)
+    and are nested as objects rather than as strings.
+    """
+    line = {}
+    for column in columns:
+        value = record[column]
+        if column in json_columns and isinstance(value, str):
+            value = json.loads(value)
+        line[column] = _jsonable(value)
+    return json.dumps(line, separators=(",", ":")) + "\n"
+
+
+def to_csv(values: Iterable) -> str:
+    """One CSV line (with quoting) for a sequence of values."""
+    buffer = io.StringIO()
+    csv.writer(buffer, lineterminator="\n").writerow(
+        ["" if value is None else _jsonable(value) for value in values]
+    )
+    return buffer.getvalue()
+
+
+async def stream_rows(
+    pool,
+    query: str,
+    params: Sequence,
+    export_format: str,
+    columns: Sequence[str],
+    json_columns: Iterable[str] = ()
+) -> AsyncIterator[str]:
+    """
+    Yield an export of query as NDJSON or CSV text chunks.
+
+    rows come off a server side cursor EXPORT_PREFETCH at a time, so memory stays bounded by
+    the chunk size however big the export is. the cursor runs in a read only repeatable read
+    transaction so the whole file is one consistent snapshot. the connection is only held
+    while the body is being sent, callers should check for 404s before streaming.
+    """
+    json_columns = frozenset(json_columns)
+    async with pool.acquire() as connection:
+        async with connection.transaction(isolation="repeatable_read", readonly=True):
+            if export_format == "csv":
+                yield to_csv(columns)
+
+            chunk = []
+            async for record in connection.cursor(query, *params, prefetch=EXPORT_PREFETCH):
+                if export_format == "csv":
+                    chunk.append(to_csv(record[column] for column in columns))
+                else:
+                    chunk.append(to_ndjson(record, columns, json_columns))
+                if len(chunk) >= EXPORT_CHUNK_ROWS:
+                    yield "".join(chunk)
+                    chunk.clear()
+            if chunk:
+                yield "".join(chunk)
@@ -25,13 +25,7 @@ def assign_match_dates(
     weeks_between_matches: int = 1,
     allowed_weekdays: Optional[List[int]] = None
 ) -> List[dict]:
-    if allowed_weekdays is None:
-        allowed_weekdays = [1, 1, 1, 1, 1, 1, 1]
-    
-    if len(allowed_weekdays) != 7:
-        raise ValueError("allowed_weekdays must have exactly 7 elements (one per day)")
-    if not any(allowed_weekdays):
-        raise ValueError("At least one weekday must be allowed")
+    allowed_weekdays = _validate_allowed_weekdays(allowed_weekdays)
     
     scheduled_matches = []
     remaining_matches = matches.copy()
@@ -86,6 +80,101 @@ def assign_match_dates(
     return scheduled_matches
 
 
+def generate_round_robin_rounds(team_ids: List[int], double: bool = False) -> List[List[Tuple[int, int]]]:
+    """
+    Berger / circle method round robin, already split into rounds.
+
+    First team stays put and the rest rotate one place each round, so every round
+    has each team playing at most once and the whole thing is O(n^2) with no searching.
+    Odd numbers of teams get a bye (the team paired with None sits that round out).
+
+    Home/away alternates round to round for everyone except where a team meets the fixed
+    one, so with an even number of teams nobody plays more than two home or away games in a
+    row (n - 2 breaks, the fewest possible). With an odd number the bye is the fixed team, so
+    that break lands on the bye and every team strictly alternates.
+    For double round robin the second half is the first half with home and away swapped,
+    starting from its second round (the mirror of round one goes last) so the change of
+    halves doesnt add a third game in a row. test_round_robin_scheduler checks the bound.
+    """
+    teams: List[Optional[int]] = list(team_ids)
+    if len(teams) < 2:
+        return []
+    if len(teams) % 2:
+        teams.insert(0, None)
+
+    n = len(teams)
+    fixed, rotating = teams[0], teams[1:]
+    rounds = []
+
+    for round_index in range(n - 1):
+        lineup = [fixed] + rotating
+        pairs = []
+        for i in range(n // 2):
+            home, away = lineup[i], lineup[n - 1 - i]
+            if (i == 0 and round_index % 2 == 1) or (i > 0 and i % 2 == 1):
+                home, away = away, home
+            if home is None or away is None:
+                continue
+            pairs.append((home, away))
+        rounds.append(pairs)
+        rotating = [rotating[-1]] + rotating[:-1]
+
+    if double:
+        mirrored = [[(away, home) for home, away in pairs] for pairs in rounds]
+        rounds.extend(mirrored[1:] + mirrored[:1])
+
+    return rounds
+
+
+def schedule_round_robin(
+    team_ids: List[int],
+    start_date: datetime.date,
+    double: bool = False,
+    matches_per_week_per_team: int = 1,
+    weeks_between_matches: int = 1,
+    allowed_weekdays: Optional[List[int]] = None
+) -> List[dict]:
+    """
+    Generate and date a full round robin in one go.
+
+    Drop in for generate_round_robin + assign_match_dates (same dict output) but built
+    from circle method rounds, so theres no rescanning the remaining matches every period.
+    matches_per_week_per_team rounds get packed into each period, which keeps the
+    per team limit because a team plays at most once per round.
+    """
+    allowed_weekdays = _validate_allowed_weekdays(allowed_weekdays)
+    if matches_per_week_per_team < 1:
+        raise ValueError("matches_per_week_per_team must be at least 1")
+
+    scheduled_matches = []
+    for round_index, pairs in enumerate(generate_round_robin_rounds(team_ids, double=double)):
+        period = round_index // matches_per_week_per_team
+        base_date = start_date + timedelta(weeks=period * weeks_between_matches)
+        match_date = _get_next_allowed_weekday(base_date, allowed_weekdays)
+
+        for team_a_id, team_b_id in pairs:
+            scheduled_matches.append({
+                'team_a_id': team_a_id,
+                'team_b_id': team_b_id,
+                'match_date': match_date,
+                'status': 'SCHEDULED'
+            })
+
+    return scheduled_matches
+
+
+def _validate_allowed_weekdays(allowed_weekdays: Optional[List[int]]) -> List[int]:
+    if allowed_weekdays is None:
+        allowed_weekdays = [1, 1, 1, 1, 1, 1, 1]
+    
+    if len(allowed_weekdays) != 7:
+        raise ValueError("allowed_weekdays must have exactly 7 elements (one per day)")
+    if not any(allowed_weekdays):
+        raise ValueError("At least one weekday must be allowed")
+    
+    return allowed_weekdays
+
+
 def _get_next_allowed_weekday(date: datetime.date, allowed_weekdays: List[int]) -> datetime.date:
     """
     Gets an allowed date from the weekday
@@ -0,0 +1,53 @@
+import datetime
+import asyncpg
+from typing import Dict, List, Optional
+
+
+# defaults to 1900, js a common time no particular reason
+DEFAULT_KICKOFF = datetime.time(19, 0)
+
+
+async def insert_fixtures(
+    connection: asyncpg.Connection,
+    season_id: int,
+    scheduled_matches: List[dict],
+    team_home_grounds: Optional[Dict[int, Optional[str]]] = None
+) -> List[int]:
+    """
+    Insert a whole fixture list in one statement and return the new match_ids. RETURNING
+    doesnt promise any row order, so dont rely on the ids lining up with scheduled_matches.
+
+    scheduled_matches is the output of assign_match_dates. every column goes up as an array
+    and gets unnested server side, so a 380 match double round robin is one round trip not 380.
+    """
+    if not scheduled_matches:
+        return []
+
+    team_home_grounds = team_home_grounds or {}
+
+    home_team_ids = [match['team_a_id'] for match in scheduled_matches]
+    away_team_ids = [match['team_b_id'] for match in scheduled_matches]
+    match_datetimes = [
+        datetime.datetime.combine(match['match_date'], DEFAULT_KICKOFF)
+        for match in scheduled_matches
+    ]
+    venues = [team_home_grounds.get(match['team_a_id']) for match in scheduled_matches]
+    statuses = [match['status'] for match in scheduled_matches]
+
+    rows = await connection.fetch(
+        """
+        INSERT INTO "Matches"
+        (season_id, home_team_id, away_team_id, match_datetime, venue, status)
+        SELECT $1, f.home_team_id, f.away_team_id, f.match_datetime, f.venue, f.status::game_states
+        FROM unnest($2::int[], $3::int[], $4::timestamp[], $5::text[], $6::text[])
+             AS f(home_team_id, away_team_id, match_datetime, venue, status)
+        RETURNING match_id
+        """,
+        season_id,
+        home_team_ids,
+        away_team_ids,
+        match_datetimes,
+        venues,
+        statuses,
+    )
+    return [row['match_id'] for row in rows]
@@ -0,0 +1,74 @@
+import json
+import asyncpg
+from typing import Optional
+
+
+# how long a key is remembered. a retry after this is treated as a brand new request
+IDEMPOTENCY_KEY_TTL_HOURS = 24
+IDEMPOTENCY_KEY_MAX_LENGTH = 255
+
+
+async def claim_idempotency_key(
+    connection: asyncpg.Connection,
+    user_id: int,
+    scope: str,
+    idempotency_key: str,
+    request_fingerprint: str
+) -> Optional[dict]:
+    """
+    Claim a key before doing the work it protects. must run in the same transaction as that work.
+
+    returns None if the key is new (do the work, then store_idempotent_response), or the stored
+    response of the earlier request with this key. a concurrent request with the same key blocks
+    on the insert until the first one commits, then gets its response. if the first one rolled
+    back the key is free again. raises ValueError if the key was used for a different request.
+    """
+    if len(idempotency_key) > IDEMPOTENCY_KEY_MAX_LENGTH:
+        raise ValueError(f"Idempotency-Key must be at most {IDEMPOTENCY_KEY_MAX_LENGTH} characters")
+
+    # expired keys are taken over as if they were new
+    claimed = await connection.fetchval(
+        """
+        INSERT INTO "IdempotencyKeys" (user_id, scope, idempotency_key, request_fingerprint)
+        VALUES ($1, $2, $3, $4)
+        ON CONFLICT (user_id, scope, idempotency_key) DO UPDATE
+        SET request_fingerprint = EXCLUDED.request_fingerprint,
+            response = NULL,
+            created_at = CURRENT_TIMESTAMP
+        WHERE "IdempotencyKeys".created_at < CURRENT_TIMESTAMP - make_interval(hours => $5)
+        RETURNING true
+        """,
+        user_id, scope, idempotency_key, request_fingerprint, IDEMPOTENCY_KEY_TTL_HOURS
+    )
+    if claimed:
+        return None
+
+    row = await connection.fetchrow(
+        """
+        SELECT request_fingerprint, response
+        FROM "IdempotencyKeys"
+        WHERE user_id = $1 AND scope = $2 AND idempotency_key = $3
+        """,
+        user_id, scope, idempotency_key
+    )
+    if row['request_fingerprint'] != request_fingerprint:
+        raise ValueError("Idempotency-Key was already used for a different request")
+    return json.loads(row['response'])
+
+
+async def store_idempotent_response(
+    connection: asyncpg.Connection,
+    user_id: int,
+    scope: str,
+    idempotency_key: str,
+    response: dict
+) -> None:
+    """Save the response for a claimed key, in the same transaction as the work."""
+    await connection.execute(
+        """
+        UPDATE "IdempotencyKeys"
+        SET response = $4::jsonb
+        WHERE user_id = $1 AND scope = $2 AND idempotency_key = $3
+        """,
+        user_id, scope, idempotency_key, json.dumps(response)
+    )
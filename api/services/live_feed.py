@@ -0,0 +1,182 @@
+import asyncio
+import json
+from typing import Dict, Iterable, List, Mapping, Optional, Set
+from api.models import MatchOut
+from api.services.event_bus import MAX_PAYLOAD_BYTES, RESYNC_EVENT, get_event_bus
+
+
+# events a slow watcher can fall behind by before the oldest ones are dropped. it always gets
+# the newest state, a dropped intermediate score doesnt matter
+SUBSCRIBER_QUEUE_SIZE = 64
+# comment line sent when nothing happened for this long, keeps proxies from closing the stream
+HEARTBEAT_SECONDS = 15.0
+# room left in a NOTIFY payload for the bus envelope around a batch of match events
+MATCH_EVENT_BATCH_BYTES = MAX_PAYLOAD_BYTES - 256
+
+
+class LiveFeedHub:
+    """
+    In-process fan-out of live match events to Server-Sent Events watchers.
+
+    writers call publish() once after their commit, every watcher of that match gets the event
+    from its own queue, so the database sees one write and no reads however many people watch.
+    the latest snapshot (match + sets) per match is kept so a new watcher can start without a
+    query once anyone has watched or updated that match. one hub per worker process, events
+    reach the hubs on other workers over the event bus.
+    """
+
+    def __init__(self, queue_size: int = SUBSCRIBER_QUEUE_SIZE):
+        self.queue_size = queue_size
+        self._subscribers: Dict[int, Set[asyncio.Queue]] = {}
+        self._snapshots: Dict[int, dict] = {}
+        # publishes per match, lets a database read tell whether it raced with a write
+        self._versions: Dict[int, int] = {}
+        self.published = 0
+        self.dropped = 0
+
+    def subscribe(self, match_id: int) -> asyncio.Queue:
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.queue_size)
+        self._subscribers.setdefault(match_id, set()).add(queue)
+        return queue
+
+    def unsubscribe(self, match_id: int, queue: asyncio.Queue) -> None:
+        watchers = self._subscribers.get(match_id)
+        if watchers is None:
+            return
+        watchers.discard(queue)
+        if not watchers:
+            # nobody watching, forget the snapshot too so it cant go stale
+            del self._subscribers[match_id]
+            self._snapshots.pop(match_id, None)
+            self._versions.pop(match_id, None)
+
+    def snapshot(self, match_id: int) -> Optional[dict]:
+        return self._snapshots.get(match_id)
+
+    def version(self, match_id: int) -> int:
+        return self._versions.get(match_id, 0)
+
+    def seed_snapshot(self, match_id: int, match: dict, sets: List[dict], version: int) -> dict:
+        """
+        Keep the snapshot a watcher read from the database, for the watchers after it.
+        version is version() from before the read; if something was published since, the read
+        may be older than that event so it is only sent to this watcher, not stored.
+        """
+        snapshot = {"match": match, "sets": sorted(sets, key=lambda s: s["set_number"])}
+        if self.version(match_id) == version and match_id in self._subscribers:
+            self._snapshots.setdefault(match_id, snapshot)
+        return snapshot
+
+    def drop_snapshots(self) -> None:
+        """
+        Forget every snapshot so the next watcher of each match reads the database again, for
+        when events may have been missed. versions move on so reads already running arent stored.
+        """
+        self._snapshots.clear()
+        for match_id in self._subscribers:
+            self._versions[match_id] = self.version(match_id) + 1
+
+    def publish(self, match_id: int, event: str, data: dict) -> int:
+        """
+        Fan an event out to every watcher of a match and fold it into the snapshot.
+        event is "match" (data is the match), "set" (one set) or "sets" ({"sets": every set}).
+        returns how many watchers got it.
+        """
+        self._apply_to_snapshot(match_id, event, data)
+        if match_id in self._subscribers:
+            self._versions[match_id] = self.version(match_id) + 1
+        self.published += 1
+
+        message = (event, data)
+        watchers = self._subscribers.get(match_id, ())
+        for queue in watchers:
+            if queue.full():
+                queue.get_nowait()
+                self.dropped += 1
+            queue.put_nowait(message)
+        return len(watchers)
+
+    def _apply_to_snapshot(self, match_id: int, event: str, data: dict) -> None:
+        snapshot = self._snapshots.get(match_id)
+        if snapshot is None:
+            return
+        if event == "match":
+            snapshot["match"] = data
+        elif event == "set":
+            sets = [s for s in snapshot["sets"] if s["set_number"] != data["set_number"]]
+            sets.append(data)
+            snapshot["sets"] = sorted(sets, key=lambda s: s["set_number"])
+        elif event == "sets":
+            snapshot["sets"] = sorted(data["sets"], key=lambda s: s["set_number"])
+
+    def stats(self) -> dict:
+        return {
+            "matches_watched": len(self._subscribers),
+            "watchers": sum(len(watchers) for watchers in self._subscribers.values()),
+            "events_published": self.published,
+            "events_dropped": self.dropped,
+        }
+
+
+_hub = LiveFeedHub()
+
+
+def get_live_feed() -> LiveFeedHub:
+    return _hub
+
+
+def publish_match_event(match_id: int, event: str, data: dict) -> int:
+    """
+    Broadcast to the watchers of a match on every worker. call after the write has committed.
+    returns how many watchers on this worker got it.
+    """
+    get_event_bus().broadcast("match_event", {"match_id": match_id, "event": event, "data": data})
+    return _hub.publish(match_id, event, data)
+
+
+def publish_match_rows(rows: Iterable[Mapping]) -> int:
+    """
+    A "match" event for every match row (MatchOut columns) a bulk write changed, on every worker.
+    the other workers get them as a few "match_events" messages packed up to the NOTIFY size
+    limit rather than one NOTIFY per match. call after the commit. returns watchers reached here.
+    """
+    bus = get_event_bus()
+    delivered = 0
+    batch: List[dict] = []
+    batch_bytes = 0
+    for row in rows:
+        data = MatchOut(**row).model_dump(mode="json")
+        delivered += _hub.publish(data["match_id"], "match", data)
+        event = {"match_id": data["match_id"], "event": "match", "data": data}
+        event_bytes = len(json.dumps(event, separators=(',', ':'))) + 1
+        if batch and batch_bytes + event_bytes > MATCH_EVENT_BATCH_BYTES:
+            bus.broadcast("match_events", {"events": batch})
+            batch, batch_bytes = [], 0
+        batch.append(event)
+        batch_bytes += event_bytes
+    if batch:
+        bus.broadcast("match_events", {"events": batch})
+    return delivered
+
+
+def _publish_received(data: dict) -> None:
+    _hub.publish(data["match_id"], data["event"], data["data"])
+
+
+def _publish_received_batch(data: dict) -> None:
+    for event in data["events"]:
+        _publish_received(event)
+
+
+get_event_bus().subscribe("match_event", _publish_received)
+get_event_bus().subscribe("match_events", _publish_received_batch)
+get_event_bus().subscribe(RESYNC_EVENT, lambda data: _hub.drop_snapshots())
+
+
+def live_feed_stats() -> dict:
+    return _hub.stats()
+
+
+def format_sse(event: str, data: dict) -> str:
+    """One Server-Sent Events message."""
+    return f"event: {event}\ndata: {json.dumps(data, separators=(',', ':'))}\n\n"
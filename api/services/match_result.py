@@ -0,0 +1,94 @@
+import asyncpg
+from typing import List, Mapping, Sequence, Tuple
+from api.models import MatchProcessingResult
+from api.services.standings_engine import process_match_result, retract_match_result
+from api.services.standings_helpers import summarise_sets
+
+
+async def insert_match_sets(connection: asyncpg.Connection, match_id: int, sets: Sequence[Mapping]) -> List[asyncpg.Record]:
+    """Insert every set of a match in one statement, returned in set_number order."""
+    ordered = sorted(sets, key=lambda s: s['set_number'])
+    return await connection.fetch(
+        """
+        INSERT INTO "Sets" (match_id, set_number, home_team_score, away_team_score)
+        SELECT $1, s.set_number, s.home_team_score, s.away_team_score
+        FROM unnest($2::int[], $3::int[], $4::int[]) AS s(set_number, home_team_score, away_team_score)
+        ORDER BY s.set_number
+        RETURNING set_id, match_id, set_number, home_team_score, away_team_score
+        """,
+        match_id,
+        [s['set_number'] for s in ordered],
+        [s['home_team_score'] for s in ordered],
+        [s['away_team_score'] for s in ordered],
+    )
+
+
+async def record_match_result(
+    connection: asyncpg.Connection,
+    match_id: int,
+    sets: Sequence[Mapping]
+) -> Tuple[dict, List[asyncpg.Record], MatchProcessingResult]:
+    """
+    Write a whole result: the sets, the FINISHED match with its derived sets won and winner,
+    then the standings via process_match_result. run it inside a transaction so a bad
+    result leaves nothing behind.
+
+    a match that already has a result is corrected: its old contribution is retracted and the
+    new one applied. returns (match row, set rows, processing result). raises LookupError if
+    the match doesnt exist and ValueError if the sets dont add up.
+    """
+    home_sets_won, away_sets_won = summarise_sets(sets)
+
+    # row lock so two referees submitting at once cant both get past the status check
+    match = await connection.fetchrow(
+        """
+        SELECT match_id, season_id, home_team_id, away_team_id, match_datetime,
+               venue, status
+        FROM "Matches"
+        WHERE match_id = $1
+        FOR UPDATE
+        """,
+        match_id
+    )
+    if not match:
+        raise LookupError(f"Match {match_id} not found")
+    # resubmitting corrects the result: a processed match has just its own deltas retracted first,
+    # a finished one is reopened so the set triggers allow its sets to be replaced
+    if match['status'] == 'PROCESSED':
+        await retract_match_result(connection, match_id)
+    elif match['status'] == 'FINISHED':
+        await connection.execute(
+            """UPDATE "Matches" SET status = 'SCHEDULED'::game_states WHERE match_id = $1""",
+            match_id
+        )
+
+    # sets entered one by one before the match finished get replaced by the submitted ones
+    await connection.execute('DELETE FROM "Sets" WHERE match_id = $1', match_id)
+    set_rows = await insert_match_sets(connection, match_id, sets)
+
+    winner_team_id = match['home_team_id'] if home_sets_won > away_sets_won else match['away_team_id']
+    await connection.execute(
+        """
+        UPDATE "Matches"
+        SET status = 'FINISHED'::game_states,
+            home_sets_won = $2,
+            away_sets_won = $3,
+            winner_team_id = $4
+        WHERE match_id = $1
+        """,
+        match_id,
+        home_sets_won,
+        away_sets_won,
+        winner_team_id
+    )
+
+    result = await process_match_result(connection, match_id)
+
+    match_row = {
+        **dict(match),
+        'status': 'PROCESSED',
+        'winner_team_id': winner_team_id,
+        'home_sets_won': home_sets_won,
+        'away_sets_won': away_sets_won,
+    }
+    return match_row, set_rows, result
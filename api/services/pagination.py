@@ -0,0 +1,80 @@
+import base64
+import datetime
+import json
+from typing import Optional, Tuple
+
+
+# cursors point at the first/last row of a page. "next" means rows after it in the listing
+# order, "prev" means rows before it
+NEXT = "next"
+PREV = "prev"
+
+
+def naive_utc(value: Optional[datetime.datetime]) -> Optional[datetime.datetime]:
+    """
+    match_datetime is a plain TIMESTAMP (UTC) and asyncpg refuses timezone aware values for it,
+    so a query param like 2025-01-01T00:00:00Z is converted to UTC and the offset dropped.
+    naive values are taken as UTC already and come back unchanged.
+    """
+    if value is None or value.tzinfo is None:
+        return value
+    return value.astimezone(datetime.timezone.utc).replace(tzinfo=None)
+
+
+def encode_cursor(match_datetime: Optional[datetime.datetime], match_id: int, direction: str) -> str:
+    """Opaque url safe cursor for a (match_datetime, match_id) keyset position."""
+    raw = json.dumps(
+        {
+            "d": match_datetime.isoformat() if match_datetime is not None else None,
+            "id": match_id,
+            "dir": direction,
+        },
+        separators=(",", ":"),
+    )
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[Optional[datetime.datetime], int, str]:
+    """
+    Reverse of encode_cursor. raises ValueError for anything that isnt one of our cursors,
+    routes turn that into a 400.
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        data = json.loads(base64.urlsafe_b64decode(padded.encode()).decode())
+        match_datetime = naive_utc(datetime.datetime.fromisoformat(data["d"])) if data["d"] is not None else None
+        match_id = int(data["id"])
+        direction = data["dir"]
+    except (ValueError, KeyError, TypeError) as exc:
+        raise ValueError("Invalid cursor") from exc
+    if direction not in (NEXT, PREV):
+        raise ValueError("Invalid cursor")
+    return match_datetime, match_id, direction
+
+
+def match_keyset_clause(
+    match_datetime: Optional[datetime.datetime],
+    match_id: int,
+    direction: str,
+    first_param: int
+) -> Tuple[str, list, str]:
+    """
+    WHERE fragment, its params and the ORDER BY for one page of matches.
+
+    the listing order is match_datetime DESC NULLS FIRST, match_id DESC (unscheduled matches
+    with no date first, same as the old ORDER BY match_datetime DESC). the row comparison
+    (match_datetime, match_id) < (...) can use the (match_datetime DESC, match_id DESC) indexes,
+    NULL dates are handled separately since they never compare. prev pages are read in the
+    opposite order, the caller flips them back.
+    """
+    dt, mid = f"${first_param}", f"${first_param + 1}"
+    if direction == NEXT:
+        order = "match_datetime DESC NULLS FIRST, match_id DESC"
+        if match_datetime is None:
+            return f"((match_datetime IS NULL AND match_id < ${first_param}) OR match_datetime IS NOT NULL)", [match_id], order
+        return f"(match_datetime, match_id) < ({dt}, {mid})", [match_datetime, match_id], order
+
+    order = "match_datetime ASC NULLS LAST, match_id ASC"
+    if match_datetime is None:
+        return f"(match_datetime IS NULL AND match_id > ${first_param})", [match_id], order
+    return f"((match_datetime, match_id) > ({dt}, {mid}) OR match_datetime IS NULL)", [match_datetime, match_id], order
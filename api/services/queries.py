@@ -0,0 +1,188 @@
+import datetime
+from typing import Any, Dict, Optional, Tuple
+import asyncpg
+from api.services.pagination import NEXT, PREV, match_keyset_clause
+
+
+# column lists shared by the selects and the RETURNING clauses of the write routes
+MATCH_COLUMNS = """match_id, season_id, home_team_id, away_team_id, match_datetime,
+       venue, status, winner_team_id, home_sets_won, away_sets_won"""
+
+SEASON_COLUMNS = """season_id, league_id, name, start_date, end_date,
+       matches_per_week_per_team, weeks_between_matches,
+       double_round_robin, allowed_weekdays, is_archived"""
+
+STANDING_COLUMNS = """standing_id, season_id, team_id, team_name, matches_played, wins, losses,
+       sets_won, sets_lost, set_diff, points_won, points_lost, point_diff,
+       league_points, position"""
+
+# every /matches filter in one fixed form, a filter that wasnt given is passed as NULL. the
+# planner folds the NULL branches away on each custom plan and a generic plan (no index) costs
+# far more, so plan_cache_mode=auto keeps using the custom ones
+MATCH_FILTERS = """($1::int IS NULL OR season_id = $1)
+          AND ($2::int IS NULL OR home_team_id = $2 OR away_team_id = $2)
+          AND ($3::game_states IS NULL OR status = $3)
+          AND ($4::timestamp IS NULL OR match_datetime >= $4)
+          AND ($5::timestamp IS NULL OR match_datetime < $5)"""
+MATCH_FILTER_PARAMS = 5
+
+
+def _match_page_query(keyset_clause: str, keyset_params: int, order: str) -> str:
+    """One variant of the match listing, params: the 5 filters, the cursor (if any), then the limit."""
+    return f"""
+        SELECT {MATCH_COLUMNS}
+        FROM "Matches"
+        WHERE {MATCH_FILTERS}
+          AND {keyset_clause}
+        ORDER BY {order}
+        LIMIT ${MATCH_FILTER_PARAMS + keyset_params + 1};
+    """
+
+
+def _cursor_page_query(dated: bool, direction: str) -> str:
+    # the clause only depends on whether the cursor has a datetime, not on its value
+    clause, params, order = match_keyset_clause(
+        datetime.datetime.min if dated else None, 0, direction, MATCH_FILTER_PARAMS + 1
+    )
+    return _match_page_query(clause, len(params), order)
+
+
+# the hot read statements, held once here and prepared on every pool connection by init_connection
+QUERIES: Dict[str, str] = {
+    "get_match": f"""
+        SELECT {MATCH_COLUMNS}
+        FROM "Matches"
+        WHERE match_id = $1;
+    """,
+    "match_page": _match_page_query("true", 0, "match_datetime DESC NULLS FIRST, match_id DESC"),
+    "match_page_next": _cursor_page_query(True, NEXT),
+    "match_page_next_undated": _cursor_page_query(False, NEXT),
+    "match_page_prev": _cursor_page_query(True, PREV),
+    "match_page_prev_undated": _cursor_page_query(False, PREV),
+    "list_seasons": f"""
+        SELECT {SEASON_COLUMNS}
+        FROM "Seasons"
+        ORDER BY start_date DESC;
+    """,
+    "get_season": f"""
+        SELECT {SEASON_COLUMNS}
+        FROM "Seasons"
+        WHERE season_id = $1;
+    """,
+    "list_league_seasons": f"""
+        SELECT {SEASON_COLUMNS}
+        FROM "Seasons"
+        WHERE league_id = $1
+        ORDER BY start_date DESC;
+    """,
+    "season_exists": 'SELECT season_id FROM "Seasons" WHERE season_id = $1;',
+    "league_exists": 'SELECT league_id FROM "Leagues" WHERE league_id = $1;',
+    # StandingsProjection is kept ranked by refresh_standings_projection so this is a primary
+    # key range scan, no window function or join on the hot path
+    "season_standings": f"""
+        SELECT {STANDING_COLUMNS}
+        FROM "StandingsProjection"
+        WHERE season_id = $1
+        ORDER BY position ASC;
+    """,
+}
+
+
+def match_page_statement(
+    cursor: Optional[Tuple[Optional[datetime.datetime], int, str]],
+    filters: Tuple[Any, ...],
+    limit: int
+) -> Tuple[str, list]:
+    """Registered statement name and its params for a page of matches. cursor is decode_cursor's output."""
+    if cursor is None:
+        return "match_page", [*filters, limit]
+    cursor_datetime, cursor_match_id, direction = cursor
+    if cursor_datetime is None:
+        return f"match_page_{direction}_undated", [*filters, cursor_match_id, limit]
+    return f"match_page_{direction}", [*filters, cursor_datetime, cursor_match_id, limit]
+
+
+class PreparedConnection(asyncpg.Connection):
+    """
+    Pool connection that keeps the QUERIES statements prepared for its whole life.
+
+    asyncpg's own statement cache would prepare them too, but only on first use of each
+    connection and only while they stay in its LRU. the pool is created with
+    connection_class=PreparedConnection and init_connection calls prepare_registry().
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.prepared_statements: Dict[str, Any] = {}
+
+    async def prepare_registry(self) -> None:
+        for name, query in QUERIES.items():
+            self.prepared_statements[name] = await self.prepare(query)
+
+
+class _PreparedStatement:
+    """
+    A registry statement prepared on this connection, re-prepared when the schema changed under it.
+
+    a migration applied while the workers run (say it changes the type of a column a statement
+    returns) makes postgres refuse the old plan with InvalidCachedStatementError. outside a
+    transaction it is prepared again and retried once, like asyncpg does for its own cache.
+    inside one the transaction is already aborted, so it is dropped from the connection (later
+    calls take the query text path, which asyncpg's cache recovers by itself) and the error goes up.
+    """
+
+    def __init__(self, connection, name: str):
+        self._connection = connection
+        self._name = name
+
+    async def _run(self, method: str, *args, **kwargs):
+        prepared = self._connection.prepared_statements[self._name]
+        try:
+            return await getattr(prepared, method)(*args, **kwargs)
+        except asyncpg.InvalidCachedStatementError:
+            if self._connection.is_in_transaction():
+                self._connection.prepared_statements.pop(self._name, None)
+                raise
+            prepared = await self._connection.prepare(QUERIES[self._name])
+            self._connection.prepared_statements[self._name] = prepared
+            return await getattr(prepared, method)(*args, **kwargs)
+
+    async def fetch(self, *args):
+        return await self._run("fetch", *args)
+
+    async def fetchrow(self, *args):
+        return await self._run("fetchrow", *args)
+
+    async def fetchval(self, *args, column: int = 0):
+        return await self._run("fetchval", *args, column=column)
+
+
+class _TextStatement:
+    """Same fetch methods as a prepared statement, for connections that didnt prepare the registry."""
+
+    def __init__(self, connection, query: str):
+        self._connection = connection
+        self._query = query
+
+    async def fetch(self, *args):
+        return await self._connection.fetch(self._query, *args)
+
+    async def fetchrow(self, *args):
+        return await self._connection.fetchrow(self._query, *args)
+
+    async def fetchval(self, *args, column: int = 0):
+        return await self._connection.fetchval(self._query, *args, column=column)
+
+
+def statement(connection, name: str):
+    """
+    A registered statement on this connection: the prepared one when the pool prepared the
+    registry (re-prepared if a migration invalidated it, see _PreparedStatement), otherwise the
+    query text through asyncpg's statement cache (scripts, pgbouncer with
+    PGPOOL_STATEMENT_CACHE_SIZE=0). raises KeyError for an unknown name.
+    """
+    query = QUERIES[name]
+    prepared = getattr(connection, "prepared_statements", None)
+    if prepared and name in prepared:
+        return _PreparedStatement(connection, name)
+    return _TextStatement(connection, query)
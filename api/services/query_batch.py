@@ -0,0 +1,38 @@
+import asyncio
+from typing import Any, List, Tuple
+import asyncpg
+
+
+READ_METHODS = ("fetch", "fetchrow", "fetchval")
+
+# (method, query, *params), e.g. ("fetchrow", 'SELECT ... WHERE season_id = $1', season_id)
+Read = Tuple[Any, ...]
+
+
+async def _run_read(pool: asyncpg.Pool, read: Read) -> Any:
+    method, query, *params = read
+    async with pool.acquire() as connection:
+        return await getattr(connection, method)(query, *params)
+
+
+async def gather_reads(pool: asyncpg.Pool, *reads: Read) -> List[Any]:
+    """
+    Run independent reads at the same time, each on its own pooled connection, so a handler
+    waits one round trip instead of one per query. results come back in the order given.
+
+    only for reads that dont depend on each other or need to see the same snapshot. call it
+    without holding a connection from the same pool, otherwise a busy pool can deadlock with
+    every request holding one connection and waiting for more. if a read fails its exception
+    is raised once the others have finished and given their connections back.
+    """
+    for read in reads:
+        if read[0] not in READ_METHODS:
+            raise ValueError(f"gather_reads only runs {', '.join(READ_METHODS)}, got {read[0]}")
+    if len(reads) == 1:
+        return [await _run_read(pool, reads[0])]
+
+    results = await asyncio.gather(*(_run_read(pool, read) for read in reads), return_exceptions=True)
+    for result in results:
+        if isinstance(result, BaseException):
+            raise result
+    return results
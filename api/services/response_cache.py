@@ -0,0 +1,150 @@
+import functools
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+from api.services.event_bus import RESYNC_EVENT, get_event_bus
+
+
+# route arguments that never go in the cache key. request is per call and user is only there
+# for the auth dependency, the cached routes return the same data whoever asks
+IGNORED_KEY_PARAMS = ("request", "user")
+
+
+class ResponseCache:
+    """
+    Bounded TTL + LRU cache for one group of GET routes (a namespace). auth also keeps its
+    verified tokens in one so they show up in the same counters.
+
+    entries expire after ttl seconds (or the ttl the route passed to set) and the least recently used one is dropped once
+    max_entries is hit. its per process, invalidate() tells the other workers over the event
+    bus. if that message is lost the ttl is still what bounds staleness on them.
+    """
+
+    def __init__(self, namespace: str, ttl: float, max_entries: int = 256):
+        self.namespace = namespace
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+        # bumped on every clear so a read that started before a write cant put its stale result back
+        self.generation = 0
+
+    def get(self, key: Hashable) -> Tuple[bool, Any]:
+        entry = self._entries.get(key)
+        if entry is not None:
+            expires_at, value = entry
+            if expires_at > time.monotonic():
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return True, value
+            del self._entries[key]
+        self.misses += 1
+        return False, None
+
+    def set(self, key: Hashable, value: Any, generation: Optional[int] = None, ttl: Optional[float] = None) -> None:
+        if generation is not None and generation != self.generation:
+            return
+        self._entries[key] = (time.monotonic() + (self.ttl if ttl is None else ttl), value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self.generation += 1
+        self.invalidations += 1
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "ttl_seconds": self.ttl,
+            "max_entries": self.max_entries,
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+            "evictions": self.evictions,
+            "invalidations": self.invalidations,
+        }
+
+
+_caches: Dict[str, ResponseCache] = {}
+
+
+def get_cache(namespace: str, ttl: float = 30, max_entries: int = 256) -> ResponseCache:
+    """Get (or create the first time) the cache for a namespace."""
+    cache = _caches.get(namespace)
+    if cache is None:
+        cache = ResponseCache(namespace, ttl, max_entries)
+        _caches[namespace] = cache
+    return cache
+
+
+def invalidate(*namespaces: str) -> None:
+    """
+    Drop everything cached under the given namespaces, on this worker and (through the event
+    bus) every other one. called by the write routes after they change data.
+    """
+    invalidate_local(*namespaces)
+    get_event_bus().broadcast("invalidate", {"namespaces": list(namespaces)})
+
+
+def invalidate_local(*namespaces: str) -> None:
+    """invalidate() for this worker only, what an invalidate event from another worker runs."""
+    for namespace in namespaces:
+        cache = _caches.get(namespace)
+        if cache is not None:
+            cache.clear()
+
+
+get_event_bus().subscribe("invalidate", lambda data: invalidate_local(*data["namespaces"]))
+# invalidations sent while this worker's listener was down were missed, start over
+get_event_bus().subscribe(RESYNC_EVENT, lambda data: invalidate_local(*_caches))
+
+
+def cache_stats() -> Dict[str, Dict[str, Any]]:
+    return {namespace: cache.stats() for namespace, cache in sorted(_caches.items())}
+
+
+def _cache_key(kwargs: Dict[str, Any]) -> Optional[Hashable]:
+    key = tuple(sorted((name, value) for name, value in kwargs.items() if name not in IGNORED_KEY_PARAMS))
+    try:
+        hash(key)
+    except TypeError:
+        return None
+    return key
+
+
+def cached(namespace: str, ttl: float, max_entries: int = 256) -> Callable:
+    """
+    Cache an async GET route's return value under namespace, keyed on its path/query params.
+
+    goes underneath the @router.get decorator. functools.wraps keeps the signature so fastapi
+    still resolves the params and dependencies (so auth still runs on every request), only the
+    database work is skipped on a hit. exceptions arent cached so 404s always go to the db.
+    """
+    cache = get_cache(namespace, ttl, max_entries)
+
+    def decorator(func: Callable) -> Callable:
+        @functools.wraps(func)
+        async def wrapper(*args, **kwargs):
+            key = _cache_key(kwargs)
+            if key is None:
+                return await func(*args, **kwargs)
+
+            hit, value = cache.get((func.__name__, key))
+            if hit:
+                return value
+
+            generation = cache.generation
+            value = await func(*args, **kwargs)
+            cache.set((func.__name__, key), value, generation, ttl)
+            return value
+
+        return wrapper
+
+    return decorator
@@ -0,0 +1,172 @@
+import datetime
+import decimal
+import json
+from typing import Any, AsyncIterable, AsyncIterator, Dict, Iterable, List, Sequence, Tuple, Type
+from fastapi import Response, status
+from fastapi.responses import JSONResponse, StreamingResponse
+from pydantic import BaseModel
+
+try:
+    import orjson
+except ImportError:  # same output through the stdlib, just slower
+    orjson = None
+
+
+# lists longer than this go out as a chunked stream (list_response, query_list_response),
+# STREAM_CHUNK_ROWS encoded at a time. query_list_response also reads them STREAM_CHUNK_ROWS at a time
+STREAM_THRESHOLD_ROWS = 1000
+STREAM_CHUNK_ROWS = 500
+
+_field_defaults: Dict[Type[BaseModel], Tuple[Tuple[str, Any], ...]] = {}
+
+
+def _fields(model: Type[BaseModel]) -> Tuple[Tuple[str, Any], ...]:
+    """(name, default) for every field of a model, in declaration order. None for required ones."""
+    fields = _field_defaults.get(model)
+    if fields is None:
+        fields = tuple(
+            (name, None if info.is_required() else info.get_default(call_default_factory=True))
+            for name, info in model.model_fields.items()
+        )
+        _field_defaults[model] = fields
+    return fields
+
+
+def model_rows(model: Type[BaseModel], rows: Iterable) -> List[dict]:
+    """
+    Records (or dicts) shaped like model, without building a model per row.
+
+    only for trusted database output whose column types already are the field types: nothing is
+    validated or coerced, so a DATE column behind a datetime field (SeasonOut) would come out as
+    a date. columns the model doesnt have are dropped and missing optional ones get the default.
+    """
+    fields = _fields(model)
+    return [{name: row.get(name, default) for name, default in fields} for row in rows]
+
+
+def _default(value: Any) -> Any:
+    if isinstance(value, (datetime.datetime, datetime.date, datetime.time)):
+        return value.isoformat()
+    if isinstance(value, decimal.Decimal):
+        return float(value)
+    raise TypeError(f"{type(value).__name__} is not JSON serializable")
+
+
+def dump_json(content: Any) -> bytes:
+    """JSON bytes for plain data (dicts, lists, datetimes), with orjson when it is installed."""
+    if orjson is not None:
+        # orjson does datetimes and dates itself, default only sees what it cant (Decimal)
+        return orjson.dumps(content, default=_default)
+    return json.dumps(content, default=_default, separators=(",", ":")).encode()
+
+
+class FastJSONResponse(JSONResponse):
+    """
+    The app's default response class (fastapi_app.py), JSONResponse rendered by dump_json
+    instead of json.dumps. datetimes and dates that reach it unconverted come out as ISO strings.
+    """
+
+    def render(self, content: Any) -> bytes:
+        return dump_json(content)
+
+
+def json_response(content: Any, status_code: int = status.HTTP_200_OK) -> Response:
+    """
+    Response for already plain data, skips fastapi's response_model validation and jsonable
+    encoding. keep response_model on the route so the docs still show the shape.
+    """
+    return Response(content=dump_json(content), status_code=status_code, media_type="application/json")
+
+
+def rows_response(model: Type[BaseModel], rows: Iterable) -> Response:
+    """A JSON list of model shaped objects straight from database rows, see model_rows."""
+    return json_response(model_rows(model, rows))
+
+
+async def _stream_rows(model: Type[BaseModel], batches: AsyncIterable[Sequence]) -> AsyncIterator[bytes]:
+    """One JSON list out of batches of rows, encoded STREAM_CHUNK_ROWS at a time."""
+    fields = _fields(model)
+    separator = b""
+    yield b"["
+    async for rows in batches:
+        for start in range(0, len(rows), STREAM_CHUNK_ROWS):
+            chunk = dump_json([
+                {name: row.get(name, default) for name, default in fields}
+                for row in rows[start:start + STREAM_CHUNK_ROWS]
+            ])
+            # drop the chunk's own brackets, the items join onto the previous chunk's
+            yield separator + chunk[1:-1]
+            separator = b","
+    yield b"]"
+
+
+async def _one_batch(rows: Sequence) -> AsyncIterator[Sequence]:
+    yield rows
+
+
+def list_response(model: Type[BaseModel], rows: Sequence) -> Response:
+    """
+    rows_response, but a list past STREAM_THRESHOLD_ROWS is encoded and sent in chunks so the
+    whole body never exists as one bytes object. the rows themselves are already in memory,
+    query_list_response is the one that doesnt hold them all.
+    not for @cached routes, a streamed body can only be sent once.
+    """
+    if len(rows) <= STREAM_THRESHOLD_ROWS:
+        return rows_response(model, rows)
+    return StreamingResponse(_stream_rows(model, _one_batch(rows)), media_type="application/json")
+
+
+async def _cursor_batches(pool, query: str, params: Sequence) -> AsyncIterator[Sequence]:
+    """
+    query's rows off a server side cursor, first up to STREAM_THRESHOLD_ROWS + 1 (enough to tell
+    whether the list has to stream) then STREAM_CHUNK_ROWS at a time. same read only repeatable
+    read transaction as the exports (export_stream.py), the connection is held until its closed.
+    """
+    async with pool.acquire() as connection:
+        async with connection.transaction(isolation="repeatable_read", readonly=True):
+            cursor = await connection.cursor(query, *params)
+            rows = await cursor.fetch(STREAM_THRESHOLD_ROWS + 1)
+            while rows:
+                yield rows
+                rows = await cursor.fetch(STREAM_CHUNK_ROWS)
+
+
+async def _prepend(first: Sequence, batches: AsyncIterator[Sequence]) -> AsyncIterator[Sequence]:
+    yield first
+    async for rows in batches:
+        yield rows
+
+
+class _CursorStreamResponse(StreamingResponse):
+    """
+    Streams the rest of a _cursor_batches generator, closing it however the response ends so
+    the connection goes back to the pool even if the client leaves before the body starts.
+    """
+
+    def __init__(self, model: Type[BaseModel], first: Sequence, batches: AsyncIterator[Sequence]):
+        super().__init__(_stream_rows(model, _prepend(first, batches)), media_type="application/json")
+        self._batches = batches
+
+    async def __call__(self, scope, receive, send) -> None:
+        try:
+            await super().__call__(scope, receive, send)
+        finally:
+            await self._batches.aclose()
+
+
+async def query_list_response(pool, model: Type[BaseModel], query: str, *params) -> Response:
+    """
+    list_response straight from a query. a list that fits in STREAM_THRESHOLD_ROWS is sent like
+    rows_response and the connection goes straight back. a longer one keeps its cursor open and
+    is read and sent STREAM_CHUNK_ROWS at a time, so neither all the rows nor the whole body
+    are ever in memory at once. same rule as list_response, not for @cached routes.
+    """
+    batches = _cursor_batches(pool, query, params)
+    try:
+        first = await batches.__anext__()
+    except StopAsyncIteration:
+        return rows_response(model, [])
+    if len(first) <= STREAM_THRESHOLD_ROWS:
+        await batches.aclose()
+        return rows_response(model, first)
+    return _CursorStreamResponse(model, first, batches)
@@ -1,7 +1,18 @@
 import asyncpg
-from typing import List, Optional, Dict, Any
-from api.models import MatchProcessingResult, TeamStandingUpdate
-from api.services.standings_helpers import update_team_standing, update_match_status
+from typing import List, Optional, Dict, Any, Tuple
+from api.models import MatchOut, MatchProcessingResult, TeamStandingUpdate
+from api.services.queries import MATCH_COLUMNS
+from api.services.standings_helpers import (
+    update_team_standing,
+    match_outcome,
+    aggregate_team_deltas,
+    bulk_upsert_team_standings,
+    update_matches_status,
+    refresh_standings_projection,
+    match_delta_entries,
+    retraction_entries,
+    append_standing_deltas,
+)
 
 
 async def process_match_result(connection: asyncpg.Connection, match_id: int) -> MatchProcessingResult:
@@ -9,23 +20,35 @@ async def process_match_result(connection: asyncpg.Connection, match_id: int) ->
     Proccesses a finished match and updates the standings for both teams.
     calculates league points based on match outcome (Assuming 3 points for win, 0 for loss) - will be adjusted in a future feature update.
     returns a MatchProcessingResult object with updates made.
+    safe to call from concurrent workers, must run inside a transaction (the claim and the
+    standings writes commit or roll back together).
     """
+    # claim the match: FINISHED -> PROCESSED in one conditional UPDATE. the row lock it takes makes a
+    # concurrent call for the same match wait, and once this transaction commits that call's WHERE
+    # no longer matches, so a match can never be counted twice
     match = await connection.fetchrow(
-        """
-        SELECT match_id, season_id, home_team_id, away_team_id, 
-               winner_team_id, home_sets_won, away_sets_won, status
-        FROM "Matches"
-        WHERE match_id = $1
+        f"""
+        UPDATE "Matches"
+        SET status = 'PROCESSED'::game_states
+        WHERE match_id = $1 AND status = 'FINISHED' AND winner_team_id IS NOT NULL
+        RETURNING {MATCH_COLUMNS}
         """,
         match_id
     )
     
     if not match:
-        raise ValueError(f"Match {match_id} not found")
-    if match['winner_team_id'] is None:
-        raise ValueError(f"Match {match_id} has no winner recorded")
-    if match['status'] != 'FINISHED':
-        raise ValueError(f"Match {match_id} is not finished (status: {match['status']})")
+        # work out why for the error message
+        current = await connection.fetchrow(
+            'SELECT status, winner_team_id FROM "Matches" WHERE match_id = $1',
+            match_id
+        )
+        if not current:
+            raise ValueError(f"Match {match_id} not found")
+        if current['status'] == 'PROCESSED':
+            raise ValueError(f"Match {match_id} has already been processed")
+        if current['winner_team_id'] is None:
+            raise ValueError(f"Match {match_id} has no winner recorded")
+        raise ValueError(f"Match {match_id} is not finished (status: {current['status']})")
     
     sets = await connection.fetch(
         """
@@ -40,35 +63,21 @@ async def process_match_result(connection: asyncpg.Connection, match_id: int) ->
     home_points = sum(s['home_team_score'] for s in sets)
     away_points = sum(s['away_team_score'] for s in sets)
     
-    home_sets = match['home_sets_won']
-    away_sets = match['away_sets_won']
+    home_delta, away_delta = match_outcome(match, home_points, away_points)
     
-    if match['winner_team_id'] == match['home_team_id']:
-        home_wins, away_wins = 1, 0
-        home_losses, away_losses = 0, 1
-        home_league_points, away_league_points = 3, 0
-    else:
-        home_wins, away_wins = 0, 1
-        home_losses, away_losses = 1, 0
-        home_league_points, away_league_points = 0, 3
-    
-    await update_team_standing(
-        connection,
-        match['season_id'],
-        match['home_team_id'],
-        home_wins, home_losses, home_sets, away_sets,
-        home_points, away_points, home_league_points
-    )
-    
-    await update_team_standing(
-        connection,
-        match['season_id'],
-        match['away_team_id'],
-        away_wins, away_losses, away_sets, home_sets,
-        away_points, home_points, away_league_points
-    )
+    # lowest team_id first, like bulk_upsert_team_standings, so A v B and B v A processed at the
+    # same time lock the two standings rows in the same order instead of deadlocking
+    for team_id, delta in sorted(((match['home_team_id'], home_delta), (match['away_team_id'], away_delta))):
+        await update_team_standing(
+            connection,
+            match['season_id'],
+            team_id,
+            delta['wins'], delta['losses'], delta['sets_won'], delta['sets_lost'],
+            delta['points_won'], delta['points_lost'], delta['league_points']
+        )
     
-    await update_match_status(connection, match_id, 'PROCESSED')
+    await append_standing_deltas(connection, match['season_id'], match_delta_entries(match, home_delta, away_delta))
+    await refresh_standings_projection(connection, match['season_id'])
     
     return MatchProcessingResult(
         match_id=match_id,
@@ -77,30 +86,180 @@ async def process_match_result(connection: asyncpg.Connection, match_id: int) ->
         away_team_id=match['away_team_id'],
         winner_team_id=match['winner_team_id'],
         home_updates=TeamStandingUpdate(
-            wins=home_wins,
-            sets=home_sets,
+            wins=home_delta['wins'],
+            sets=home_delta['sets_won'],
             points=home_points,
-            league_points=home_league_points
+            league_points=home_delta['league_points']
         ),
         away_updates=TeamStandingUpdate(
-            wins=away_wins,
-            sets=away_sets,
+            wins=away_delta['wins'],
+            sets=away_delta['sets_won'],
             points=away_points,
-            league_points=away_league_points
-        )
+            league_points=away_delta['league_points']
+        ),
+        match=MatchOut(**match)
+    )
+
+
+async def fetch_finished_matches(
+    connection: asyncpg.Connection,
+    season_id: int,
+    match_ids: Optional[List[int]] = None
+) -> List[asyncpg.Record]:
+    """
+    Every FINISHED match in a season with its set points already summed, in one query.
+    match_ids narrows it down to those matches (ones already locked by the caller).
+    """
+    return await connection.fetch(
+        """
+        SELECT m.match_id, m.season_id, m.home_team_id, m.away_team_id, m.match_datetime,
+               m.winner_team_id, m.home_sets_won, m.away_sets_won, m.status,
+               COALESCE(SUM(s.home_team_score), 0) AS home_points,
+               COALESCE(SUM(s.away_team_score), 0) AS away_points
+        FROM "Matches" m
+        LEFT JOIN "Sets" s ON s.match_id = m.match_id
+        WHERE m.season_id = $1 AND m.status = 'FINISHED'
+          AND ($2::int[] IS NULL OR m.match_id = ANY($2::int[]))
+        GROUP BY m.match_id
+        ORDER BY m.match_datetime
+        """,
+        season_id,
+        match_ids
+    )
+
+
+async def _apply_finished_matches(
+    connection: asyncpg.Connection,
+    season_id: int,
+    matches: List[asyncpg.Record]
+) -> Tuple[int, List[asyncpg.Record]]:
+    """
+    Fold matches into one delta per team, write them with one upsert, log each match's
+    deltas, mark the matches PROCESSED and refresh the projection. returns how many teams were
+    updated and the PROCESSED match rows.
+    """
+    for match in matches:
+        if match['winner_team_id'] is None:
+            raise ValueError(f"Match {match['match_id']} has no winner recorded")
+    
+    deltas = aggregate_team_deltas(matches)
+    await bulk_upsert_team_standings(connection, season_id, deltas)
+    await append_standing_deltas(
+        connection,
+        season_id,
+        [
+            entry
+            for match in matches
+            for entry in match_delta_entries(match, *match_outcome(match, match['home_points'], match['away_points']))
+        ]
     )
+    processed = await update_matches_status(connection, [m['match_id'] for m in matches], 'PROCESSED')
+    await refresh_standings_projection(connection, season_id)
+    return len(deltas), processed
+
 
+async def process_finished_matches(connection: asyncpg.Connection, season_id: int) -> Dict[str, Any]:
+    """
+    Process every FINISHED match in a season at once, for the end of a matchday.
 
-async def recalculate_season_standings(connection: asyncpg.Connection, season_id: int) -> Dict[str, Any]:
+    same totals as calling process_match_result per match, but the deltas are folded per team
+    in memory and written with one upsert, so each team's LeagueStandings row is locked and
+    written once instead of once per match it played. the matches are locked first (FOR UPDATE)
+    so a concurrent POST /matches/process cant count one of them twice. run inside a transaction.
+    'matches' in the result is the processed match rows, for the live score watchers.
+    """
+    locked = await connection.fetch(
+        """
+        SELECT match_id
+        FROM "Matches"
+        WHERE season_id = $1 AND status = 'FINISHED'
+        ORDER BY match_id
+        FOR UPDATE
+        """,
+        season_id
+    )
+    if not locked:
+        return {
+            'season_id': season_id,
+            'matches_processed': 0,
+            'teams_updated': 0,
+            'matches': []
+        }
+    
+    matches = await fetch_finished_matches(connection, season_id, [row['match_id'] for row in locked])
+    teams_updated, processed = await _apply_finished_matches(connection, season_id, matches)
+    
+    return {
+        'season_id': season_id,
+        'matches_processed': len(matches),
+        'teams_updated': teams_updated,
+        'matches': processed
+    }
+
+
+async def recalculate_season_standings(
+    connection: asyncpg.Connection,
+    season_id: int,
+    batched: bool = True
+) -> Dict[str, Any]:
     """
     Recalculates standings for an entire season from scratch.
     Useful for fixing inconsistencies or after data corrections.
+
+    batched (default) fetches the whole season once, folds it into one delta per team
+    and writes them with a single upsert, so its a handful of queries however long the season is.
+    batched=False replays process_match_result match by match (5 queries each), kept to cross check the batched path.
+    already PROCESSED matches are counted again along with the FINISHED ones. run inside a transaction.
     """
+    # lock the matches before any standings row, in match_id order, the same order every other
+    # processing path takes them in, so a concurrent process or retract finishes first instead of
+    # waiting on standings rows this holds
+    await connection.execute(
+        """
+        SELECT match_id
+        FROM "Matches"
+        WHERE season_id = $1 AND status IN ('FINISHED', 'PROCESSED')
+        ORDER BY match_id
+        FOR UPDATE
+        """,
+        season_id
+    )
     await connection.execute(
         'DELETE FROM "LeagueStandings" WHERE season_id = $1',
         season_id
     )
+    # a from scratch rebuild starts the delta log again too, so it keeps summing to LeagueStandings
+    await connection.execute(
+        'DELETE FROM "StandingDeltas" WHERE season_id = $1',
+        season_id
+    )
+    # every PROCESSED match goes back to FINISHED so both paths below count and log it again,
+    # otherwise it would drop out of the log and couldnt be retracted afterwards
+    await connection.execute(
+        """
+        UPDATE "Matches"
+        SET status = 'FINISHED'::game_states
+        WHERE season_id = $1 AND status = 'PROCESSED'
+        """,
+        season_id
+    )
     
+    if not batched:
+        result = await _recalculate_season_standings_incremental(connection, season_id)
+        await refresh_standings_projection(connection, season_id)
+        return result
+    
+    matches = await fetch_finished_matches(connection, season_id)
+    _, processed = await _apply_finished_matches(connection, season_id, matches)
+    
+    return {
+        'season_id': season_id,
+        'matches_processed': len(matches),
+        'matches': processed
+    }
+
+
+async def _recalculate_season_standings_incremental(connection: asyncpg.Connection, season_id: int) -> Dict[str, Any]:
     matches = await connection.fetch(
         """
         SELECT match_id
@@ -111,7 +270,7 @@ async def recalculate_season_standings(connection: asyncpg.Connection, season_id
         season_id
     )
     
-    processed_count = 0
+    processed = []
     for match in matches:
         await connection.execute(
             """
@@ -122,12 +281,84 @@ async def recalculate_season_standings(connection: asyncpg.Connection, season_id
             match['match_id']
         )
         
-        await process_match_result(connection, match['match_id'])
-        processed_count += 1
+        result = await process_match_result(connection, match['match_id'])
+        processed.append(result.match.model_dump())
     
     return {
         'season_id': season_id,
-        'matches_processed': processed_count
+        'matches_processed': len(processed),
+        'matches': processed
+    }
+
+
+async def retract_match_result(connection: asyncpg.Connection, match_id: int) -> Dict[str, Any]:
+    """
+    Take a processed match back out of the standings so its result can be corrected.
+
+    sums what the match currently contributes from the StandingDeltas log, appends the negation
+    as RETRACT rows and subtracts it from LeagueStandings, then puts the match back to
+    SCHEDULED (UNSCHEDULED if it has no date) with no winner so its sets can be replaced.
+    only this match is touched, no season rebuild. run inside a transaction. the result's
+    'match' is the reopened match row.
+    raises LookupError if the match doesnt exist, ValueError if it isnt PROCESSED.
+    """
+    match = await connection.fetchrow(
+        """
+        SELECT match_id, season_id, match_datetime, status
+        FROM "Matches"
+        WHERE match_id = $1
+        FOR UPDATE
+        """,
+        match_id
+    )
+    if not match:
+        raise LookupError(f"Match {match_id} not found")
+    if match['status'] != 'PROCESSED':
+        raise ValueError(f"Match {match_id} has not been processed (status: {match['status']})")
+    
+    net_rows = await connection.fetch(
+        """
+        SELECT match_id, team_id, MAX(match_datetime) AS match_datetime,
+               SUM(matches_played)::int AS matches_played, SUM(wins)::int AS wins,
+               SUM(losses)::int AS losses, SUM(sets_won)::int AS sets_won,
+               SUM(sets_lost)::int AS sets_lost, SUM(points_won)::int AS points_won,
+               SUM(points_lost)::int AS points_lost, SUM(league_points)::int AS league_points
+        FROM "StandingDeltas"
+        WHERE match_id = $1
+        GROUP BY match_id, team_id
+        HAVING SUM(matches_played) <> 0
+        """,
+        match_id
+    )
+    if not net_rows:
+        raise ValueError(f"Match {match_id} has no standings deltas to retract, recalculate the season instead")
+    
+    entries = retraction_entries(net_rows)
+    await append_standing_deltas(connection, match['season_id'], entries, kind='RETRACT')
+    await bulk_upsert_team_standings(
+        connection,
+        match['season_id'],
+        {entry['team_id']: entry for entry in entries}
+    )
+    reopened = await connection.fetchrow(
+        f"""
+        UPDATE "Matches"
+        SET status = CASE WHEN match_datetime IS NULL THEN 'UNSCHEDULED' ELSE 'SCHEDULED' END::game_states,
+            winner_team_id = NULL,
+            home_sets_won = 0,
+            away_sets_won = 0
+        WHERE match_id = $1
+        RETURNING {MATCH_COLUMNS}
+        """,
+        match_id
+    )
+    await refresh_standings_projection(connection, match['season_id'])
+    
+    return {
+        'match_id': match_id,
+        'season_id': match['season_id'],
+        'teams_updated': len(entries),
+        'match': reopened
     }
 
 
@@ -151,6 +382,7 @@ async def initialise_season_standings(connection: asyncpg.Connection, season_id:
         """,
         season_id
     )
+    await refresh_standings_projection(connection, season_id)
     
     #extract number of rows inserted from result string like "INSERT 0 3"
     #kinda for debugging but has some actual use
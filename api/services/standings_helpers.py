@@ -1,4 +1,16 @@
+import datetime
 import asyncpg
+from typing import Dict, Iterable, List, Mapping, Sequence, Tuple
+from api.services.queries import MATCH_COLUMNS
+
+
+STANDING_FIELDS = (
+    "matches_played", "wins", "losses", "sets_won", "sets_lost",
+    "points_won", "points_lost", "league_points",
+)
+
+# best of five, first to 3 sets
+SETS_TO_WIN = 3
 
 
 async def update_team_standing(
@@ -47,3 +59,400 @@ async def update_match_status(connection: asyncpg.Connection, match_id: int, sta
         """,
         status, match_id
     )
+
+
+def summarise_sets(sets: Sequence[Mapping]) -> Tuple[int, int]:
+    """
+    Check a full list of sets is a complete best of five and return (home_sets_won, away_sets_won).
+    sets need set_number, home_team_score and away_team_score. raises ValueError if not, same
+    rules as the enforce_set_rules / finalize_match_on_finish triggers so a bad result is
+    rejected before anything is written.
+    """
+    numbers = sorted(s['set_number'] for s in sets)
+    if numbers != list(range(1, len(sets) + 1)):
+        raise ValueError("Set numbers must run 1, 2, 3... with no gaps or repeats")
+
+    home_sets_won = away_sets_won = 0
+    for s in sorted(sets, key=lambda s: s['set_number']):
+        if home_sets_won == SETS_TO_WIN or away_sets_won == SETS_TO_WIN:
+            raise ValueError(f"Set {s['set_number']} was played after the match was already won")
+        if s['home_team_score'] < 0 or s['away_team_score'] < 0:
+            raise ValueError(f"Set {s['set_number']} has a negative score")
+        if s['home_team_score'] == s['away_team_score']:
+            raise ValueError(f"Set {s['set_number']} is a draw")
+        if s['home_team_score'] > s['away_team_score']:
+            home_sets_won += 1
+        else:
+            away_sets_won += 1
+
+    if SETS_TO_WIN not in (home_sets_won, away_sets_won):
+        raise ValueError(f"Match is not finished, one team must win {SETS_TO_WIN} sets")
+    return home_sets_won, away_sets_won
+
+
+def match_outcome(match: Mapping, home_points: int, away_points: int) -> Tuple[Dict[str, int], Dict[str, int]]:
+    """
+    Work out what one finished match adds to each team's standing.
+    returns (home_delta, away_delta) keyed by STANDING_FIELDS.
+    3 points for a win, 0 for a loss same as process_match_result always did
+    """
+    home_sets = match['home_sets_won']
+    away_sets = match['away_sets_won']
+    home_won = match['winner_team_id'] == match['home_team_id']
+
+    home_delta = {
+        "matches_played": 1,
+        "wins": 1 if home_won else 0,
+        "losses": 0 if home_won else 1,
+        "sets_won": home_sets,
+        "sets_lost": away_sets,
+        "points_won": home_points,
+        "points_lost": away_points,
+        "league_points": 3 if home_won else 0,
+    }
+    away_delta = {
+        "matches_played": 1,
+        "wins": 0 if home_won else 1,
+        "losses": 1 if home_won else 0,
+        "sets_won": away_sets,
+        "sets_lost": home_sets,
+        "points_won": away_points,
+        "points_lost": home_points,
+        "league_points": 0 if home_won else 3,
+    }
+    return home_delta, away_delta
+
+
+def aggregate_team_deltas(matches: Iterable[Mapping]) -> Dict[int, Dict[str, int]]:
+    """
+    Fold a batch of finished matches into one standing delta per team.
+    each match needs the Matches columns plus home_points/away_points (summed from its Sets).
+    Gives the same totals as running process_match_result on each match one by one.
+    """
+    totals: Dict[int, Dict[str, int]] = {}
+    for match in matches:
+        home_delta, away_delta = match_outcome(match, match['home_points'], match['away_points'])
+        for team_id, delta in ((match['home_team_id'], home_delta), (match['away_team_id'], away_delta)):
+            team_total = totals.get(team_id)
+            if team_total is None:
+                totals[team_id] = dict(delta)
+            else:
+                for field in STANDING_FIELDS:
+                    team_total[field] += delta[field]
+    return totals
+
+
+async def bulk_upsert_team_standings(
+    connection: asyncpg.Connection,
+    season_id: int,
+    deltas: Mapping[int, Mapping[str, int]]
+) -> None:
+    """
+    Add every team's delta onto LeagueStandings with a single statement.
+    the columns are sent as arrays and unnested server side so its one round trip however many teams.
+    rows are written (and locked) in team_id order, the same order process_match_result uses, so
+    two transactions touching the same teams wait on each other instead of deadlocking.
+    """
+    if not deltas:
+        return
+
+    team_ids = sorted(deltas)
+    columns: List[List[int]] = [[deltas[team_id][field] for team_id in team_ids] for field in STANDING_FIELDS]
+
+    await connection.execute(
+        """
+        INSERT INTO "LeagueStandings"
+        (season_id, team_id, matches_played, wins, losses,
+         sets_won, sets_lost, points_won, points_lost, league_points)
+        SELECT $1, d.team_id, d.matches_played, d.wins, d.losses,
+               d.sets_won, d.sets_lost, d.points_won, d.points_lost, d.league_points
+        FROM unnest($2::int[], $3::int[], $4::int[], $5::int[], $6::int[],
+                    $7::int[], $8::int[], $9::int[], $10::int[])
+             AS d(team_id, matches_played, wins, losses, sets_won,
+                  sets_lost, points_won, points_lost, league_points)
+        ON CONFLICT (season_id, team_id)
+        DO UPDATE SET
+            matches_played = "LeagueStandings".matches_played + EXCLUDED.matches_played,
+            wins = "LeagueStandings".wins + EXCLUDED.wins,
+            losses = "LeagueStandings".losses + EXCLUDED.losses,
+            sets_won = "LeagueStandings".sets_won + EXCLUDED.sets_won,
+            sets_lost = "LeagueStandings".sets_lost + EXCLUDED.sets_lost,
+            points_won = "LeagueStandings".points_won + EXCLUDED.points_won,
+            points_lost = "LeagueStandings".points_lost + EXCLUDED.points_lost,
+            league_points = "LeagueStandings".league_points + EXCLUDED.league_points
+        """,
+        season_id, team_ids, *columns
+    )
+
+
+def match_delta_entries(match: Mapping, home_delta: Mapping[str, int], away_delta: Mapping[str, int]) -> List[Dict]:
+    """The two StandingDeltas rows (home, away) for one match, as dicts for append_standing_deltas."""
+    return [
+        {
+            'match_id': match['match_id'],
+            'team_id': team_id,
+            'match_datetime': match['match_datetime'],
+            **{field: delta[field] for field in STANDING_FIELDS},
+        }
+        for team_id, delta in ((match['home_team_id'], home_delta), (match['away_team_id'], away_delta))
+    ]
+
+
+def retraction_entries(net_rows: Iterable[Mapping]) -> List[Dict]:
+    """
+    Negate what a match currently contributes (its APPLY rows minus anything already retracted,
+    one row per team) so appending these cancels it out.
+    """
+    return [
+        {
+            'match_id': row['match_id'],
+            'team_id': row['team_id'],
+            'match_datetime': row['match_datetime'],
+            **{field: -row[field] for field in STANDING_FIELDS},
+        }
+        for row in net_rows
+    ]
+
+
+async def append_standing_deltas(
+    connection: asyncpg.Connection,
+    season_id: int,
+    entries: Sequence[Mapping],
+    kind: str = 'APPLY'
+) -> None:
+    """
+    Append rows to the StandingDeltas log in one statement. entries need match_id, team_id,
+    match_datetime and STANDING_FIELDS. the log is append only, a correction adds RETRACT rows.
+    """
+    if not entries:
+        return
+
+    columns: List[List[int]] = [[entry[field] for entry in entries] for field in STANDING_FIELDS]
+    await connection.execute(
+        """
+        INSERT INTO "StandingDeltas"
+        (season_id, match_id, team_id, match_datetime, kind, matches_played, wins, losses,
+         sets_won, sets_lost, points_won, points_lost, league_points)
+        SELECT $1, d.match_id, d.team_id, d.match_datetime, $2, d.matches_played, d.wins, d.losses,
+               d.sets_won, d.sets_lost, d.points_won, d.points_lost, d.league_points
+        FROM unnest($3::int[], $4::int[], $5::timestamp[], $6::int[], $7::int[], $8::int[],
+                    $9::int[], $10::int[], $11::int[], $12::int[], $13::int[])
+             AS d(match_id, team_id, match_datetime, matches_played, wins, losses,
+                  sets_won, sets_lost, points_won, points_lost, league_points)
+        """,
+        season_id,
+        kind,
+        [entry['match_id'] for entry in entries],
+        [entry['team_id'] for entry in entries],
+        [entry['match_datetime'] for entry in entries],
+        *columns
+    )
+
+
+async def update_matches_status(connection: asyncpg.Connection, match_ids: List[int], status: str) -> List[asyncpg.Record]:
+    """Update the status of many matches in one statement. returns the updated rows (MatchOut columns)."""
+    if not match_ids:
+        return []
+    return await connection.fetch(
+        f"""
+        UPDATE "Matches"
+        SET status = $1::game_states
+        WHERE match_id = ANY($2::int[])
+        RETURNING {MATCH_COLUMNS}
+        """,
+        status, match_ids
+    )
+
+
+async def refresh_standings_projection(connection: asyncpg.Connection, season_id: int) -> None:
+    """
+    Rebuild the StandingsProjection rows for a season from LeagueStandings.
+
+    the ranking (ROW_NUMBER), diffs and team name join get done once here on write
+    instead of on every standings read. takes a per season advisory lock so two matches
+    from the same season being processed at once cant interleave the delete and insert.
+    """
+    async with connection.transaction():
+        await connection.execute(
+            "SELECT pg_advisory_xact_lock(hashtext('StandingsProjection'), $1)",
+            season_id
+        )
+        await connection.execute(
+            'DELETE FROM "StandingsProjection" WHERE season_id = $1',
+            season_id
+        )
+        await connection.execute(
+            """
+            INSERT INTO "StandingsProjection"
+            (season_id, position, standing_id, team_id, team_name,
+             matches_played, wins, losses, sets_won, sets_lost, set_diff,
+             points_won, points_lost, point_diff, league_points)
+            SELECT
+                ls.season_id,
+                ROW_NUMBER() OVER (
+                    ORDER BY ls.league_points DESC,
+                    (ls.sets_won - ls.sets_lost) DESC,
+                    (ls.points_won - ls.points_lost) DESC,
+                    ls.team_id
+                ),
+                ls.standing_id,
+                ls.team_id,
+                t.name,
+                ls.matches_played,
+                ls.wins,
+                ls.losses,
+                ls.sets_won,
+                ls.sets_lost,
+                ls.sets_won - ls.sets_lost,
+                ls.points_won,
+                ls.points_lost,
+                ls.points_won - ls.points_lost,
+                ls.league_points
+            FROM "LeagueStandings" ls
+            JOIN "Teams" t ON ls.team_id = t.team_id
+            WHERE ls.season_id = $1
+            """,
+            season_id
+        )
+
+
+# one row per team per finished match in a season, worked out from the match and its sets with
+# the same arithmetic as match_outcome. processed or not, so a result counts as soon as its final.
+# {where} narrows the matches further
+_TEAM_MATCH_RESULTS = """
+    SELECT r.team_id, m.match_datetime,
+           1 AS matches_played,
+           (r.team_id = m.winner_team_id)::int AS wins,
+           (r.team_id <> m.winner_team_id)::int AS losses,
+           r.sets_won, r.sets_lost, r.points_won, r.points_lost,
+           CASE WHEN r.team_id = m.winner_team_id THEN 3 ELSE 0 END AS league_points
+    FROM "Matches" m
+    LEFT JOIN LATERAL (
+        SELECT COALESCE(SUM(home_team_score), 0) AS home_points,
+               COALESCE(SUM(away_team_score), 0) AS away_points
+        FROM "Sets"
+        WHERE match_id = m.match_id
+    ) s ON true
+    CROSS JOIN LATERAL (VALUES
+        (m.home_team_id, m.home_sets_won, m.away_sets_won, s.home_points, s.away_points),
+        (m.away_team_id, m.away_sets_won, m.home_sets_won, s.away_points, s.home_points)
+    ) AS r(team_id, sets_won, sets_lost, points_won, points_lost)
+    WHERE m.season_id = $1
+      AND m.status IN ('FINISHED', 'PROCESSED')
+      AND m.winner_team_id IS NOT NULL
+      {where}
+"""
+
+# cumulative totals ranked the same way as refresh_standings_projection.
+# every team in the season is listed, teams with nothing played yet come out as zeros
+_RANKED_TOTALS = """
+    ROW_NUMBER() OVER (
+        PARTITION BY {p}{partition}
+        ORDER BY {p}league_points DESC, ({p}sets_won - {p}sets_lost) DESC,
+                 ({p}points_won - {p}points_lost) DESC, {p}team_id
+    ) AS position
+"""
+
+STANDINGS_AS_OF_QUERY = f"""
+    WITH results AS (
+        {_TEAM_MATCH_RESULTS.format(where="AND m.match_datetime < $2")}
+    ),
+    totals AS (
+        SELECT st.season_id, st.team_id, t.name AS team_name,
+               COALESCE(SUM(r.matches_played), 0)::int AS matches_played,
+               COALESCE(SUM(r.wins), 0)::int AS wins,
+               COALESCE(SUM(r.losses), 0)::int AS losses,
+               COALESCE(SUM(r.sets_won), 0)::int AS sets_won,
+               COALESCE(SUM(r.sets_lost), 0)::int AS sets_lost,
+               COALESCE(SUM(r.points_won), 0)::int AS points_won,
+               COALESCE(SUM(r.points_lost), 0)::int AS points_lost,
+               COALESCE(SUM(r.league_points), 0)::int AS league_points
+        FROM "SeasonTeams" st
+        JOIN "Teams" t ON t.team_id = st.team_id
+        LEFT JOIN results r ON r.team_id = st.team_id
+        WHERE st.season_id = $1
+        GROUP BY st.season_id, st.team_id, t.name
+    )
+    SELECT NULL::int AS standing_id, season_id, team_id, team_name,
+           matches_played, wins, losses, sets_won, sets_lost,
+           sets_won - sets_lost AS set_diff,
+           points_won, points_lost,
+           points_won - points_lost AS point_diff,
+           league_points,
+           {_RANKED_TOTALS.format(p="", partition="season_id")}
+    FROM totals
+    ORDER BY position
+"""
+
+STANDINGS_TIMELINE_QUERY = f"""
+    WITH weekly AS (
+        SELECT team_id, date_trunc('week', match_datetime)::date AS week_start,
+               SUM(matches_played) AS matches_played, SUM(wins) AS wins, SUM(losses) AS losses,
+               SUM(sets_won) AS sets_won, SUM(sets_lost) AS sets_lost,
+               SUM(points_won) AS points_won, SUM(points_lost) AS points_lost,
+               SUM(league_points) AS league_points
+        FROM ({_TEAM_MATCH_RESULTS.format(where="AND m.match_datetime IS NOT NULL")}) results
+        GROUP BY team_id, week_start
+    ),
+    grid AS (
+        SELECT w.week_start, st.team_id
+        FROM (SELECT DISTINCT week_start FROM weekly) w
+        CROSS JOIN "SeasonTeams" st
+        WHERE st.season_id = $1
+    ),
+    cumulative AS (
+        SELECT g.week_start, g.team_id,
+               (SUM(COALESCE(wk.matches_played, 0)) OVER team_weeks)::int AS matches_played,
+               (SUM(COALESCE(wk.wins, 0)) OVER team_weeks)::int AS wins,
+               (SUM(COALESCE(wk.losses, 0)) OVER team_weeks)::int AS losses,
+               (SUM(COALESCE(wk.sets_won, 0)) OVER team_weeks)::int AS sets_won,
+               (SUM(COALESCE(wk.sets_lost, 0)) OVER team_weeks)::int AS sets_lost,
+               (SUM(COALESCE(wk.points_won, 0)) OVER team_weeks)::int AS points_won,
+               (SUM(COALESCE(wk.points_lost, 0)) OVER team_weeks)::int AS points_lost,
+               (SUM(COALESCE(wk.league_points, 0)) OVER team_weeks)::int AS league_points
+        FROM grid g
+        LEFT JOIN weekly wk ON wk.week_start = g.week_start AND wk.team_id = g.team_id
+        WINDOW team_weeks AS (PARTITION BY g.team_id ORDER BY g.week_start)
+    )
+    SELECT c.week_start, NULL::int AS standing_id, $1::int AS season_id, c.team_id, t.name AS team_name,
+           c.matches_played, c.wins, c.losses, c.sets_won, c.sets_lost,
+           c.sets_won - c.sets_lost AS set_diff,
+           c.points_won, c.points_lost,
+           c.points_won - c.points_lost AS point_diff,
+           c.league_points,
+           {_RANKED_TOTALS.format(p="c.", partition="week_start")}
+    FROM cumulative c
+    JOIN "Teams" t ON t.team_id = c.team_id
+    ORDER BY c.week_start, position
+"""
+
+
+async def fetch_standings_as_of(connection: asyncpg.Connection, season_id: int, before: datetime.datetime) -> List[asyncpg.Record]:
+    """
+    Standings as they were counting only matches played before `before`, computed from the
+    FINISHED and PROCESSED matches and their sets, so a result counts as soon as its final
+    (a retracted match is reopened, so it drops out). matches with no match_datetime cant be
+    placed in time so they are left out. rows have the StandingOut columns, ordered by position.
+    """
+    return await connection.fetch(STANDINGS_AS_OF_QUERY, season_id, before)
+
+
+async def fetch_standings_timeline(connection: asyncpg.Connection, season_id: int) -> List[asyncpg.Record]:
+    """
+    Cumulative standings at the end of every week (round) that had a finished match, in one
+    query: the match results are bucketed per team per week, a running SUM() OVER each team gives
+    the totals after that week and ROW_NUMBER() OVER each week ranks them. undated matches are
+    left out like in fetch_standings_as_of.
+    rows are StandingOut columns plus week_start, ordered by week_start then position.
+    """
+    return await connection.fetch(STANDINGS_TIMELINE_QUERY, season_id)
+
+
+def group_timeline(rows: Iterable[Mapping]) -> List[Dict]:
+    """Turn fetch_standings_timeline rows into [{round, week_start, standings: [...]}] in week order."""
+    rounds: List[Dict] = []
+    for row in rows:
+        if not rounds or rounds[-1]['week_start'] != row['week_start']:
+            rounds.append({'round': len(rounds) + 1, 'week_start': row['week_start'], 'standings': []})
+        rounds[-1]['standings'].append({key: value for key, value in row.items() if key != 'week_start'})
+    return rounds
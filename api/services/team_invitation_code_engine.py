@@ -3,6 +3,8 @@ import hashlib
 from datetime import datetime, timezone
 import os
 
+from api.services.daily_code_index import DailyCodeIndex
+
 
 class TeamInvitationCodeEngine:
     """Generate and validate daily 6-digit invitation codes based on team ID."""
@@ -15,7 +17,11 @@ class TeamInvitationCodeEngine:
     @staticmethod
     def generate_code(team_id: int) -> str:
         today = datetime.now(timezone.utc).strftime("%Y-%m-%d")
-        message = f"{team_id}:{today}"
+        return TeamInvitationCodeEngine.code_for_date(team_id, today)
+
+    @staticmethod
+    def code_for_date(team_id: int, date_str: str) -> str:
+        message = f"{team_id}:{date_str}"
 
         signature = hmac.new(
             TeamInvitationCodeEngine.SECRET_KEY.encode(),
@@ -34,3 +40,12 @@ class TeamInvitationCodeEngine:
         except Exception as e:
             print("Exeption:" + str(e))
             return False
+
+
+# code -> team_id map for today, rebuilt lazily at the UTC rollover, patched on team creation and
+# caught up on a miss with teams created by other workers
+team_invitation_code_index = DailyCodeIndex(
+    TeamInvitationCodeEngine.code_for_date,
+    'SELECT team_id FROM "Teams";',
+    'SELECT team_id FROM "Teams" WHERE team_id > $1;',
+)
@@ -0,0 +1,116 @@
+"""
+Benchmark for fixture persistence in generate_fixtures.
+
+Compares the old one INSERT per match loop against insert_fixtures (single
+unnest insert) for 10/20/40 team double round robins. Everything runs inside
+a transaction that is rolled back, so the database is left untouched.
+
+Run:
+    python3 api/tests/bench_fixture_insertion.py
+"""
+
+import asyncio
+import datetime
+import os
+import sys
+import time
+
+import asyncpg
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from api.config.database import get_pg_dsn
+from api.services.fixture_generator import generate_round_robin, assign_match_dates
+from api.services.fixture_helpers import insert_fixtures, DEFAULT_KICKOFF
+
+
+TEAM_COUNTS = (10, 20, 40)
+REPEATS = 3
+
+
+async def _create_scratch_season(connection, team_count: int):
+    """Throwaway user/league/season/teams, only ever created inside a rolled back transaction."""
+    user_id = await connection.fetchval(
+        """
+        INSERT INTO "Users" (username, hashed_password, email, role)
+        VALUES ('bench_fixture_user', 'x', 'bench_fixture_user@example.com', 'ADMIN')
+        RETURNING user_id
+        """
+    )
+    league_id = await connection.fetchval(
+        'INSERT INTO "Leagues" (name, admin_user_id) VALUES ($1, $2) RETURNING league_id',
+        "Bench League", user_id,
+    )
+    season_id = await connection.fetchval(
+        """
+        INSERT INTO "Seasons" (league_id, name, start_date, end_date)
+        VALUES ($1, 'Bench Season', CURRENT_DATE, CURRENT_DATE + 365)
+        RETURNING season_id
+        """,
+        league_id,
+    )
+    team_rows = await connection.fetch(
+        """
+        INSERT INTO "Teams" (name, created_by_user_id, home_ground)
+        SELECT 'Bench Team ' || n, $1, 'Hall ' || n FROM generate_series(1, $2) AS n
+        RETURNING team_id, home_ground
+        """,
+        user_id, team_count,
+    )
+    return season_id, {row['team_id']: row['home_ground'] for row in team_rows}
+
+
+async def _insert_row_by_row(connection, season_id, scheduled_matches, team_home_grounds):
+    for match in scheduled_matches:
+        await connection.execute(
+            """
+            INSERT INTO "Matches"
+            (season_id, home_team_id, away_team_id, match_datetime, venue, status)
+            VALUES ($1, $2, $3, $4, $5, $6::game_states)
+            """,
+            season_id,
+            match['team_a_id'],
+            match['team_b_id'],
+            datetime.datetime.combine(match['match_date'], DEFAULT_KICKOFF),
+            team_home_grounds.get(match['team_a_id']),
+            match['status'],
+        )
+
+
+async def _time_insert(connection, insert, team_count: int) -> float:
+    best = float("inf")
+    for _ in range(REPEATS):
+        tr = connection.transaction()
+        await tr.start()
+        try:
+            season_id, home_grounds = await _create_scratch_season(connection, team_count)
+            matches = generate_round_robin(list(home_grounds), double=True)
+            scheduled = assign_match_dates(matches, datetime.date.today())
+
+            start = time.perf_counter()
+            await insert(connection, season_id, scheduled, home_grounds)
+            best = min(best, time.perf_counter() - start)
+        finally:
+            await tr.rollback()
+    return best
+
+
+async def main():
+    connection = await asyncpg.connect(**get_pg_dsn())
+    try:
+        print("=" * 60)
+        print("FIXTURE INSERTION BENCHMARK (double round robin, best of 3)")
+        print("=" * 60)
+        print(f"{'teams':>6} {'matches':>8} {'row by row':>12} {'unnest':>10} {'speedup':>8}")
+        for team_count in TEAM_COUNTS:
+            match_count = team_count * (team_count - 1)
+            row_by_row = await _time_insert(connection, _insert_row_by_row, team_count)
+            bulk = await _time_insert(connection, insert_fixtures, team_count)
+            print(f"{team_count:>6} {match_count:>8} {row_by_row * 1000:>10.1f}ms "
+                  f"{bulk * 1000:>8.1f}ms {row_by_row / bulk:>7.1f}x")
+    finally:
+        await connection.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
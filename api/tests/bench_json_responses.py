@@ -0,0 +1,133 @@
+"""
+Benchmark for sending a big list response: throughput and peak memory.
+
+Sends 100k team rows (dicts standing in for asyncpg Records) through a fake ASGI server three ways:
+  - what fastapi's default did: a TeamOut per row, jsonable_encoder, JSONResponse (json.dumps)
+  - FastJSONResponse, the app's default class now, over model_rows (orjson when installed)
+  - list_response, streamed STREAM_CHUNK_ROWS rows at a time
+Each variant runs in its own process so its peak RSS (ru_maxrss) isnt hidden by another's.
+Reported as body MB/s and how far peak RSS rose above the RSS with the rows loaded.
+
+No database or server needed.
+
+Run:
+    python3 api/tests/bench_json_responses.py
+"""
+
+import asyncio
+import datetime
+import os
+import resource
+import subprocess
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+from api.models import TeamOut
+from api.services import serialization
+from api.services.serialization import FastJSONResponse, list_response, model_rows
+
+
+ROWS = 100_000
+
+
+def _team_rows():
+    created = datetime.datetime(2024, 1, 1, 12, 0)
+    return [
+        {
+            "team_id": i,
+            "name": f"Team {i}",
+            "created_by_user_id": 1 + i % 50,
+            "logo_url": f"https://cdn.example.com/logos/{i}.png" if i % 2 else None,
+            "home_ground": f"Sports Hall {i % 40}",
+            "created_at": created + datetime.timedelta(minutes=i),
+        }
+        for i in range(ROWS)
+    ]
+
+
+def _stdlib_default(rows):
+    return JSONResponse(jsonable_encoder([TeamOut(**row) for row in rows]))
+
+
+def _fast_default(rows):
+    return FastJSONResponse(model_rows(TeamOut, rows))
+
+
+def _streamed(rows):
+    return list_response(TeamOut, rows)
+
+
+VARIANTS = {
+    "JSONResponse + jsonable_encoder": _stdlib_default,
+    "FastJSONResponse + model_rows": _fast_default,
+    "list_response (streamed)": _streamed,
+}
+
+
+async def _send(response) -> int:
+    """Run the response as ASGI like uvicorn would, dropping each chunk once sent. returns body bytes."""
+    sent = 0
+
+    async def receive():
+        return {"type": "http.disconnect"}
+
+    async def send(message):
+        nonlocal sent
+        if message["type"] == "http.response.body":
+            sent += len(message.get("body", b""))
+
+    await response({"type": "http", "method": "GET", "path": "/teams"}, receive, send)
+    return sent
+
+
+def _current_rss_kb() -> int:
+    with open("/proc/self/statm") as statm:
+        return int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") // 1024
+
+
+def _run_variant(name: str) -> None:
+    """Child process: build the rows, send one response, print seconds, bytes, rss growth in KB."""
+    rows = _team_rows()
+    _run = VARIANTS[name]
+    # warm up (model field cache, pydantic validators) on a few rows
+    asyncio.run(_send(_run(rows[:10])))
+    baseline = max(_current_rss_kb(), resource.getrusage(resource.RUSAGE_SELF).ru_maxrss)
+
+    start = time.perf_counter()
+    sent = asyncio.run(_send(_run(rows)))
+    elapsed = time.perf_counter() - start
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    print(elapsed, sent, max(peak - baseline, 0))
+
+
+def main():
+    print("=" * 60)
+    print(f"LIST RESPONSE BENCHMARK ({ROWS} rows, one process per variant)")
+    print("=" * 60)
+    print(f"orjson {'installed' if serialization.orjson is not None else 'missing, stdlib json fallback'}\n")
+
+    results = {}
+    for name in VARIANTS:
+        output = subprocess.run(
+            [sys.executable, os.path.abspath(__file__), "--variant", name],
+            check=True, capture_output=True, text=True
+        ).stdout.split()
+        elapsed, sent, rss_kb = float(output[0]), int(output[1]), int(output[2])
+        results[name] = sent
+        print(f"{name}:")
+        print(f"  {elapsed * 1000:8.1f}ms  {sent / elapsed / 1e6:8.1f} MB/s  peak RSS +{rss_kb / 1024:.1f} MB")
+
+    assert len(set(results.values())) == 1, f"Variants sent different sized bodies: {results}"
+    print(f"\n✓ Every variant sent the same {next(iter(results.values()))} bytes")
+
+
+if __name__ == "__main__":
+    if len(sys.argv) == 3 and sys.argv[1] == "--variant":
+        _run_variant(sys.argv[2])
+    else:
+        main()
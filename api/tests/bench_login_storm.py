@@ -0,0 +1,93 @@
+"""
+Benchmark for password hashing under a login storm.
+
+Fires a burst of concurrent bcrypt verifications (what /api/login does) while a probe
+coroutine stands in for every other endpoint: it repeatedly awaits a 5ms sleep and records
+how late it actually woke up. Run once with bcrypt called inline on the event loop (the old
+behaviour) and once through AuthUtils.verify_password_async (the password thread pool).
+If the pool is doing its job the probe's p99 stays flat; inline it grows by whole bcrypt calls.
+
+No database or server needed.
+
+Run:
+    python3 api/tests/bench_login_storm.py
+"""
+
+import asyncio
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from fastapi import HTTPException
+
+from api.auth import AuthUtils
+from api.auth.password_pool import PASSWORD_HASH_WORKERS, PASSWORD_HASH_MAX_QUEUE, shutdown_password_executor
+
+
+LOGINS = 100
+PROBE_INTERVAL = 0.005
+
+
+async def _probe(stop: asyncio.Event, lags: list):
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(PROBE_INTERVAL)
+        lags.append((time.perf_counter() - start - PROBE_INTERVAL) * 1000)
+
+
+async def _inline_login(password: str, hashed: str):
+    # what login did before, bcrypt straight on the event loop
+    AuthUtils.verify_password(password, hashed)
+
+
+async def _pooled_login(password: str, hashed: str):
+    await AuthUtils.verify_password_async(password, hashed)
+
+
+async def _storm(login, hashed: str) -> dict:
+    stop = asyncio.Event()
+    lags = []
+    probe = asyncio.create_task(_probe(stop, lags))
+    await asyncio.sleep(PROBE_INTERVAL * 4)
+
+    start = time.perf_counter()
+    results = await asyncio.gather(
+        *(login("storm_password", hashed) for _ in range(LOGINS)),
+        return_exceptions=True,
+    )
+    elapsed = time.perf_counter() - start
+
+    stop.set()
+    await probe
+
+    shed = sum(1 for r in results if isinstance(r, HTTPException) and r.status_code == 503)
+    lags.sort()
+    return {
+        "elapsed": elapsed,
+        "shed": shed,
+        "p50": statistics.median(lags),
+        "p99": lags[int(len(lags) * 0.99) - 1] if len(lags) > 1 else lags[0],
+        "max": lags[-1],
+    }
+
+
+async def main():
+    hashed = AuthUtils.hash_password("storm_password")
+
+    print("=" * 60)
+    print(f"LOGIN STORM BENCHMARK ({LOGINS} concurrent logins, "
+          f"{PASSWORD_HASH_WORKERS} workers, queue {PASSWORD_HASH_MAX_QUEUE})")
+    print("=" * 60)
+    print(f"{'mode':>8} {'total':>9} {'shed 503':>9} {'probe p50':>10} {'probe p99':>10} {'probe max':>10}")
+    for name, login in (("inline", _inline_login), ("pooled", _pooled_login)):
+        r = await _storm(login, hashed)
+        print(f"{name:>8} {r['elapsed']:>8.2f}s {r['shed']:>9} {r['p50']:>8.1f}ms {r['p99']:>8.1f}ms {r['max']:>8.1f}ms")
+
+    shutdown_password_executor()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
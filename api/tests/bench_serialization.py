@@ -0,0 +1,117 @@
+"""
+Benchmark for turning database rows into a JSON list response.
+
+Serialises 10k match rows (dicts standing in for asyncpg Records) three ways:
+  - a MatchOut per row, then what fastapi does with response_model (validate the list again,
+    dump to plain data, json.dumps). what every list endpoint did before
+  - one TypeAdapter over List[MatchOut] validating and dumping the whole list in pydantic-core
+  - model_rows + dump_json (api/services/serialization.py), no validation, orjson
+and checks all three produce the same JSON. Same for 10k standings rows.
+
+No database or server needed.
+
+Run:
+    python3 api/tests/bench_serialization.py
+"""
+
+import datetime
+import json
+import os
+import sys
+import time
+from typing import List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from pydantic import TypeAdapter
+
+from api.models import MatchOut, StandingOut
+from api.services import serialization
+from api.services.serialization import dump_json, model_rows
+
+
+ROWS = 10_000
+REPEATS = 5
+
+
+def _match_rows():
+    start = datetime.datetime(2025, 9, 1, 19, 30)
+    return [
+        {
+            "match_id": i,
+            "season_id": 1 + i // 380,
+            "home_team_id": i % 20,
+            "away_team_id": (i + 7) % 20,
+            "match_datetime": start + datetime.timedelta(days=i // 10) if i % 50 else None,
+            "venue": f"Sports Hall {i % 12}" if i % 3 else None,
+            "status": "PROCESSED",
+            "winner_team_id": i % 20,
+            "home_sets_won": 3,
+            "away_sets_won": i % 3,
+        }
+        for i in range(ROWS)
+    ]
+
+
+def _standing_rows():
+    return [
+        {
+            "standing_id": i, "season_id": 1 + i // 20, "team_id": i, "team_name": f"Team {i}",
+            "matches_played": 38, "wins": 20, "losses": 18, "sets_won": 70, "sets_lost": 60,
+            "set_diff": 10, "points_won": 3000, "points_lost": 2900, "point_diff": 100,
+            "league_points": 60, "position": 1 + i % 20,
+        }
+        for i in range(ROWS)
+    ]
+
+
+def _per_row_models(model, rows) -> bytes:
+    adapter = TypeAdapter(List[model])
+    models = [model(**row) for row in rows]
+    # fastapi: validate the returned list against response_model, dump it, then json.dumps
+    validated = adapter.validate_python(models)
+    return json.dumps(adapter.dump_python(validated, mode="json")).encode()
+
+
+def _type_adapter(model, rows) -> bytes:
+    adapter = TypeAdapter(List[model])
+    return adapter.dump_json(adapter.validate_python(rows))
+
+
+def _fast_path(model, rows) -> bytes:
+    return dump_json(model_rows(model, rows))
+
+
+def _best_of(func, model, rows) -> float:
+    best = float("inf")
+    for _ in range(REPEATS):
+        start = time.perf_counter()
+        func(model, rows)
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def main():
+    print("=" * 60)
+    print(f"ROW SERIALISATION BENCHMARK ({ROWS} rows, best of {REPEATS})")
+    print("=" * 60)
+    print(f"orjson {'installed' if serialization.orjson is not None else 'missing, stdlib json fallback'}\n")
+
+    for model, rows in ((MatchOut, _match_rows()), (StandingOut, _standing_rows())):
+        outputs = [json.loads(func(model, rows)) for func in (_per_row_models, _type_adapter, _fast_path)]
+        assert outputs[0] == outputs[1] == outputs[2], f"{model.__name__}: the three paths disagree"
+
+        baseline = _best_of(_per_row_models, model, rows)
+        adapter = _best_of(_type_adapter, model, rows)
+        fast = _best_of(_fast_path, model, rows)
+        print(f"{model.__name__}:")
+        print(f"  model per row + response_model  {baseline:8.1f}ms")
+        print(f"  TypeAdapter(List[...])          {adapter:8.1f}ms  ({baseline / adapter:.1f}x)")
+        print(f"  model_rows + dump_json          {fast:8.1f}ms  ({baseline / fast:.1f}x)")
+        print()
+
+    print("✓ Identical JSON from every path")
+
+
+if __name__ == "__main__":
+    main()
@@ -21,6 +21,7 @@ if env_path.exists():
                 os.environ[key] = value
 
 from api.auth import AuthUtils
+from api.auth.utils import _verified_tokens
 
 
 def _pg_dsn() -> dict:
@@ -82,7 +83,21 @@ async def test_auth():
     print(f"   Username: {decoded['sub']}")
     print(f"   User ID: {decoded['user_id']}")
     print(f"   Role: {decoded['role']}")
-    
+
+    # Test 4b: Verified Token Cache
+    print("\n4b. Testing Verified Token Cache...")
+    hits_before = _verified_tokens.hits
+    cached_user = AuthUtils.get_current_user(auth_header)
+    assert cached_user == decoded, "Cached payload should match the decoded one"
+    assert _verified_tokens.hits == hits_before + 1, "Second decode of the same token should be a cache hit"
+    cached_user["role"] = "PLAYER"
+    assert AuthUtils.get_current_user(auth_header)["role"] == "ADMIN", "Callers must not be able to change the cached payload"
+    expired = AuthUtils.create_access_token(token_data, expires_delta=timedelta(seconds=-1))
+    assert "error" in AuthUtils.decode_access_token(f"Bearer {expired}"), "Expired token should be rejected"
+    tampered = token[:-4] + ("AAAA" if not token.endswith("AAAA") else "BBBB")
+    assert "error" in AuthUtils.decode_access_token(f"Bearer {tampered}"), "Tampered token should be rejected"
+    print(f"   ✓ Repeat token served from cache, expired and tampered tokens still rejected")
+
     # Test 5: Role Authorization
     print("\n5. Testing Role Authorization...")
     # require_role expects a different signature; perform explicit role checks instead
@@ -0,0 +1,79 @@
+"""
+Test file for execute_checked (api/services/checked_write.py), the single statement
+check + write helper. Checks the flag row maps onto the right HTTP errors in order.
+No database or server needed, a fake connection returns the flag row.
+"""
+
+import sys
+import os
+import asyncio
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from fastapi import HTTPException
+from api.services.checked_write import Check, execute_checked
+
+
+CHECKS = (
+    Check("found", 404, "Invitation not found"),
+    Check("allowed", 403, "You can only delete invitations you sent or received"),
+    Check("pending", 400, "Can only delete pending invitations"),
+)
+
+
+class FakeConnection:
+    def __init__(self, row):
+        self.row = row
+        self.calls = 0
+
+    async def fetchrow(self, query, *params):
+        self.calls += 1
+        return self.row
+
+
+def _status_for(row):
+    connection = FakeConnection(row)
+    try:
+        asyncio.run(execute_checked(connection, "WITH ...", 1, 2, checks=CHECKS))
+    except HTTPException as exc:
+        return exc.status_code, exc.detail
+    finally:
+        assert connection.calls == 1, "Checks and write should be one round trip"
+    return 204, None
+
+
+def test_first_failed_check_wins():
+    """Test the first false flag decides the error, like the old sequential checks did."""
+    print("Testing check order...")
+
+    assert _status_for({"found": False, "allowed": False, "pending": False}) == (404, "Invitation not found")
+    assert _status_for({"found": True, "allowed": False, "pending": False})[0] == 403
+    assert _status_for({"found": True, "allowed": True, "pending": False})[0] == 400
+    print("✓ 404 before 403 before 400")
+
+
+def test_all_checks_pass():
+    """Test the row comes back when every check passes."""
+    print("\nTesting passing checks...")
+
+    row = {"found": True, "allowed": True, "pending": True, "join_request_id": 7}
+    assert _status_for(row) == (204, None)
+    assert asyncio.run(execute_checked(FakeConnection(row), "WITH ...", checks=CHECKS))["join_request_id"] == 7
+    print("✓ Row returned when the write went through")
+
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("CHECKED WRITE TEST SUITE")
+    print("=" * 60)
+
+    try:
+        test_first_failed_check_wins()
+        test_all_checks_pass()
+
+        print("\n" + "=" * 60)
+        print("✓ ALL TESTS PASSED")
+        print("=" * 60)
+    except AssertionError as e:
+        print(f"\n✗ TEST FAILED: {e}")
+        sys.exit(1)
@@ -0,0 +1,266 @@
+"""
+Concurrency stress test for match processing (process_match_result + Idempotency-Key).
+
+Fires the same match at process_match_result from many tasks on separate pool connections at
+once and checks the standings only count it once, then does the same with a shared idempotency
+key and checks every caller gets the same response. Then processes matches between the same two
+teams with home and away swapped at once, which must not deadlock. Also checks a match processed before a
+season recalculation can still be retracted afterwards. Needs the database (PG* environment
+variables, schema applied). Creates its own throwaway league and deletes it afterwards.
+
+Run:
+    python3 api/tests/test_concurrent_processing.py
+"""
+
+import sys
+import os
+import asyncio
+import uuid
+
+import asyncpg
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from api.config.database import get_pg_dsn, init_connection
+from api.services.standings_engine import (
+    process_match_result,
+    initialise_season_standings,
+    recalculate_season_standings,
+    retract_match_result,
+)
+from api.services.idempotency import claim_idempotency_key, store_idempotent_response
+
+
+CONCURRENT_TASKS = 20
+STRAIGHT_SETS = ((25, 20), (25, 18), (25, 23))
+
+
+async def _create_scratch_season(connection):
+    """user, league, season with two teams, all committed so other connections can see them"""
+    tag = uuid.uuid4().hex[:8]
+    user_id = await connection.fetchval(
+        """
+        INSERT INTO "Users" (username, hashed_password, email, role)
+        VALUES ($1, 'x', $2, 'ADMIN')
+        RETURNING user_id
+        """,
+        f"stress_{tag}", f"stress_{tag}@example.com",
+    )
+    league_id = await connection.fetchval(
+        'INSERT INTO "Leagues" (name, admin_user_id) VALUES ($1, $2) RETURNING league_id',
+        f"Stress League {tag}", user_id,
+    )
+    season_id = await connection.fetchval(
+        """
+        INSERT INTO "Seasons" (league_id, name, start_date, end_date)
+        VALUES ($1, 'Stress Season', CURRENT_DATE, CURRENT_DATE + 365)
+        RETURNING season_id
+        """,
+        league_id,
+    )
+    team_ids = [
+        row['team_id'] for row in await connection.fetch(
+            """
+            INSERT INTO "Teams" (name, created_by_user_id)
+            SELECT 'Stress Team ' || n, $1 FROM generate_series(1, 2) AS n
+            RETURNING team_id
+            """,
+            user_id,
+        )
+    ]
+    await connection.execute(
+        'INSERT INTO "SeasonTeams" (season_id, team_id) SELECT $1, unnest($2::int[])',
+        season_id, team_ids,
+    )
+    async with connection.transaction():
+        await initialise_season_standings(connection, season_id)
+    return user_id, league_id, season_id, team_ids
+
+
+async def _create_finished_match(connection, season_id, team_ids) -> int:
+    match_id = await connection.fetchval(
+        """
+        INSERT INTO "Matches" (season_id, home_team_id, away_team_id, status)
+        VALUES ($1, $2, $3, 'SCHEDULED')
+        RETURNING match_id
+        """,
+        season_id, team_ids[0], team_ids[1],
+    )
+    for set_number, (home, away) in enumerate(STRAIGHT_SETS, start=1):
+        await connection.execute(
+            'INSERT INTO "Sets" (match_id, set_number, home_team_score, away_team_score) VALUES ($1, $2, $3, $4)',
+            match_id, set_number, home, away,
+        )
+    # the finalize trigger fills in sets won and the winner
+    await connection.execute(
+        """UPDATE "Matches" SET status = 'FINISHED'::game_states WHERE match_id = $1""",
+        match_id,
+    )
+    return match_id
+
+
+async def _cleanup(connection, user_id, league_id, season_id, team_ids):
+    async with connection.transaction():
+        await connection.execute('DELETE FROM "IdempotencyKeys" WHERE user_id = $1', user_id)
+        await connection.execute('DELETE FROM "Matches" WHERE season_id = $1', season_id)
+        await connection.execute('DELETE FROM "StandingsProjection" WHERE season_id = $1', season_id)
+        await connection.execute('DELETE FROM "LeagueStandings" WHERE season_id = $1', season_id)
+        await connection.execute('DELETE FROM "Seasons" WHERE season_id = $1', season_id)
+        await connection.execute('DELETE FROM "Teams" WHERE team_id = ANY($1::int[])', team_ids)
+        await connection.execute('DELETE FROM "Leagues" WHERE league_id = $1', league_id)
+        await connection.execute('DELETE FROM "Users" WHERE user_id = $1', user_id)
+
+
+async def _home_standing(connection, season_id, team_id):
+    return await connection.fetchrow(
+        'SELECT matches_played, wins, league_points FROM "LeagueStandings" WHERE season_id = $1 AND team_id = $2',
+        season_id, team_id,
+    )
+
+
+async def stress_concurrent_process(pool, season_id, team_ids):
+    """Test many simultaneous process calls for one match only count it once."""
+    print("Testing concurrent process_match_result...")
+
+    async with pool.acquire() as connection:
+        match_id = await _create_finished_match(connection, season_id, team_ids)
+
+    async def process():
+        async with pool.acquire() as connection:
+            async with connection.transaction():
+                return await process_match_result(connection, match_id)
+
+    results = await asyncio.gather(*(process() for _ in range(CONCURRENT_TASKS)), return_exceptions=True)
+    succeeded = [r for r in results if not isinstance(r, Exception)]
+    rejected = [r for r in results if isinstance(r, ValueError)]
+    assert len(succeeded) == 1, f"Expected exactly 1 task to process the match, got {len(succeeded)}"
+    assert len(rejected) == CONCURRENT_TASKS - 1, f"Unexpected errors: {[r for r in results if isinstance(r, Exception) and not isinstance(r, ValueError)]}"
+
+    async with pool.acquire() as connection:
+        standing = await _home_standing(connection, season_id, team_ids[0])
+    assert standing['matches_played'] == 1 and standing['league_points'] == 3, f"Match double counted: {dict(standing)}"
+    print(f"✓ {CONCURRENT_TASKS} concurrent calls, match counted once")
+
+
+async def stress_concurrent_idempotent_retries(pool, user_id, season_id, team_ids):
+    """Test concurrent retries sharing an idempotency key all get the one stored response."""
+    print("\nTesting concurrent retries with one Idempotency-Key...")
+
+    async with pool.acquire() as connection:
+        match_id = await _create_finished_match(connection, season_id, team_ids)
+    key = uuid.uuid4().hex
+    scope = "POST /matches/process"
+
+    async def retry():
+        async with pool.acquire() as connection:
+            async with connection.transaction():
+                replayed = await claim_idempotency_key(connection, user_id, scope, key, str(match_id))
+                if replayed is not None:
+                    return replayed
+                result = await process_match_result(connection, match_id)
+                response = {"match_id": result.match_id, "winner_team_id": result.winner_team_id}
+                await store_idempotent_response(connection, user_id, scope, key, response)
+                return response
+
+    responses = await asyncio.gather(*(retry() for _ in range(CONCURRENT_TASKS)))
+    assert all(r == responses[0] for r in responses), "Retries got different responses"
+    assert responses[0]["match_id"] == match_id
+
+    async with pool.acquire() as connection:
+        standing = await _home_standing(connection, season_id, team_ids[0])
+        try:
+            async with connection.transaction():
+                await claim_idempotency_key(connection, user_id, scope, key, "some other match")
+        except ValueError:
+            pass
+        else:
+            raise AssertionError("Reusing a key for a different request should be rejected")
+    assert standing['matches_played'] == 2, f"Expected 2 matches counted in total, got {standing['matches_played']}"
+    print(f"✓ {CONCURRENT_TASKS} retries, one processing, identical responses")
+
+
+async def stress_opposite_fixtures(pool, season_id, team_ids):
+    """Test A v B and B v A processed at the same time dont deadlock on the two standings rows."""
+    print("\nTesting concurrent processing of A v B and B v A...")
+
+    pairs = CONCURRENT_TASKS // 2
+    async with pool.acquire() as connection:
+        before = await _home_standing(connection, season_id, team_ids[0])
+        match_ids = []
+        for _ in range(pairs):
+            match_ids.append(await _create_finished_match(connection, season_id, team_ids))
+            match_ids.append(await _create_finished_match(connection, season_id, team_ids[::-1]))
+
+    async def process(match_id):
+        async with pool.acquire() as connection:
+            async with connection.transaction():
+                return await process_match_result(connection, match_id)
+
+    results = await asyncio.gather(*(process(match_id) for match_id in match_ids), return_exceptions=True)
+    failed = [r for r in results if isinstance(r, Exception)]
+    assert not failed, f"{len(failed)} of {len(match_ids)} failed: {failed[:1]!r}"
+
+    async with pool.acquire() as connection:
+        standing = await _home_standing(connection, season_id, team_ids[0])
+    assert standing['matches_played'] == before['matches_played'] + len(match_ids), f"Expected {len(match_ids)} more matches counted: {dict(standing)}"
+    print(f"✓ {len(match_ids)} matches with home and away swapped processed at once, no deadlock")
+
+
+async def check_retract_after_recalculate(pool, season_id, team_ids):
+    """Test a match processed before a recalculation is still counted once and can be retracted."""
+    print("\nTesting process -> recalculate -> retract...")
+
+    async with pool.acquire() as connection:
+        match_id = await _create_finished_match(connection, season_id, team_ids)
+        async with connection.transaction():
+            await process_match_result(connection, match_id)
+        processed = await _home_standing(connection, season_id, team_ids[0])
+
+        for batched in (True, False):
+            async with connection.transaction():
+                await recalculate_season_standings(connection, season_id, batched=batched)
+            standing = await _home_standing(connection, season_id, team_ids[0])
+            assert standing == processed, f"Recalculation (batched={batched}) changed the standings: {dict(standing)} != {dict(processed)}"
+
+        async with connection.transaction():
+            await retract_match_result(connection, match_id)
+        retracted = await _home_standing(connection, season_id, team_ids[0])
+        assert retracted['matches_played'] == processed['matches_played'] - 1, f"Retraction not applied: {dict(retracted)}"
+        assert retracted['league_points'] == processed['league_points'] - 3, f"Retraction not applied: {dict(retracted)}"
+
+        # the log left by the retraction still rebuilds to the same table
+        async with connection.transaction():
+            await recalculate_season_standings(connection, season_id)
+        assert await _home_standing(connection, season_id, team_ids[0]) == retracted, "Recalculation after the retraction differs"
+    print("✓ Processed match survived both recalculations and was retracted")
+
+
+async def main():
+    pool = await asyncpg.create_pool(**get_pg_dsn(), min_size=2, max_size=CONCURRENT_TASKS, init=init_connection)
+    async with pool.acquire() as connection:
+        user_id, league_id, season_id, team_ids = await _create_scratch_season(connection)
+    try:
+        await stress_concurrent_process(pool, season_id, team_ids)
+        await stress_concurrent_idempotent_retries(pool, user_id, season_id, team_ids)
+        await stress_opposite_fixtures(pool, season_id, team_ids)
+        await check_retract_after_recalculate(pool, season_id, team_ids)
+    finally:
+        async with pool.acquire() as connection:
+            await _cleanup(connection, user_id, league_id, season_id, team_ids)
+        await pool.close()
+
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("CONCURRENT PROCESSING TEST SUITE")
+    print("=" * 60)
+
+    try:
+        asyncio.run(main())
+
+        print("\n" + "=" * 60)
+        print("✓ ALL TESTS PASSED")
+        print("=" * 60)
+    except AssertionError as e:
+        print(f"\n✗ TEST FAILED: {e}")
+        sys.exit(1)
@@ -0,0 +1,218 @@
+"""
+Test file for the cross-worker event bus (api/services/event_bus.py).
+Feeds NOTIFY payloads straight into dispatch() the way the listener connection would.
+No database or server needed.
+"""
+
+import sys
+import os
+import asyncio
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from api.services import event_bus
+from api.services.event_bus import EventBus, RESYNC_EVENT, get_event_bus, encode_event, decode_event
+from api.services.response_cache import get_cache, invalidate
+from api.services.live_feed import get_live_feed
+
+
+def test_encode_decode():
+    """Test messages round trip and foreign payloads are ignored."""
+    print("Testing event encoding...")
+
+    message = decode_event(encode_event("worker-a", "invalidate", {"namespaces": ["matches"]}))
+    assert message == {"origin": "worker-a", "type": "invalidate", "data": {"namespaces": ["matches"]}}
+    assert decode_event("not json") is None
+    assert decode_event('{"type": "invalidate"}') is None, "Messages without an origin should be ignored"
+    print("✓ Events encode and decode")
+
+
+def test_own_events_skipped():
+    """Test a worker ignores its own events and runs handlers for everyone else's."""
+    print("\nTesting origin filtering...")
+
+    bus = EventBus()
+    received = []
+    bus.subscribe("ping", received.append)
+
+    assert bus.dispatch(encode_event(bus.worker_id, "ping", {"n": 1})) == 0
+    assert bus.dispatch(encode_event("another-worker", "ping", {"n": 2})) == 1
+    assert bus.dispatch(encode_event("another-worker", "unknown", {})) == 0
+    assert received == [{"n": 2}], f"Expected only the other worker's event, got {received}"
+    print("✓ Own events skipped, other workers' events handled")
+
+
+def test_broadcast_without_listener():
+    """Test broadcasting is a no-op when the bus isnt running (scripts, tests)."""
+    print("\nTesting broadcast while stopped...")
+
+    bus = EventBus()
+    bus.broadcast("ping", {"n": 1})
+    assert bus.stats()["events_sent"] == 0 and not bus.running
+    print("✓ Broadcast does nothing without a listener")
+
+
+def test_remote_invalidate():
+    """Test an invalidate event from another worker clears this worker's cache."""
+    print("\nTesting remote cache invalidation...")
+
+    cache = get_cache("bus-test", ttl=60)
+    cache.set("key", "value")
+    invalidations = cache.invalidations
+
+    get_event_bus().dispatch(encode_event("another-worker", "invalidate", {"namespaces": ["bus-test"]}))
+    assert cache.get("key") == (False, None), "Remote invalidate should clear the local cache"
+    assert cache.invalidations == invalidations + 1
+
+    # local invalidate still clears immediately with the bus stopped
+    cache.set("key", "value")
+    invalidate("bus-test")
+    assert cache.get("key") == (False, None)
+    print("✓ Other workers' writes clear the local cache")
+
+
+def test_remote_match_event():
+    """Test a match event from another worker reaches this worker's live feed watchers."""
+    print("\nTesting remote live feed events...")
+
+    async def run():
+        hub = get_live_feed()
+        queue = hub.subscribe(4242)
+        try:
+            get_event_bus().dispatch(encode_event(
+                "another-worker", "match_event",
+                {"match_id": 4242, "event": "set", "data": {"set_number": 1, "home_team_score": 25}}
+            ))
+            return queue.get_nowait()
+        finally:
+            hub.unsubscribe(4242, queue)
+
+    event, data = asyncio.run(run())
+    assert event == "set" and data["home_team_score"] == 25
+    print("✓ Other workers' score updates reach local watchers")
+
+
+class FakeListener:
+    """Enough of an asyncpg connection for the bus's LISTEN side."""
+
+    def __init__(self):
+        self.closed = False
+        self.on_terminated = None
+        self.channels = []
+
+    def add_termination_listener(self, callback):
+        self.on_terminated = callback
+
+    def remove_termination_listener(self, callback):
+        self.on_terminated = None
+
+    async def add_listener(self, channel, callback):
+        self.channels.append(channel)
+
+    async def remove_listener(self, channel, callback):
+        self.channels.remove(channel)
+
+    async def fetchval(self, query, timeout=None):
+        if self.closed:
+            raise OSError("connection is closed")
+        return 1
+
+    async def close(self, timeout=None):
+        self.closed = True
+
+    def terminate(self):
+        self.closed = True
+
+    def is_closed(self):
+        return self.closed
+
+    def drop(self):
+        """What asyncpg does when the server goes away."""
+        self.closed = True
+        self.on_terminated(self)
+
+
+def test_listener_reconnects():
+    """Test a dropped listener connection is reopened, with retries, and resync handlers run."""
+    print("\nTesting listener reconnect...")
+
+    async def run():
+        listeners = []
+        failures = [OSError("connection refused")]
+
+        async def connect():
+            if len(listeners) == 1 and failures:
+                # postgres still restarting on the first retry
+                raise failures.pop()
+            listeners.append(FakeListener())
+            return listeners[-1]
+
+        bus = EventBus()
+        resyncs = []
+        bus.subscribe(RESYNC_EVENT, resyncs.append)
+        delays = event_bus.RECONNECT_DELAYS
+        event_bus.RECONNECT_DELAYS = (0.01,)
+        try:
+            await bus.start(pool=object(), connect=connect)
+            assert bus.listening and listeners[0].channels == [event_bus.EVENT_CHANNEL]
+
+            listeners[0].drop()
+            for _ in range(100):
+                if bus.stats()["reconnects"]:
+                    break
+                await asyncio.sleep(0.01)
+            assert bus.listening and len(listeners) == 2, "Listener should be reopened"
+            assert listeners[1].channels == [event_bus.EVENT_CHANNEL]
+            assert resyncs == [{}], "Resync handlers should run once after reconnecting"
+            assert bus.running, "Broadcasts should keep going while the listener is down"
+        finally:
+            event_bus.RECONNECT_DELAYS = delays
+            await bus.stop()
+        assert listeners[1].closed and not bus.running
+
+    asyncio.run(run())
+    print("✓ Lost listener reopened after a failed attempt")
+
+
+def test_resync_clears_local_state():
+    """Test the resync handlers drop cached responses and live snapshots."""
+    print("\nTesting resync...")
+
+    async def run():
+        cache = get_cache("bus-resync-test", ttl=60)
+        cache.set("key", "value")
+        hub = get_live_feed()
+        queue = hub.subscribe(4343)
+        try:
+            hub.seed_snapshot(4343, {"match_id": 4343}, [], hub.version(4343))
+            assert hub.snapshot(4343) is not None
+            get_event_bus()._run_handlers(RESYNC_EVENT, {})
+            assert hub.snapshot(4343) is None, "Snapshot may be stale after missed events"
+        finally:
+            hub.unsubscribe(4343, queue)
+        assert cache.get("key") == (False, None), "Cache may be stale after missed invalidations"
+
+    asyncio.run(run())
+    print("✓ Caches and snapshots dropped on resync")
+
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("EVENT BUS TEST SUITE")
+    print("=" * 60)
+
+    try:
+        test_encode_decode()
+        test_own_events_skipped()
+        test_broadcast_without_listener()
+        test_remote_invalidate()
+        test_remote_match_event()
+        test_listener_reconnects()
+        test_resync_clears_local_state()
+
+        print("\n" + "=" * 60)
+        print("✓ ALL TESTS PASSED")
+        print("=" * 60)
+    except AssertionError as e:
+        print(f"\n✗ TEST FAILED: {e}")
+        sys.exit(1)
@@ -9,8 +9,11 @@ from datetime import datetime, timedelta
 
 # Add the parent directory to the path to import api module
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
 
 from services.invitation_code_engine import InvitationCodeEngine
+from services.team_invitation_code_engine import TeamInvitationCodeEngine
+from services.daily_code_index import DailyCodeIndex, utc_today
 
 
 def test_code_generation():
@@ -130,6 +133,175 @@ def test_6_digit_range():
     print(f"✓ All codes are 6-digit numeric format (000000-999999)")
 
 
+def test_daily_code_index():
+    """Test that the daily index maps today's codes back to their users."""
+    print("\nTesting daily code index...")
+
+    today = utc_today()
+    index = DailyCodeIndex(InvitationCodeEngine.code_for_date, 'SELECT user_id FROM "Users";', "")
+    index.build(range(1, 2001), today)
+
+    for user_id in (1, 250, 2000):
+        code = InvitationCodeEngine.generate_code(user_id)
+        assert user_id in index.owners(code), f"Index should find user {user_id} from code {code}"
+    print("✓ Index resolves today's codes back to their users")
+
+    # a user registered after the build gets patched in
+    new_user_id = 2001
+    index.add(new_user_id)
+    assert new_user_id in index.owners(InvitationCodeEngine.generate_code(new_user_id))
+    print("✓ Newly registered users are added to today's index")
+
+
+def test_daily_code_index_collisions():
+    """Test that two ids sharing a code are both kept, lowest id first."""
+    print("\nTesting daily code index collisions...")
+
+    # force every id onto the same code to simulate a collision
+    index = DailyCodeIndex(lambda owner_id, date_str: "123456", "", "")
+    index.build([42, 7, 19], utc_today())
+    assert index.owners("123456") == [7, 19, 42], "Colliding ids should all be kept in id order"
+    assert index.owners("654321") == [], "Unknown codes should have no owners"
+    print("✓ Colliding codes keep every owner, lowest id first")
+
+
+def test_daily_code_index_rebuilds_on_rollover():
+    """Test that lookup rebuilds the map when the stored date is stale."""
+    print("\nTesting daily code index rollover...")
+    import asyncio
+
+    class FakeConnection:
+        def __init__(self):
+            self.fetches = 0
+
+        async def fetch(self, query, *params):
+            self.fetches += 1
+            return [(1,), (2,), (3,)]
+
+    index = DailyCodeIndex(InvitationCodeEngine.code_for_date, 'SELECT user_id FROM "Users";', "")
+    index.build([1], "2000-01-01")
+    connection = FakeConnection()
+
+    code = InvitationCodeEngine.generate_code(3)
+    owners = asyncio.run(index.lookup(connection, code))
+    assert 3 in owners, "Stale index should be rebuilt for today"
+    assert index.date == utc_today()
+
+    asyncio.run(index.lookup(connection, code))
+    assert connection.fetches == 1, "Index should only be rebuilt once per day"
+    print("✓ Index rebuilds once at the day rollover")
+
+
+def test_daily_code_index_catches_up_on_miss():
+    """Test a code owned by an id created on another worker is found on the first lookup."""
+    print("\nTesting daily code index catch up...")
+    import asyncio
+
+    class FakeConnection:
+        def __init__(self):
+            self.user_ids = list(range(1, 101))
+            self.queries = []
+
+        async def fetch(self, query, *params):
+            self.queries.append((query, params))
+            if params:
+                return [(user_id,) for user_id in self.user_ids if user_id > params[0]]
+            return [(user_id,) for user_id in self.user_ids]
+
+    index = DailyCodeIndex(
+        InvitationCodeEngine.code_for_date,
+        'SELECT user_id FROM "Users";',
+        'SELECT user_id FROM "Users" WHERE user_id > $1;',
+        recheck_seconds=0,
+    )
+    connection = FakeConnection()
+    asyncio.run(index.lookup(connection, InvitationCodeEngine.generate_code(50)))
+    assert len(connection.queries) == 1, "A hit should not query again"
+
+    # registered through another worker (or a script), this worker's add() never ran
+    connection.user_ids.append(101)
+    owners = asyncio.run(index.lookup(connection, InvitationCodeEngine.generate_code(101)))
+    assert 101 in owners, "New user should be found on a miss"
+    assert connection.queries[-1][1] == (100,), "Only ids past the indexed ones should be fetched"
+
+    asyncio.run(index.lookup(connection, InvitationCodeEngine.generate_code(101)))
+    assert len(connection.queries) == 2, "Caught up ids should be hits afterwards"
+    print("✓ Ids created elsewhere are picked up on a miss")
+
+
+def test_daily_code_index_throttles_misses():
+    """Test a burst of wrong codes costs at most one catch up query per recheck window."""
+    print("\nTesting daily code index miss throttling...")
+    import asyncio
+    import time
+
+    class FakeConnection:
+        def __init__(self):
+            self.queries = 0
+
+        async def fetch(self, query, *params):
+            self.queries += 1
+            return [(user_id,) for user_id in range(1, 101) if not params or user_id > params[0]]
+
+    index = DailyCodeIndex(
+        InvitationCodeEngine.code_for_date,
+        'SELECT user_id FROM "Users";',
+        'SELECT user_id FROM "Users" WHERE user_id > $1;',
+        recheck_seconds=0.2,
+    )
+    connection = FakeConnection()
+    known = {InvitationCodeEngine.generate_code(user_id) for user_id in range(1, 101)}
+    wrong = [f"{n:06d}" for n in range(1000) if f"{n:06d}" not in known][:200]
+
+    async def guess_all():
+        return await asyncio.gather(*(index.lookup(connection, code) for code in wrong))
+
+    assert all(owners == [] for owners in asyncio.run(guess_all()))
+    assert connection.queries == 1, f"Only the build should have queried, got {connection.queries}"
+
+    time.sleep(0.25)
+    asyncio.run(guess_all())
+    assert connection.queries == 2, f"Expected one catch up for the whole burst, got {connection.queries - 1}"
+    print(f"✓ {2 * len(wrong)} wrong codes, {connection.queries} queries")
+
+
+def test_team_code_index():
+    """Test that the team index agrees with TeamInvitationCodeEngine.validate_code."""
+    print("\nTesting team code index...")
+    import asyncio
+
+    class FakeConnection:
+        def __init__(self):
+            self.team_ids = list(range(1, 501))
+
+        async def fetch(self, query, *params):
+            if params:
+                return [(team_id,) for team_id in self.team_ids if team_id > params[0]]
+            return [(team_id,) for team_id in self.team_ids]
+
+    # a local index, the module one is the app's
+    index = DailyCodeIndex(
+        TeamInvitationCodeEngine.code_for_date,
+        'SELECT team_id FROM "Teams";',
+        'SELECT team_id FROM "Teams" WHERE team_id > $1;',
+        recheck_seconds=0,
+    )
+    connection = FakeConnection()
+    for team_id in (1, 77, 500):
+        code = TeamInvitationCodeEngine.generate_code(team_id)
+        owners = asyncio.run(index.lookup(connection, code))
+        assert team_id in owners, f"Team index should find team {team_id} from code {code}"
+        assert all(TeamInvitationCodeEngine.validate_code(owner, code) for owner in owners)
+
+    index.add(501)
+    assert 501 in index.owners(TeamInvitationCodeEngine.generate_code(501))
+
+    # created on another worker after this one built its map
+    connection.team_ids.append(502)
+    assert 502 in asyncio.run(index.lookup(connection, TeamInvitationCodeEngine.generate_code(502)))
+    print("✓ Team index resolves codes and picks up newly created teams")
+
+
 if __name__ == "__main__":
     print("=" * 60)
     print("INVITATION CODE ENGINE TEST SUITE")
@@ -141,6 +313,12 @@ if __name__ == "__main__":
         test_daily_rotation()
         test_timing_resistance()
         test_6_digit_range()
+        test_daily_code_index()
+        test_daily_code_index_collisions()
+        test_daily_code_index_rebuilds_on_rollover()
+        test_daily_code_index_catches_up_on_miss()
+        test_daily_code_index_throttles_misses()
+        test_team_code_index()
         
         print("\n" + "=" * 60)
         print("✓ ALL TESTS PASSED")
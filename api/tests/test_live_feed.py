@@ -0,0 +1,192 @@
+"""
+Test file for the live score fan-out (api/services/live_feed.py).
+Checks events reach every watcher, slow watchers drop old events and the snapshot stays current.
+No database or server needed.
+"""
+
+import sys
+import os
+import asyncio
+import datetime
+import json
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from api.services import live_feed
+from api.services.event_bus import MAX_PAYLOAD_BYTES, encode_event, get_event_bus
+from api.services.live_feed import LiveFeedHub, format_sse, publish_match_rows
+
+
+def _set(number, home, away):
+    return {"set_id": number, "match_id": 1, "set_number": number, "home_team_score": home, "away_team_score": away}
+
+
+def test_fan_out():
+    """Test one publish reaches every watcher of that match and nobody else."""
+    print("Testing fan-out...")
+
+    async def run():
+        hub = LiveFeedHub()
+        watchers = [hub.subscribe(1) for _ in range(1000)]
+        other = hub.subscribe(2)
+
+        delivered = hub.publish(1, "set", _set(1, 25, 20))
+        assert delivered == 1000
+        assert all(q.get_nowait() == ("set", _set(1, 25, 20)) for q in watchers)
+        assert other.empty(), "Watcher of another match got the event"
+
+        for q in watchers:
+            hub.unsubscribe(1, q)
+        assert hub.stats()["watchers"] == 1
+
+    asyncio.run(run())
+    print("✓ 1 publish delivered to 1000 watchers")
+
+
+def test_slow_watcher_drops_oldest():
+    """Test a full queue drops its oldest event instead of blocking the publisher."""
+    print("\nTesting slow watchers...")
+
+    async def run():
+        hub = LiveFeedHub(queue_size=3)
+        queue = hub.subscribe(1)
+        for score in range(5):
+            hub.publish(1, "set", _set(1, score, 0))
+        received = [queue.get_nowait()[1]["home_team_score"] for _ in range(queue.qsize())]
+        assert received == [2, 3, 4], f"Expected the 3 newest events, got {received}"
+        assert hub.stats()["events_dropped"] == 2
+
+    asyncio.run(run())
+    print("✓ Oldest events dropped, newest kept")
+
+
+def test_snapshot():
+    """Test the stored snapshot follows published events and a raced read isnt stored."""
+    print("\nTesting snapshots...")
+
+    async def run():
+        hub = LiveFeedHub()
+        first = hub.subscribe(1)
+        version = hub.version(1)
+        hub.seed_snapshot(1, {"match_id": 1, "status": "SCHEDULED"}, [_set(1, 25, 20)], version)
+
+        hub.publish(1, "set", _set(2, 18, 25))
+        hub.publish(1, "set", _set(1, 25, 22))
+        hub.publish(1, "match", {"match_id": 1, "status": "FINISHED"})
+        snapshot = hub.snapshot(1)
+        assert [s["home_team_score"] for s in snapshot["sets"]] == [25, 18]
+        assert snapshot["sets"][0]["away_team_score"] == 22
+        assert snapshot["match"]["status"] == "FINISHED"
+
+        # last watcher leaving forgets it
+        hub.unsubscribe(1, first)
+        assert hub.snapshot(1) is None
+
+        # a publish between reading the version and seeding means the read may be stale
+        hub.subscribe(1)
+        version = hub.version(1)
+        hub.publish(1, "match", {"match_id": 1, "status": "FINISHED"})
+        hub.seed_snapshot(1, {"match_id": 1, "status": "SCHEDULED"}, [], version)
+        assert hub.snapshot(1) is None, "Stale read should not be stored"
+
+    asyncio.run(run())
+    print("✓ Snapshot kept current, raced reads not stored")
+
+
+def test_format_sse():
+    """Test events are framed as Server-Sent Events."""
+    print("\nTesting SSE framing...")
+
+    message = format_sse("set", _set(1, 25, 20))
+    assert message.startswith("event: set\ndata: ") and message.endswith("\n\n")
+    assert json.loads(message.split("data: ", 1)[1]) == _set(1, 25, 20)
+    print("✓ Messages are valid SSE")
+
+
+def _match_row(match_id):
+    return {
+        "match_id": match_id, "season_id": 1, "home_team_id": 1, "away_team_id": 2,
+        "match_datetime": datetime.datetime(2025, 9, 1, 19, 30), "venue": "Sports Hall " + "x" * 200,
+        "status": "PROCESSED", "winner_team_id": 1, "home_sets_won": 3, "away_sets_won": 1,
+    }
+
+
+def test_publish_match_rows():
+    """Test a bulk write reaches local watchers and goes to other workers in NOTIFY sized batches."""
+    print("\nTesting bulk match events...")
+
+    async def run():
+        bus = get_event_bus()
+        sent = []
+        bus.broadcast = lambda event_type, data: sent.append((event_type, data))
+        try:
+            queue = live_feed.get_live_feed().subscribe(7)
+            delivered = publish_match_rows([_match_row(i) for i in range(1, 381)])
+            live_feed.get_live_feed().unsubscribe(7, queue)
+        finally:
+            del bus.broadcast
+
+        assert delivered == 1
+        event, data = queue.get_nowait()
+        assert event == "match" and data["match_id"] == 7 and data["match_datetime"] == "2025-09-01T19:30:00"
+        assert all(event_type == "match_events" for event_type, _ in sent)
+        assert sum(len(data["events"]) for _, data in sent) == 380, "Every match should be broadcast once"
+        assert 1 < len(sent) < 380, "Matches should be batched, not one NOTIFY each"
+        payloads = [encode_event(bus.worker_id, event_type, data) for event_type, data in sent]
+        assert all(len(payload.encode()) <= MAX_PAYLOAD_BYTES for payload in payloads), "Batch too big for NOTIFY"
+        return len(sent)
+
+    batches = asyncio.run(run())
+    print(f"✓ 380 matches broadcast in {batches} messages")
+
+
+def test_stream_unsubscribes_when_never_started():
+    """Test a watcher that leaves before the first chunk doesnt stay subscribed."""
+    print("\nTesting early disconnect...")
+    from starlette.requests import ClientDisconnect
+    from api.routes.matches import _LiveEventsResponse
+
+    class FakeRequest:
+        async def is_disconnected(self):
+            return True
+
+    async def receive():
+        return {"type": "http.disconnect"}
+
+    async def send(message):
+        # the client is already gone, even the response start fails
+        raise OSError("connection reset")
+
+    async def run():
+        hub = LiveFeedHub()
+        queue = hub.subscribe(1)
+        response = _LiveEventsResponse(FakeRequest(), hub, 1, queue, {"match": {}, "sets": []})
+        try:
+            await response({"type": "http", "asgi": {"spec_version": "2.4"}}, receive, send)
+        except (OSError, ClientDisconnect):
+            pass
+        assert hub.stats()["watchers"] == 0, "Queue leaked after an early disconnect"
+
+    asyncio.run(run())
+    print("✓ Watcher removed even though the stream never started")
+
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("LIVE FEED TEST SUITE")
+    print("=" * 60)
+
+    try:
+        test_fan_out()
+        test_slow_watcher_drops_oldest()
+        test_snapshot()
+        test_format_sse()
+        test_publish_match_rows()
+        test_stream_unsubscribes_when_never_started()
+
+        print("\n" + "=" * 60)
+        print("✓ ALL TESTS PASSED")
+        print("=" * 60)
+    except AssertionError as e:
+        print(f"\n✗ TEST FAILED: {e}")
+        sys.exit(1)
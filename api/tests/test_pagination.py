@@ -0,0 +1,108 @@
+"""
+Test file for the list_matches keyset cursors (api/services/pagination.py).
+Checks cursors round trip, bad cursors are rejected and the generated SQL fragments.
+No database or server needed.
+"""
+
+import sys
+import os
+import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from api.services.pagination import NEXT, PREV, encode_cursor, decode_cursor, match_keyset_clause, naive_utc
+
+
+def test_cursor_round_trip():
+    """Test a cursor decodes back to the position it was made from."""
+    print("Testing cursor round trip...")
+
+    when = datetime.datetime(2025, 3, 14, 19, 30)
+    cursor = encode_cursor(when, 42, NEXT)
+    assert "=" not in cursor, "Padding should be stripped so the cursor is query string safe"
+    assert decode_cursor(cursor) == (when, 42, NEXT)
+
+    # unscheduled matches have no datetime
+    assert decode_cursor(encode_cursor(None, 7, PREV)) == (None, 7, PREV)
+    print("✓ Dated and undated cursors round trip")
+
+
+def test_invalid_cursor_rejected():
+    """Test garbage and tampered cursors raise ValueError."""
+    print("\nTesting invalid cursors...")
+
+    bad_cursors = [
+        "not-a-cursor",
+        "",
+        encode_cursor(None, 1, "sideways"),
+        encode_cursor(None, 1, NEXT)[:-3],
+    ]
+    for cursor in bad_cursors:
+        try:
+            decode_cursor(cursor)
+        except ValueError:
+            continue
+        raise AssertionError(f"Cursor {cursor!r} should have been rejected")
+    print(f"✓ {len(bad_cursors)} bad cursors rejected")
+
+
+def test_keyset_clause():
+    """Test the WHERE fragment numbers its params after the existing filters."""
+    print("\nTesting keyset clauses...")
+
+    when = datetime.datetime(2025, 3, 14, 19, 30)
+
+    clause, params, order = match_keyset_clause(when, 42, NEXT, 3)
+    assert clause == "(match_datetime, match_id) < ($3, $4)"
+    assert params == [when, 42]
+    assert order == "match_datetime DESC NULLS FIRST, match_id DESC"
+
+    clause, params, order = match_keyset_clause(when, 42, PREV, 1)
+    assert "(match_datetime, match_id) > ($1, $2)" in clause
+    assert params == [when, 42]
+    assert order == "match_datetime ASC NULLS LAST, match_id ASC"
+
+    # undated cursor only binds the id, asyncpg rejects unused params
+    for direction in (NEXT, PREV):
+        clause, params, _ = match_keyset_clause(None, 9, direction, 2)
+        assert params == [9] and "$2" in clause and "$3" not in clause
+    print("✓ Next/prev clauses and params are correct")
+
+
+def test_naive_utc():
+    """Test timezone aware date filters are turned into the naive UTC values the timestamp column takes."""
+    print("\nTesting date filter normalisation...")
+
+    # what FastAPI hands list_matches for ?date_from=2025-01-01T00:00:00Z
+    parsed = datetime.datetime.fromisoformat("2025-01-01T00:00:00Z")
+    assert parsed.tzinfo is not None
+    assert naive_utc(parsed) == datetime.datetime(2025, 1, 1)
+    assert naive_utc(parsed).tzinfo is None
+
+    assert naive_utc(datetime.datetime.fromisoformat("2025-01-01T02:30:00+02:00")) == datetime.datetime(2025, 1, 1, 0, 30)
+    assert naive_utc(datetime.datetime(2025, 1, 1, 12)) == datetime.datetime(2025, 1, 1, 12)
+    assert naive_utc(None) is None
+
+    # a cursor carrying an offset decodes to the same naive position
+    aware = datetime.datetime(2025, 3, 14, 20, 30, tzinfo=datetime.timezone(datetime.timedelta(hours=1)))
+    assert decode_cursor(encode_cursor(aware, 42, NEXT)) == (datetime.datetime(2025, 3, 14, 19, 30), 42, NEXT)
+    print("✓ Z and offset times converted to naive UTC, naive times untouched")
+
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("PAGINATION TEST SUITE")
+    print("=" * 60)
+
+    try:
+        test_cursor_round_trip()
+        test_invalid_cursor_rejected()
+        test_keyset_clause()
+        test_naive_utc()
+
+        print("\n" + "=" * 60)
+        print("✓ ALL TESTS PASSED")
+        print("=" * 60)
+    except AssertionError as e:
+        print(f"\n✗ TEST FAILED: {e}")
+        sys.exit(1)
@@ -0,0 +1,94 @@
+"""
+Test file for the bcrypt thread pool (api/auth/password_pool.py).
+Checks password ops run off the event loop and that a full queue sheds with a 503.
+No database or server needed.
+"""
+
+import sys
+import os
+import asyncio
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from fastapi import HTTPException
+
+from api.auth import AuthUtils
+from api.auth import password_pool
+
+
+def test_async_hash_and_verify():
+    """Test the async wrappers give the same answers as the sync bcrypt calls."""
+    print("Testing async hash/verify...")
+
+    async def run():
+        hashed = await AuthUtils.hash_password_async("secure_password_123")
+        assert AuthUtils.verify_password("secure_password_123", hashed)
+        assert await AuthUtils.verify_password_async("secure_password_123", hashed)
+        assert not await AuthUtils.verify_password_async("wrong_password", hashed)
+
+    asyncio.run(run())
+    print("✓ hash_password_async / verify_password_async match the sync versions")
+
+
+def test_event_loop_not_blocked():
+    """Test the event loop keeps ticking while hashes run on the pool."""
+    print("\nTesting event loop stays responsive...")
+
+    async def run():
+        ticks = 0
+
+        async def ticker():
+            nonlocal ticks
+            while True:
+                await asyncio.sleep(0.001)
+                ticks += 1
+
+        task = asyncio.create_task(ticker())
+        await asyncio.gather(*(AuthUtils.hash_password_async("pw") for _ in range(4)))
+        task.cancel()
+        return ticks
+
+    ticks = asyncio.run(run())
+    assert ticks > 10, f"Event loop only ticked {ticks} times while hashing"
+    print(f"✓ Event loop ticked {ticks} times during 4 hashes")
+
+
+def test_full_queue_sheds_with_503():
+    """Test calls past workers + max_queue are rejected straight away with a 503."""
+    print("\nTesting load shedding...")
+
+    capacity = password_pool.PASSWORD_HASH_WORKERS + password_pool.PASSWORD_HASH_MAX_QUEUE
+
+    async def run():
+        results = await asyncio.gather(
+            *(password_pool.run_password_op(time.sleep, 0.05) for _ in range(capacity + 5)),
+            return_exceptions=True,
+        )
+        shed = [r for r in results if isinstance(r, HTTPException)]
+        assert len(shed) == 5, f"Expected 5 calls shed, got {len(shed)}"
+        assert all(r.status_code == 503 and r.headers.get("Retry-After") for r in shed)
+        assert password_pool.password_pool_stats()["in_flight"] == 0, "in_flight should drain back to 0"
+
+    asyncio.run(run())
+    print(f"✓ {capacity} calls accepted, the rest got 503 with Retry-After")
+
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("PASSWORD POOL TEST SUITE")
+    print("=" * 60)
+
+    try:
+        test_async_hash_and_verify()
+        test_event_loop_not_blocked()
+        test_full_queue_sheds_with_503()
+
+        print("\n" + "=" * 60)
+        print("✓ ALL TESTS PASSED")
+        print("=" * 60)
+    except AssertionError as e:
+        print(f"\n✗ TEST FAILED: {e}")
+        sys.exit(1)
+    finally:
+        password_pool.shutdown_password_executor()
@@ -0,0 +1,139 @@
+"""
+Test file for the shared query registry (api/services/queries.py).
+Checks every /matches page variant binds exactly the params its statement uses and that
+statement() picks the prepared statement when the connection has one, re-preparing it when a
+migration has invalidated it.
+No database or server needed.
+"""
+
+import sys
+import os
+import re
+import asyncio
+import datetime
+
+import asyncpg
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from api.services.pagination import NEXT, PREV
+from api.services.queries import QUERIES, match_page_statement, statement
+
+
+def _highest_param(query):
+    return max((int(n) for n in re.findall(r"\$(\d+)", query)), default=0)
+
+
+def test_match_page_params():
+    """Test each cursor kind maps to a registered statement with matching param count."""
+    print("Testing match page statements...")
+
+    when = datetime.datetime(2025, 3, 14, 19, 30)
+    filters = (1, None, "SCHEDULED", None, None)
+    cursors = [None, (when, 42, NEXT), (None, 42, NEXT), (when, 42, PREV), (None, 42, PREV)]
+
+    names = set()
+    for cursor in cursors:
+        name, params = match_page_statement(cursor, filters, 501)
+        assert name in QUERIES, f"{name} is not registered"
+        # asyncpg rejects a call with more or fewer args than the statement has
+        assert _highest_param(QUERIES[name]) == len(params), f"{name} binds {len(params)} params"
+        assert params[-1] == 501, "limit should be the last param"
+        names.add(name)
+    assert len(names) == len(cursors), "Every cursor kind should have its own fixed statement"
+    print(f"✓ {len(names)} fixed statements cover every page")
+
+
+class FakeConnection:
+    def __init__(self, prepared=None, in_transaction=False):
+        self.queries = []
+        self.prepares = []
+        self.in_transaction = in_transaction
+        if prepared is not None:
+            self.prepared_statements = prepared
+
+    async def fetchrow(self, query, *args):
+        self.queries.append(query)
+        return {"match_id": args[0]}
+
+    async def prepare(self, query):
+        self.prepares.append(query)
+        return FakePrepared()
+
+    def is_in_transaction(self):
+        return self.in_transaction
+
+
+class FakePrepared:
+    async def fetchrow(self, *args):
+        return {"match_id": args[0], "prepared": True}
+
+
+class StalePrepared:
+    """What a statement prepared before a migration changed its result type does."""
+
+    async def fetchrow(self, *args):
+        raise asyncpg.InvalidCachedStatementError("cached plan must not change result type")
+
+
+def test_statement_lookup():
+    """Test prepared statements are used when present and the query text otherwise."""
+    print("\nTesting statement lookup...")
+
+    connection = FakeConnection()
+    row = asyncio.run(statement(connection, "get_match").fetchrow(7))
+    assert row == {"match_id": 7} and connection.queries == [QUERIES["get_match"]]
+
+    connection = FakeConnection({"get_match": FakePrepared()})
+    row = asyncio.run(statement(connection, "get_match").fetchrow(7))
+    assert row["prepared"] and connection.queries == [], "Prepared statement should be used"
+
+    try:
+        statement(connection, "no_such_query")
+    except KeyError:
+        pass
+    else:
+        raise AssertionError("Unknown statement names should raise KeyError")
+    print("✓ Prepared first, query text as fallback")
+
+
+def test_stale_statement_reprepared():
+    """Test a statement invalidated by a migration is prepared again instead of failing every request."""
+    print("\nTesting stale prepared statements...")
+
+    connection = FakeConnection({"get_match": StalePrepared()})
+    row = asyncio.run(statement(connection, "get_match").fetchrow(7))
+    assert row == {"match_id": 7, "prepared": True}, "Should retry on the re-prepared statement"
+    assert connection.prepares == [QUERIES["get_match"]]
+    assert isinstance(connection.prepared_statements["get_match"], FakePrepared), "Fresh statement should be kept"
+
+    # inside a transaction the retry would hit an aborted transaction, so the error goes up
+    connection = FakeConnection({"get_match": StalePrepared()}, in_transaction=True)
+    try:
+        asyncio.run(statement(connection, "get_match").fetchrow(7))
+    except asyncpg.InvalidCachedStatementError:
+        pass
+    else:
+        raise AssertionError("Stale statement inside a transaction should raise")
+    assert connection.prepares == [], "Cant prepare in an aborted transaction"
+    row = asyncio.run(statement(connection, "get_match").fetchrow(7))
+    assert row == {"match_id": 7} and connection.queries == [QUERIES["get_match"]], "Later calls should use the query text"
+    print("✓ Re-prepared and retried outside a transaction, dropped inside one")
+
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("QUERY REGISTRY TEST SUITE")
+    print("=" * 60)
+
+    try:
+        test_match_page_params()
+        test_statement_lookup()
+        test_stale_statement_reprepared()
+
+        print("\n" + "=" * 60)
+        print("✓ ALL TESTS PASSED")
+        print("=" * 60)
+    except AssertionError as e:
+        print(f"\n✗ TEST FAILED: {e}")
+        sys.exit(1)
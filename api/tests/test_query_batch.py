@@ -0,0 +1,121 @@
+"""
+Test file for the concurrent read helper (api/services/query_batch.py).
+Checks reads overlap on separate connections, results keep their order and a failing read
+doesnt leave connections checked out. A small in-memory pool stands in for asyncpg.
+"""
+
+import sys
+import os
+import asyncio
+from contextlib import asynccontextmanager
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from api.services.query_batch import gather_reads
+
+
+ROUND_TRIP = 0.05
+
+
+class FakeConnection:
+    async def fetchrow(self, query, *params):
+        await asyncio.sleep(ROUND_TRIP)
+        if query == "fail":
+            raise RuntimeError("query failed")
+        return {"query": query, "params": params}
+
+    async def fetchval(self, query, *params):
+        await asyncio.sleep(ROUND_TRIP)
+        return params[0]
+
+    async def fetch(self, query, *params):
+        await asyncio.sleep(ROUND_TRIP)
+        return [{"query": query}]
+
+
+class FakePool:
+    def __init__(self):
+        self.in_use = 0
+        self.peak = 0
+
+    @asynccontextmanager
+    async def acquire(self):
+        self.in_use += 1
+        self.peak = max(self.peak, self.in_use)
+        try:
+            yield FakeConnection()
+        finally:
+            self.in_use -= 1
+
+
+def test_reads_overlap():
+    """Test three reads take about one round trip and come back in order."""
+    print("Testing concurrent reads...")
+
+    pool = FakePool()
+
+    async def run():
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+        results = await gather_reads(
+            pool,
+            ("fetchrow", "season", 1),
+            ("fetchval", "count", 7),
+            ("fetch", "teams"),
+        )
+        return results, loop.time() - start
+
+    (season, count, teams), elapsed = asyncio.run(run())
+    assert season == {"query": "season", "params": (1,)}
+    assert count == 7
+    assert teams == [{"query": "teams"}]
+    assert pool.peak == 3, f"Each read should get its own connection, peak was {pool.peak}"
+    assert elapsed < ROUND_TRIP * 2, f"Reads ran one after another ({elapsed:.3f}s)"
+    assert pool.in_use == 0
+    print(f"✓ 3 reads in {elapsed * 1000:.0f}ms on 3 connections")
+
+
+def test_failed_read():
+    """Test a failing read raises and every connection is returned."""
+    print("\nTesting a failing read...")
+
+    pool = FakePool()
+    try:
+        asyncio.run(gather_reads(pool, ("fetchrow", "fail"), ("fetchrow", "season", 1)))
+    except RuntimeError as exc:
+        assert str(exc) == "query failed"
+    else:
+        raise AssertionError("The failing read's exception should be raised")
+    assert pool.in_use == 0, "Connections left checked out after a failure"
+    print("✓ Failure raised, connections released")
+
+
+def test_writes_rejected():
+    """Test only read methods are accepted."""
+    print("\nTesting non-read methods are rejected...")
+
+    try:
+        asyncio.run(gather_reads(FakePool(), ("execute", "DELETE FROM x")))
+    except ValueError:
+        pass
+    else:
+        raise AssertionError("execute should be rejected")
+    print("✓ Writes rejected")
+
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("QUERY BATCH TEST SUITE")
+    print("=" * 60)
+
+    try:
+        test_reads_overlap()
+        test_failed_read()
+        test_writes_rejected()
+
+        print("\n" + "=" * 60)
+        print("✓ ALL TESTS PASSED")
+        print("=" * 60)
+    except AssertionError as e:
+        print(f"\n✗ TEST FAILED: {e}")
+        sys.exit(1)
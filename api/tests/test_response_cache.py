@@ -0,0 +1,111 @@
+"""
+Test file for the in-process response cache used by the read heavy GET routes.
+Pure python, no database or server needed.
+"""
+
+import sys
+import os
+import asyncio
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from api.services.response_cache import ResponseCache, cached, invalidate, cache_stats, get_cache
+
+
+def test_ttl_expiry():
+    """Test entries stop being served once their ttl has passed."""
+    print("Testing TTL expiry...")
+
+    cache = ResponseCache("test_ttl", ttl=0.05)
+    cache.set("key", [1, 2, 3])
+    assert cache.get("key") == (True, [1, 2, 3])
+
+    time.sleep(0.06)
+    assert cache.get("key") == (False, None), "Expired entry was still served"
+    assert cache.stats()["entries"] == 0
+    print("✓ Entries expire after their TTL")
+
+
+def test_lru_eviction():
+    """Test the least recently used entry is dropped when the cache is full."""
+    print("\nTesting LRU eviction...")
+
+    cache = ResponseCache("test_lru", ttl=60, max_entries=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")  # a is now the most recently used
+    cache.set("c", 3)
+
+    assert cache.get("b") == (False, None), "b should have been evicted"
+    assert cache.get("a") == (True, 1)
+    assert cache.get("c") == (True, 3)
+    assert cache.stats()["evictions"] == 1
+    print("✓ Least recently used entry evicted at max_entries")
+
+
+def test_cached_decorator_and_invalidation():
+    """Test the decorator keys on params (not request/user) and invalidate clears it."""
+    print("\nTesting cached decorator...")
+
+    calls = []
+
+    @cached("test_route", ttl=60)
+    async def list_things(request=None, season_id=None, user=None):
+        calls.append(season_id)
+        return [season_id]
+
+    async def run():
+        assert await list_things(request=object(), season_id=1, user={"user_id": 1}) == [1]
+        assert await list_things(request=object(), season_id=1, user={"user_id": 2}) == [1]
+        assert await list_things(request=object(), season_id=2, user={"user_id": 1}) == [2]
+        assert calls == [1, 2], f"Expected one db call per season_id, got {calls}"
+
+        invalidate("test_route")
+        await list_things(request=object(), season_id=1, user={"user_id": 1})
+        assert calls == [1, 2, 1], "invalidate should force the next read through"
+
+    asyncio.run(run())
+
+    stats = cache_stats()["test_route"]
+    assert stats["hits"] == 1 and stats["misses"] == 3 and stats["invalidations"] == 1, stats
+    print(f"✓ Cached per param set, invalidated on write (hits={stats['hits']}, misses={stats['misses']})")
+
+
+def test_read_racing_a_write():
+    """Test a read that started before an invalidation does not cache its stale result."""
+    print("\nTesting read/write race...")
+
+    @cached("test_race", ttl=60)
+    async def slow_read(season_id=None):
+        await asyncio.sleep(0.01)
+        return "old"
+
+    async def run():
+        read = asyncio.create_task(slow_read(season_id=1))
+        await asyncio.sleep(0)
+        invalidate("test_race")
+        assert await read == "old"
+
+    asyncio.run(run())
+    assert get_cache("test_race").stats()["entries"] == 0, "Stale result was cached after invalidation"
+    print("✓ Results from before an invalidation are not stored")
+
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("RESPONSE CACHE TEST SUITE")
+    print("=" * 60)
+
+    try:
+        test_ttl_expiry()
+        test_lru_eviction()
+        test_cached_decorator_and_invalidation()
+        test_read_racing_a_write()
+
+        print("\n" + "=" * 60)
+        print("✓ ALL TESTS PASSED")
+        print("=" * 60)
+    except AssertionError as e:
+        print(f"\n✗ TEST FAILED: {e}")
+        sys.exit(1)
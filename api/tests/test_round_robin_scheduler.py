@@ -0,0 +1,164 @@
+"""
+Test file for the circle method round robin scheduler.
+Pure python, no database needed. Checks schedule_round_robin produces the same
+fixtures as generate_round_robin + assign_match_dates would, but in balanced rounds.
+"""
+
+import sys
+import os
+import datetime
+import time
+from collections import Counter
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from services.fixture_generator import (
+    generate_round_robin,
+    generate_round_robin_rounds,
+    schedule_round_robin,
+)
+
+
+START_DATE = datetime.date(2025, 9, 1)  # a Monday
+
+
+def _team_matches_per_date(fixtures):
+    counts = Counter()
+    for fixture in fixtures:
+        counts[(fixture['match_date'], fixture['team_a_id'])] += 1
+        counts[(fixture['match_date'], fixture['team_b_id'])] += 1
+    return counts
+
+
+def test_same_pairings_as_generate_round_robin():
+    """Test every pairing appears exactly once, same as the old generator."""
+    print("Testing pairings...")
+
+    for team_count in (2, 3, 6, 7, 20):
+        team_ids = list(range(100, 100 + team_count))
+
+        single = schedule_round_robin(team_ids, START_DATE)
+        single_pairs = [frozenset((f['team_a_id'], f['team_b_id'])) for f in single]
+        expected = [frozenset(pair) for pair in generate_round_robin(team_ids)]
+        assert len(single_pairs) == len(set(single_pairs)), "A pairing was scheduled twice"
+        assert set(single_pairs) == set(expected), f"Single round robin pairings differ for {team_count} teams"
+
+        double = schedule_round_robin(team_ids, START_DATE, double=True)
+        ordered = [(f['team_a_id'], f['team_b_id']) for f in double]
+        assert sorted(ordered) == sorted(generate_round_robin(team_ids, double=True)), \
+            f"Double round robin home/away pairs differ for {team_count} teams"
+
+    print("✓ Single and double round robin cover every pairing exactly once")
+
+
+def test_balanced_rounds():
+    """Test each round has every team at most once and home games are balanced."""
+    print("\nTesting round balance...")
+
+    for team_count in (6, 7, 20):
+        team_ids = list(range(1, team_count + 1))
+        rounds = generate_round_robin_rounds(team_ids)
+        assert len(rounds) == team_count - 1 + (team_count % 2), "Wrong number of rounds"
+
+        for pairs in rounds:
+            teams_in_round = [team for pair in pairs for team in pair]
+            assert len(teams_in_round) == len(set(teams_in_round)), "A team plays twice in one round"
+
+        home_games = Counter(home for pairs in rounds for home, _ in pairs)
+        assert max(home_games.values()) - min(home_games.values()) <= 2, "Home games badly unbalanced"
+
+    print("✓ Every round is a valid matchday and home games are spread evenly")
+
+
+def _longest_home_or_away_run(rounds, team_id):
+    venues = ["H" if home == team_id else "A" for pairs in rounds for home, away in pairs if team_id in (home, away)]
+    longest = run = 0
+    for i, venue in enumerate(venues):
+        run = run + 1 if i and venue == venues[i - 1] else 1
+        longest = max(longest, run)
+    return longest
+
+
+def test_home_away_runs():
+    """Test nobody plays more than two home or away games in a row, byes skipped."""
+    print("\nTesting home/away runs...")
+
+    for team_count in range(3, 25):
+        team_ids = list(range(1, team_count + 1))
+        for double in (False, True):
+            rounds = generate_round_robin_rounds(team_ids, double=double)
+            longest = max(_longest_home_or_away_run(rounds, team_id) for team_id in team_ids)
+            assert longest <= 2, f"{team_count} teams (double={double}) has a run of {longest}"
+            if team_count % 2 and not double:
+                assert longest == 1, f"{team_count} teams should strictly alternate, run of {longest}"
+
+    print("✓ At most two home or away games in a row for 3-24 teams, single and double")
+
+
+def test_matches_per_week_packing():
+    """Test rounds are packed into periods without exceeding the per team limit."""
+    print("\nTesting matches_per_week_per_team packing...")
+
+    team_ids = list(range(1, 11))
+    for per_week in (1, 2, 3):
+        fixtures = schedule_round_robin(team_ids, START_DATE, matches_per_week_per_team=per_week)
+        assert max(_team_matches_per_date(fixtures).values()) <= per_week
+        periods = len({f['match_date'] for f in fixtures})
+        assert periods == -(-9 // per_week), f"Expected {-(-9 // per_week)} periods, got {periods}"
+
+    print("✓ Rounds pack into ceil(rounds / matches_per_week_per_team) periods")
+
+
+def test_weekdays_and_spacing():
+    """Test matches land on allowed weekdays and periods respect weeks_between_matches."""
+    print("\nTesting weekdays and spacing...")
+
+    fixtures = schedule_round_robin(
+        list(range(1, 7)),
+        START_DATE,
+        weeks_between_matches=2,
+        allowed_weekdays=[0, 0, 0, 0, 0, 1, 1],
+    )
+    assert all(f['match_date'].weekday() == 5 for f in fixtures), "Matches should be on the first allowed day"
+    dates = sorted({f['match_date'] for f in fixtures})
+    assert all((b - a).days == 14 for a, b in zip(dates, dates[1:])), "Periods should be 2 weeks apart"
+
+    try:
+        schedule_round_robin([1, 2], START_DATE, allowed_weekdays=[0] * 7)
+        assert False, "No allowed weekdays should raise"
+    except ValueError:
+        pass
+
+    print("✓ Weekday and spacing rules match assign_match_dates")
+
+
+def test_large_league_speed():
+    """Test a big league schedules quickly (O(n^2) total)."""
+    print("\nTesting large league...")
+
+    start = time.perf_counter()
+    fixtures = schedule_round_robin(list(range(1, 201)), START_DATE, double=True)
+    elapsed = time.perf_counter() - start
+
+    assert len(fixtures) == 200 * 199
+    print(f"✓ Scheduled {len(fixtures)} matches for 200 teams in {elapsed:.3f}s")
+
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("ROUND ROBIN SCHEDULER TEST SUITE")
+    print("=" * 60)
+
+    try:
+        test_same_pairings_as_generate_round_robin()
+        test_balanced_rounds()
+        test_home_away_runs()
+        test_matches_per_week_packing()
+        test_weekdays_and_spacing()
+        test_large_league_speed()
+
+        print("\n" + "=" * 60)
+        print("✓ ALL TESTS PASSED")
+        print("=" * 60)
+    except AssertionError as e:
+        print(f"\n✗ TEST FAILED: {e}")
+        sys.exit(1)
@@ -0,0 +1,206 @@
+"""
+Test file for the response serialisation helpers (api/services/serialization.py).
+Checks FastJSONResponse handles dates itself, model_rows fills defaults, and a streamed
+list_response body is byte for byte the same JSON as the buffered one. query_list_response is
+run against a fake pool to check it reads the cursor in chunks and always gives the connection back.
+No database or server needed.
+"""
+
+import sys
+import os
+import json
+import asyncio
+import contextlib
+import datetime
+import decimal
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from fastapi.responses import StreamingResponse
+from api.models import TeamOut
+from api.services.serialization import (
+    STREAM_CHUNK_ROWS,
+    STREAM_THRESHOLD_ROWS,
+    FastJSONResponse,
+    list_response,
+    model_rows,
+    query_list_response,
+    rows_response,
+)
+
+
+def _team_rows(count):
+    created = datetime.datetime(2025, 9, 1, 19, 30, 5, 120)
+    return [
+        {
+            "team_id": i, "name": f"Team {i}", "created_by_user_id": 1,
+            "logo_url": None, "home_ground": f"Hall {i}", "created_at": created,
+        }
+        for i in range(count)
+    ]
+
+
+async def _send(response):
+    """Run a response as ASGI and return the body it sent."""
+    body = []
+
+    async def receive():
+        return {"type": "http.disconnect"}
+
+    async def send(message):
+        if message["type"] == "http.response.body":
+            body.append(message.get("body", b""))
+
+    await response({"type": "http", "method": "GET", "path": "/"}, receive, send)
+    return b"".join(body)
+
+
+def test_fast_json_response():
+    """Test dates, datetimes and Decimals render without going through jsonable_encoder."""
+    print("Testing FastJSONResponse...")
+
+    content = {
+        "start_date": datetime.date(2025, 9, 1),
+        "match_datetime": datetime.datetime(2025, 9, 1, 19, 30),
+        "points": decimal.Decimal("2.5"),
+        "teams": [1, 2],
+    }
+    rendered = json.loads(FastJSONResponse(content).body)
+    assert rendered == {
+        "start_date": "2025-09-01",
+        "match_datetime": "2025-09-01T19:30:00",
+        "points": 2.5,
+        "teams": [1, 2],
+    }, rendered
+    print("✓ Dates as ISO strings, Decimals as numbers")
+
+
+def test_model_rows_defaults():
+    """Test columns the model doesnt have are dropped and missing ones get None."""
+    print("\nTesting model_rows...")
+
+    rows = [{"team_id": 1, "name": "A", "created_by_user_id": 2, "extra": True}]
+    assert model_rows(TeamOut, rows) == [{
+        "team_id": 1, "name": "A", "created_by_user_id": 2,
+        "logo_url": None, "home_ground": None, "created_at": None,
+    }]
+    print("✓ Shaped like the model")
+
+
+def test_stream_matches_buffered():
+    """Test a streamed list has the same bytes as rows_response and only streams past the threshold."""
+    print("\nTesting list_response...")
+
+    small = _team_rows(STREAM_THRESHOLD_ROWS)
+    assert not isinstance(list_response(TeamOut, small), StreamingResponse), "At the threshold should be buffered"
+    assert asyncio.run(_send(list_response(TeamOut, []))) == b"[]"
+
+    # one row over a chunk boundary, so the last chunk is a single row
+    rows = _team_rows(STREAM_THRESHOLD_ROWS + STREAM_CHUNK_ROWS + 1)
+    streamed = list_response(TeamOut, rows)
+    assert isinstance(streamed, StreamingResponse), "Past the threshold should stream"
+    body = asyncio.run(_send(streamed))
+    assert body == rows_response(TeamOut, rows).body, "Streamed body differs from the buffered one"
+    assert [TeamOut(**team) for team in json.loads(body)] == [TeamOut(**row) for row in rows]
+    print(f"✓ {len(rows)} rows streamed as the same JSON")
+
+
+class FakePool:
+    """Just enough of an asyncpg pool for query_list_response: acquire, transaction, cursor.fetch."""
+
+    def __init__(self, rows):
+        self.rows = rows
+        self.fetch_sizes = []
+        self.held = False
+
+    @contextlib.asynccontextmanager
+    async def acquire(self):
+        self.held = True
+        try:
+            yield self
+        finally:
+            self.held = False
+
+    @contextlib.asynccontextmanager
+    async def transaction(self, **kwargs):
+        yield
+
+    async def cursor(self, query, *params):
+        pool, position = self, 0
+
+        class Cursor:
+            async def fetch(self, count):
+                nonlocal position
+                pool.fetch_sizes.append(count)
+                batch = pool.rows[position:position + count]
+                position += len(batch)
+                return batch
+
+        return Cursor()
+
+
+def test_query_list_response():
+    """Test query_list_response reads a long list in chunks and gives the connection back every time."""
+    print("\nTesting query_list_response...")
+
+    async def respond(rows):
+        pool = FakePool(rows)
+        return pool, await query_list_response(pool, TeamOut, "SELECT ...")
+
+    for rows in ([], _team_rows(STREAM_THRESHOLD_ROWS)):
+        pool, response = asyncio.run(respond(rows))
+        assert not isinstance(response, StreamingResponse), "A list within the threshold should be buffered"
+        assert not pool.held, "Connection should be released before a buffered response is returned"
+        assert response.body == rows_response(TeamOut, rows).body
+
+    rows = _team_rows(STREAM_THRESHOLD_ROWS + 2 * STREAM_CHUNK_ROWS + 1)
+    async def stream():
+        pool, response = await respond(rows)
+        assert isinstance(response, StreamingResponse), "Past the threshold should stream"
+        assert pool.held, "The cursor's connection is held while the body is sent"
+        return pool, await _send(response)
+
+    pool, body = asyncio.run(stream())
+    assert body == rows_response(TeamOut, rows).body, "Streamed body differs from the buffered one"
+    assert max(pool.fetch_sizes) == STREAM_THRESHOLD_ROWS + 1, f"Read more rows at once than needed: {pool.fetch_sizes}"
+    assert not pool.held, "Connection not released after streaming"
+
+    # the client is gone before the first byte goes out
+    async def disconnect_early():
+        from starlette.requests import ClientDisconnect
+        pool, response = await respond(rows)
+
+        async def receive():
+            return {"type": "http.disconnect"}
+
+        async def send(message):
+            raise OSError("client went away")
+
+        try:
+            await response({"type": "http", "method": "GET", "path": "/"}, receive, send)
+        except (OSError, ClientDisconnect):
+            pass
+        # checked before asyncio.run returns, its shutdown would close the generator anyway
+        assert not pool.held, "Connection leaked when the stream never started"
+
+    asyncio.run(disconnect_early())
+    print(f"✓ {len(rows)} rows read as {pool.fetch_sizes[:-1]}, connection released on every path")
+
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("SERIALISATION TEST SUITE")
+    print("=" * 60)
+
+    try:
+        test_fast_json_response()
+        test_model_rows_defaults()
+        test_stream_matches_buffered()
+        test_query_list_response()
+
+        print("\n" + "=" * 60)
+        print("✓ ALL TESTS PASSED")
+        print("=" * 60)
+    except AssertionError as e:
+        print(f"\n✗ TEST FAILED: {e}")
+        sys.exit(1)
@@ -0,0 +1,188 @@
+"""
+Test file for the standings engine reductions.
+Checks that folding a whole season at once gives the same totals as
+processing each match one at a time (what process_match_result does).
+"""
+
+import sys
+import os
+import random
+import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from api.services.standings_helpers import (
+    STANDING_FIELDS,
+    match_outcome,
+    aggregate_team_deltas,
+    summarise_sets,
+    match_delta_entries,
+    retraction_entries,
+    group_timeline,
+)
+
+
+def _random_match(match_id: int, team_ids):
+    home, away = random.sample(team_ids, 2)
+    home_sets = random.choice([3, 3, 3, 0, 1, 2])
+    away_sets = random.randint(0, 2) if home_sets == 3 else 3
+    sets = [(random.randint(0, 30), random.randint(0, 30)) for _ in range(home_sets + away_sets)]
+    return {
+        "match_id": match_id,
+        "home_team_id": home,
+        "away_team_id": away,
+        "winner_team_id": home if home_sets == 3 else away,
+        "home_sets_won": home_sets,
+        "away_sets_won": away_sets,
+        "home_points": sum(h for h, _ in sets),
+        "away_points": sum(a for _, a in sets),
+    }
+
+
+def _incremental_totals(matches):
+    """Same arithmetic as calling update_team_standing twice per match."""
+    totals = {}
+    for match in matches:
+        home_delta, away_delta = match_outcome(match, match["home_points"], match["away_points"])
+        for team_id, delta in ((match["home_team_id"], home_delta), (match["away_team_id"], away_delta)):
+            standing = totals.setdefault(team_id, {field: 0 for field in STANDING_FIELDS})
+            for field in STANDING_FIELDS:
+                standing[field] += delta[field]
+    return totals
+
+
+def test_match_outcome():
+    """Test the per match deltas for a home win."""
+    print("Testing match outcome...")
+
+    match = {
+        "home_team_id": 1, "away_team_id": 2, "winner_team_id": 1,
+        "home_sets_won": 3, "away_sets_won": 1,
+    }
+    home, away = match_outcome(match, 98, 80)
+
+    assert home == {"matches_played": 1, "wins": 1, "losses": 0, "sets_won": 3, "sets_lost": 1,
+                    "points_won": 98, "points_lost": 80, "league_points": 3}
+    assert away == {"matches_played": 1, "wins": 0, "losses": 1, "sets_won": 1, "sets_lost": 3,
+                    "points_won": 80, "points_lost": 98, "league_points": 0}
+    print("✓ Home win gives 3 league points to the home team and 0 to the away team")
+
+
+def test_batched_matches_incremental():
+    """Test that the batched reduction equals the match by match path."""
+    print("\nTesting batched reduction against incremental processing...")
+
+    random.seed(7)
+    team_ids = list(range(1, 21))
+    matches = [_random_match(match_id, team_ids) for match_id in range(1, 501)]
+
+    assert aggregate_team_deltas(matches) == _incremental_totals(matches)
+    print(f"✓ {len(matches)} matches folded into {len(team_ids)} team deltas identically")
+
+
+def test_batched_empty_season():
+    """Test that a season with nothing finished produces no deltas."""
+    print("\nTesting empty season...")
+
+    assert aggregate_team_deltas([]) == {}
+    print("✓ No matches gives no standings writes")
+
+
+def test_summarise_sets():
+    """Test sets won are derived from the set scores and incomplete results are rejected."""
+    print("\nTesting set summaries...")
+
+    def sets(*scores):
+        return [
+            {"set_number": n, "home_team_score": h, "away_team_score": a}
+            for n, (h, a) in enumerate(scores, start=1)
+        ]
+
+    assert summarise_sets(sets((25, 20), (25, 18), (25, 23))) == (3, 0)
+    assert summarise_sets(sets((25, 20), (20, 25), (25, 27), (25, 22), (13, 15))) == (2, 3)
+    # order of the payload doesnt matter, set_number does
+    assert summarise_sets(list(reversed(sets((25, 20), (20, 25), (25, 20), (25, 20))))) == (3, 1)
+
+    bad_results = [
+        sets((25, 20), (25, 18)),                        # nobody reached 3
+        sets((25, 20), (25, 18), (25, 10), (25, 12)),    # set after the match was won
+        sets((25, 20), (25, 25), (25, 10)),              # draw
+        [{"set_number": n, "home_team_score": 25, "away_team_score": 20} for n in (1, 2, 4)],
+    ]
+    for result in bad_results:
+        try:
+            summarise_sets(result)
+        except ValueError:
+            continue
+        raise AssertionError(f"Result {result} should have been rejected")
+    print(f"✓ Valid results summarised, {len(bad_results)} invalid results rejected")
+
+
+def test_delta_log_retraction():
+    """Test the delta log sums to the batched totals and a retraction cancels exactly one match."""
+    print("\nTesting standings delta log...")
+
+    random.seed(7)
+    team_ids = list(range(1, 9))
+    matches = [dict(_random_match(i, team_ids), match_datetime=None) for i in range(1, 41)]
+
+    log = []
+    for match in matches:
+        log.extend(match_delta_entries(match, *match_outcome(match, match["home_points"], match["away_points"])))
+
+    def replay(entries):
+        totals = {}
+        for entry in entries:
+            standing = totals.setdefault(entry["team_id"], {field: 0 for field in STANDING_FIELDS})
+            for field in STANDING_FIELDS:
+                standing[field] += entry[field]
+        return totals
+
+    assert replay(log) == aggregate_team_deltas(matches), "Log replay differs from the running totals"
+
+    corrected = matches[10]
+    log.extend(retraction_entries([e for e in log if e["match_id"] == corrected["match_id"]]))
+    without = [m for m in matches if m is not corrected]
+    replayed = {team: totals for team, totals in replay(log).items() if any(totals.values())}
+    assert replayed == aggregate_team_deltas(without), "Retraction did not cancel the match"
+    print("✓ Log replays to the standings and a retraction removes just one match")
+
+
+def test_group_timeline():
+    """Test timeline rows are grouped into numbered rounds in week order."""
+    print("\nTesting standings timeline grouping...")
+
+    week_1, week_2 = datetime.date(2025, 9, 1), datetime.date(2025, 9, 8)
+    rows = [
+        {"week_start": week_1, "team_id": 1, "position": 1},
+        {"week_start": week_1, "team_id": 2, "position": 2},
+        {"week_start": week_2, "team_id": 2, "position": 1},
+        {"week_start": week_2, "team_id": 1, "position": 2},
+    ]
+    rounds = group_timeline(rows)
+    assert [r["round"] for r in rounds] == [1, 2]
+    assert [r["week_start"] for r in rounds] == [week_1, week_2]
+    assert rounds[1]["standings"] == [{"team_id": 2, "position": 1}, {"team_id": 1, "position": 2}]
+    assert group_timeline([]) == []
+    print("✓ Rows grouped into 2 rounds")
+
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("STANDINGS ENGINE TEST SUITE")
+    print("=" * 60)
+
+    try:
+        test_match_outcome()
+        test_batched_matches_incremental()
+        test_batched_empty_season()
+        test_summarise_sets()
+        test_delta_log_retraction()
+        test_group_timeline()
+
+        print("\n" + "=" * 60)
+        print("✓ ALL TESTS PASSED")
+        print("=" * 60)
+    except AssertionError as e:
+        print(f"\n✗ TEST FAILED: {e}")
+        sys.exit(1)
@@ -0,0 +1,368 @@
+#!/usr/bin/env python3
+"""
+Run EXPLAIN (ANALYZE, BUFFERS) for the hot route queries against a seeded database and flag
+any sequential scans.
+
+Registered statements come straight from api/services/queries.py (the match page ones via
+match_page_statement, the same way list_matches picks them), so the plan checked is the one that
+runs. Parameters are picked from whatever data is there (first season, first team, ...), so seed
+first (database/seed/run_seed.py). Every query runs in a transaction that is rolled back.
+
+Seeded tables are tiny and Postgres will happily seq scan a 20 row table even when a good
+index exists, so by default enable_seqscan is turned off for the check: if a Seq Scan still
+shows up there is no usable index for that query. Pass --natural to see the planner's real
+choice instead, and --verbose to print each full plan.
+
+Usage:
+  PGUSER=postgres PGPASSWORD=secret python database/explain_routes.py [--natural] [--verbose]
+
+Exits 1 if any query has an unexpected Seq Scan.
+"""
+
+import os
+import sys
+import json
+import datetime
+from pathlib import Path
+import asyncpg
+import asyncio
+
+# the registry SQL is imported rather than copied, so the check runs exactly what the routes run
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from api.services.pagination import NEXT, PREV
+from api.services.queries import MATCH_FILTER_PARAMS, QUERIES, match_page_statement
+from api.services.standings_helpers import STANDINGS_AS_OF_QUERY, STANDINGS_TIMELINE_QUERY
+
+
+def _match_page(cursor_datetime, direction=NEXT) -> str:
+    """The registered statement name list_matches uses for a page with this kind of cursor."""
+    cursor = None if direction is None else (cursor_datetime, 0, direction)
+    return match_page_statement(cursor, (None,) * MATCH_FILTER_PARAMS, 501)[0]
+
+
+_ANY_DATETIME = datetime.datetime(2000, 1, 1)
+_SEASON_FILTERS = "season_id, NULL::int, NULL::text, NULL::timestamp, NULL::timestamp"
+_FIRST_SEASON = 'SELECT season_id FROM "Seasons" ORDER BY season_id LIMIT 1'
+
+# (route, registry statement name, sql returning its parameters from seeded data, tables allowed
+# to be scanned in full). every name in QUERIES needs at least one entry, main() refuses to run otherwise
+REGISTRY_CHECKS = [
+    # the match page variants, unused filters passed as NULL like list_matches does
+    (
+        "GET /matches?season_id",
+        _match_page(None, None),
+        f'SELECT {_SEASON_FILTERS}, 501 FROM "Seasons" ORDER BY season_id LIMIT 1',
+        (),
+    ),
+    (
+        "GET /matches?team_id",
+        _match_page(None, None),
+        'SELECT NULL::int, team_id, NULL::text, NULL::timestamp, NULL::timestamp, 501 FROM "Teams" ORDER BY team_id LIMIT 1',
+        (),
+    ),
+    (
+        "GET /matches?season_id&cursor (next page)",
+        _match_page(_ANY_DATETIME, NEXT),
+        f'''SELECT {_SEASON_FILTERS}, match_datetime, match_id, 501
+           FROM "Matches" WHERE match_datetime IS NOT NULL ORDER BY match_id LIMIT 1''',
+        (),
+    ),
+    (
+        "GET /matches?season_id&cursor (next page, undated cursor)",
+        _match_page(None, NEXT),
+        f'SELECT {_SEASON_FILTERS}, match_id, 501 FROM "Matches" ORDER BY match_id LIMIT 1',
+        (),
+    ),
+    (
+        "GET /matches?season_id&cursor (previous page)",
+        _match_page(_ANY_DATETIME, PREV),
+        f'''SELECT {_SEASON_FILTERS}, match_datetime, match_id, 501
+           FROM "Matches" WHERE match_datetime IS NOT NULL ORDER BY match_id LIMIT 1''',
+        (),
+    ),
+    (
+        "GET /matches?season_id&cursor (previous page, undated cursor)",
+        _match_page(None, PREV),
+        f'SELECT {_SEASON_FILTERS}, match_id, 501 FROM "Matches" ORDER BY match_id LIMIT 1',
+        (),
+    ),
+    ("GET /matches/{id}", "get_match", 'SELECT match_id FROM "Matches" ORDER BY match_id LIMIT 1', ()),
+    ("GET /seasons", "list_seasons", None, ("Seasons",)),
+    ("GET /seasons/{id}", "get_season", _FIRST_SEASON, ()),
+    ("GET /leagues/{id}/seasons", "list_league_seasons", 'SELECT league_id FROM "Leagues" ORDER BY league_id LIMIT 1', ()),
+    ("season exists check", "season_exists", _FIRST_SEASON, ()),
+    ("league exists check", "league_exists", 'SELECT league_id FROM "Leagues" ORDER BY league_id LIMIT 1', ()),
+    ("GET /seasons/{id}/standings", "season_standings", _FIRST_SEASON, ()),
+]
+
+# routes whose queries arent in the registry, same tuple shape with the sql written out (or
+# imported, where the route builds it in a helper)
+OTHER_QUERIES = [
+    (
+        "GET /matches/{id}/sets",
+        """
+        SELECT set_id, match_id, set_number, home_team_score, away_team_score
+        FROM "Sets"
+        WHERE match_id = $1
+        ORDER BY set_number
+        """,
+        'SELECT match_id FROM "Matches" ORDER BY match_id LIMIT 1',
+        (),
+    ),
+    (
+        "GET /exports/seasons/{id}/matches",
+        """
+        SELECT m.match_id, m.match_datetime, ht.name, awt.name, s.sets
+        FROM "Matches" m
+        JOIN "Teams" ht ON ht.team_id = m.home_team_id
+        JOIN "Teams" awt ON awt.team_id = m.away_team_id
+        LEFT JOIN LATERAL (
+            SELECT json_agg(set_number ORDER BY set_number) AS sets
+            FROM "Sets"
+            WHERE match_id = m.match_id
+        ) s ON true
+        WHERE m.season_id = $1
+        ORDER BY m.season_id, m.match_datetime NULLS LAST, m.match_id
+        """,
+        'SELECT season_id FROM "Seasons" ORDER BY season_id LIMIT 1',
+        ("Teams",),
+    ),
+    (
+        "GET /seasons/{id}/teams",
+        """
+        SELECT st.season_id, st.team_id, t.name as team_name, st.join_date
+        FROM "SeasonTeams" st
+        JOIN "Teams" t ON st.team_id = t.team_id
+        WHERE st.season_id = $1
+        ORDER BY st.join_date
+        """,
+        'SELECT season_id FROM "Seasons" ORDER BY season_id LIMIT 1',
+        (),
+    ),
+    (
+        "GET /seasons/{id}/standings?as_of",
+        STANDINGS_AS_OF_QUERY,
+        'SELECT season_id, now()::timestamp FROM "Seasons" ORDER BY season_id LIMIT 1',
+        (),
+    ),
+    ("GET /seasons/{id}/standings/timeline", STANDINGS_TIMELINE_QUERY, _FIRST_SEASON, ()),
+    (
+        "GET /seasons/{id}/standings?archived=true",
+        """
+        SELECT a.season_id, a.team_id, t.name as team_name, a.final_position as position
+        FROM "ArchivedStandings" a
+        JOIN "Teams" t ON a.team_id = t.team_id
+        WHERE a.season_id = $1
+        ORDER BY a.final_position ASC
+        """,
+        'SELECT season_id FROM "Seasons" ORDER BY season_id LIMIT 1',
+        (),
+    ),
+    (
+        "recalculate-standings (fetch_finished_matches)",
+        """
+        SELECT m.match_id, m.season_id, m.home_team_id, m.away_team_id,
+               m.winner_team_id, m.home_sets_won, m.away_sets_won, m.status,
+               COALESCE(SUM(s.home_team_score), 0) AS home_points,
+               COALESCE(SUM(s.away_team_score), 0) AS away_points
+        FROM "Matches" m
+        LEFT JOIN "Sets" s ON s.match_id = m.match_id
+        WHERE m.season_id = $1 AND m.status = 'FINISHED'
+        GROUP BY m.match_id
+        ORDER BY m.match_datetime
+        """,
+        'SELECT season_id FROM "Seasons" ORDER BY season_id LIMIT 1',
+        (),
+    ),
+    (
+        "GET /teams/{id}/members",
+        """
+        SELECT tm.team_id, tm.user_id, tm.role_in_team, tm.player_number, tm.is_captain,
+               tm.is_libero, u.username, u.email, u.full_name, u.role as user_role
+        FROM "TeamMembers" tm
+        JOIN "Users" u ON tm.user_id = u.user_id
+        WHERE tm.team_id = $1
+        ORDER BY tm.is_captain DESC, tm.player_number ASC
+        """,
+        'SELECT team_id FROM "Teams" ORDER BY team_id LIMIT 1',
+        (),
+    ),
+    (
+        "GET /teams/invitations/sent",
+        """
+        SELECT jr.join_request_id, jr.status, jr.created_at, t.name as team_name,
+               u.username, inv.username as invited_by_username
+        FROM "TeamJoinRequests" jr
+        JOIN "Teams" t ON jr.team_id = t.team_id
+        JOIN "Users" u ON jr.user_id = u.user_id
+        JOIN "Users" inv ON jr.invited_by_user_id = inv.user_id
+        WHERE jr.invited_by_user_id = $1
+        ORDER BY jr.created_at DESC
+        """,
+        'SELECT user_id FROM "Users" WHERE role = \'COACH\' ORDER BY user_id LIMIT 1',
+        (),
+    ),
+    (
+        "GET /teams/invitations/received",
+        """
+        SELECT jr.join_request_id, jr.status, jr.created_at, t.name as team_name,
+               u.username, inv.username as invited_by_username
+        FROM "TeamJoinRequests" jr
+        JOIN "Teams" t ON jr.team_id = t.team_id
+        JOIN "Users" u ON jr.user_id = u.user_id
+        JOIN "Users" inv ON jr.invited_by_user_id = inv.user_id
+        WHERE jr.user_id = $1
+        ORDER BY jr.created_at DESC
+        """,
+        'SELECT user_id FROM "Users" WHERE role = \'PLAYER\' ORDER BY user_id LIMIT 1',
+        (),
+    ),
+    (
+        "GET /leagues/invitations/sent",
+        """
+        SELECT ljr.join_request_id, ljr.status, ljr.created_at,
+               l.name as league_name, s.name as season_name, t.name as team_name,
+               u.username as invited_by_username
+        FROM "LeagueJoinRequests" ljr
+        JOIN "Leagues" l ON ljr.league_id = l.league_id
+        JOIN "Seasons" s ON ljr.season_id = s.season_id
+        JOIN "Teams" t ON ljr.team_id = t.team_id
+        JOIN "Users" u ON ljr.invited_by_user_id = u.user_id
+        WHERE ljr.invited_by_user_id = $1
+        ORDER BY ljr.created_at DESC
+        """,
+        'SELECT user_id FROM "Users" WHERE role = \'ADMIN\' ORDER BY user_id LIMIT 1',
+        (),
+    ),
+    (
+        "GET /leagues/invitations/received",
+        """
+        SELECT ljr.join_request_id, ljr.status, ljr.created_at,
+               l.name as league_name, s.name as season_name, t.name as team_name,
+               u.username as invited_by_username
+        FROM "LeagueJoinRequests" ljr
+        JOIN "Leagues" l ON ljr.league_id = l.league_id
+        JOIN "Seasons" s ON ljr.season_id = s.season_id
+        JOIN "Teams" t ON ljr.team_id = t.team_id
+        JOIN "Users" u ON ljr.invited_by_user_id = u.user_id
+        WHERE t.created_by_user_id = $1
+        ORDER BY ljr.created_at DESC
+        """,
+        'SELECT user_id FROM "Users" WHERE role = \'COACH\' ORDER BY user_id LIMIT 1',
+        (),
+    ),
+    (
+        "POST /login",
+        """
+        SELECT user_id, username, hashed_password, email, full_name, role
+        FROM "Users"
+        WHERE username = $1
+        """,
+        'SELECT username FROM "Users" ORDER BY user_id LIMIT 1',
+        (),
+    ),
+    (
+        "GET /leagues",
+        """
+        SELECT league_id, name, admin_user_id, description, rules, created_at
+        FROM "Leagues"
+        ORDER BY name
+        """,
+        None,
+        ("Leagues",),
+    ),
+]
+
+ROUTE_QUERIES = [
+    (route, QUERIES[name], params_sql, full_scan_ok)
+    for route, name, params_sql, full_scan_ok in REGISTRY_CHECKS
+] + OTHER_QUERIES
+
+
+def unchecked_statements():
+    """Registry statements with no REGISTRY_CHECKS entry, they would silently go unexplained."""
+    return sorted(set(QUERIES) - {name for _, name, _, _ in REGISTRY_CHECKS})
+
+
+def _connection_params() -> dict:
+    connection_params = {
+        "host": os.environ.get("PGHOST", "localhost"),
+        "port": int(os.environ.get("PGPORT", 5432)),
+        "user": os.environ.get("PGUSER", "postgres"),
+        "password": os.environ.get("PGPASSWORD"),
+        "database": os.environ.get("PGDATABASE", "antonidebicki"),
+    }
+    # Enable SSL only for encryption if requested
+    if os.environ.get("PGSSLMODE") == "require":
+        connection_params["ssl"] = True
+    return connection_params
+
+
+def seq_scans(plan: dict):
+    """Relation names of every Seq Scan node in a plan tree."""
+    found = []
+    if plan.get("Node Type") == "Seq Scan":
+        found.append(plan.get("Relation Name"))
+    for child in plan.get("Plans", []):
+        found.extend(seq_scans(child))
+    return found
+
+
+async def explain(conn: asyncpg.Connection, sql: str, params, natural: bool) -> dict:
+    tr = conn.transaction()
+    await tr.start()
+    try:
+        if not natural:
+            await conn.execute("SET LOCAL enable_seqscan = off")
+        result = await conn.fetchval(f"EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) {sql}", *params)
+    finally:
+        await tr.rollback()
+    return (json.loads(result) if isinstance(result, str) else result)[0]
+
+
+async def main():
+    natural = "--natural" in sys.argv[1:]
+    verbose = "--verbose" in sys.argv[1:]
+
+    missing = unchecked_statements()
+    if missing:
+        print(f"✗ No REGISTRY_CHECKS entry for: {', '.join(missing)}")
+        sys.exit(1)
+
+    connection_params = _connection_params()
+    print(f"Connecting to database: {connection_params['database']} at {connection_params['host']}:{connection_params['port']}")
+    conn = await asyncpg.connect(**connection_params)
+
+    flagged = 0
+    try:
+        print(f"enable_seqscan = {'on (planner choice)' if natural else 'off (index usability check)'}\n")
+        for route, sql, params_sql, full_scan_ok in ROUTE_QUERIES:
+            params = []
+            if params_sql:
+                row = await conn.fetchrow(params_sql)
+                if row is None:
+                    print(f"  -      {route}: no seeded data to pick parameters from, skipped")
+                    continue
+                params = list(row.values())
+
+            result = await explain(conn, sql, params, natural)
+            plan = result["Plan"]
+            scans = [table for table in seq_scans(plan) if table not in full_scan_ok]
+            buffers = plan.get("Shared Hit Blocks", 0) + plan.get("Shared Read Blocks", 0)
+            marker = "✗ SEQ " if scans else "✓     "
+            print(f"  {marker} {route}: {result['Execution Time']:.2f}ms, {buffers} buffers"
+                  + (f"  <- Seq Scan on {', '.join(scans)}" if scans else ""))
+            if verbose:
+                print(json.dumps(plan, indent=2))
+            flagged += bool(scans)
+    finally:
+        await conn.close()
+
+    if flagged:
+        print(f"\n✗ {flagged} route quer{'y' if flagged == 1 else 'ies'} still sequentially scan a table")
+        sys.exit(1)
+    print("\n✓ No unexpected sequential scans")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
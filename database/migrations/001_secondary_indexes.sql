@@ -0,0 +1,31 @@
+-- 001: secondary indexes for the WHERE / ORDER BY clauses used in api/routes and api/services.
+-- every index is IF NOT EXISTS so this is safe on a database built from the current schema.sql
+-- (which already has them) as well as an older one.
+
+-- list_matches: season filter + ORDER BY match_datetime DESC, and the no filter listing
+CREATE INDEX IF NOT EXISTS idx_matches_season_datetime ON "Matches"(season_id, match_datetime DESC);
+CREATE INDEX IF NOT EXISTS idx_matches_datetime ON "Matches"(match_datetime DESC);
+-- list_matches team filter (home_team_id = $1 OR away_team_id = $1) -> BitmapOr of these two
+CREATE INDEX IF NOT EXISTS idx_matches_home_team_datetime ON "Matches"(home_team_id, match_datetime DESC);
+CREATE INDEX IF NOT EXISTS idx_matches_away_team_datetime ON "Matches"(away_team_id, match_datetime DESC);
+-- fetch_finished_matches / recalculate: only the finished matches of a season
+CREATE INDEX IF NOT EXISTS idx_matches_season_finished ON "Matches"(season_id, match_datetime)
+  WHERE status = 'FINISHED';
+
+-- team invitations: received (user_id), sent (invited_by_user_id), both newest first
+CREATE INDEX IF NOT EXISTS idx_team_join_requests_user ON "TeamJoinRequests"(user_id, created_at DESC);
+CREATE INDEX IF NOT EXISTS idx_team_join_requests_invited_by ON "TeamJoinRequests"(invited_by_user_id, created_at DESC);
+
+-- league invitations: sent (invited_by_user_id), received (by team, via Teams.created_by_user_id)
+CREATE INDEX IF NOT EXISTS idx_league_join_requests_invited_by ON "LeagueJoinRequests"(invited_by_user_id, created_at DESC);
+CREATE INDEX IF NOT EXISTS idx_league_join_requests_team ON "LeagueJoinRequests"(team_id, created_at DESC);
+CREATE INDEX IF NOT EXISTS idx_teams_created_by ON "Teams"(created_by_user_id);
+
+-- list_league_seasons: WHERE league_id ORDER BY start_date DESC
+CREATE INDEX IF NOT EXISTS idx_seasons_league_start ON "Seasons"(league_id, start_date DESC);
+
+-- get_season_standings?archived=true: WHERE season_id ORDER BY final_position
+CREATE INDEX IF NOT EXISTS idx_archived_standings_season_position ON "ArchivedStandings"(season_id, final_position);
+
+-- FK side of user deletes / team membership lookups by user
+CREATE INDEX IF NOT EXISTS idx_team_members_user ON "TeamMembers"(user_id);
@@ -0,0 +1,8 @@
+-- 002: list_matches is keyset paginated on (match_datetime DESC, match_id DESC). add match_id
+-- to the two listing indexes so the row comparison and the tie break are both served by the
+-- index instead of a sort over every match with the same datetime.
+
+DROP INDEX IF EXISTS idx_matches_season_datetime;
+DROP INDEX IF EXISTS idx_matches_datetime;
+CREATE INDEX IF NOT EXISTS idx_matches_season_datetime_id ON "Matches"(season_id, match_datetime DESC, match_id DESC);
+CREATE INDEX IF NOT EXISTS idx_matches_datetime_id ON "Matches"(match_datetime DESC, match_id DESC);
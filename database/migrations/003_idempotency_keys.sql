@@ -0,0 +1,17 @@
+-- 003: Idempotency-Key support for the match processing endpoints. the first request with a key
+-- stores its response here in the same transaction as the work it did, a retry with the same key
+-- gets that response back instead of processing the match again.
+
+CREATE TABLE IF NOT EXISTS "IdempotencyKeys" (
+  user_id INT NOT NULL,
+  scope VARCHAR(100) NOT NULL,
+  idempotency_key VARCHAR(255) NOT NULL,
+  request_fingerprint TEXT NOT NULL,
+  response JSONB,
+  created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+  PRIMARY KEY (user_id, scope, idempotency_key),
+  FOREIGN KEY (user_id) REFERENCES "Users"(user_id) ON DELETE CASCADE
+);
+
+-- purging old keys: DELETE FROM "IdempotencyKeys" WHERE created_at < ...
+CREATE INDEX IF NOT EXISTS idx_idempotency_keys_created ON "IdempotencyKeys"(created_at);
@@ -0,0 +1,70 @@
+-- 004: append only log of what each processed match added to each team's standing.
+-- LeagueStandings stays the running total; a correction retracts one match by appending the
+-- negated rows instead of rebuilding the whole season, and standings at any point in time are
+-- a SUM over the log up to that match_datetime.
+
+CREATE TABLE IF NOT EXISTS "StandingDeltas" (
+  delta_id BIGSERIAL PRIMARY KEY,
+  season_id INT NOT NULL,
+  match_id INT NOT NULL,
+  team_id INT NOT NULL,
+  match_datetime TIMESTAMP,
+  kind VARCHAR(10) NOT NULL CHECK (kind IN ('APPLY', 'RETRACT')),
+  matches_played INT NOT NULL,
+  wins INT NOT NULL,
+  losses INT NOT NULL,
+  sets_won INT NOT NULL,
+  sets_lost INT NOT NULL,
+  points_won INT NOT NULL,
+  points_lost INT NOT NULL,
+  league_points INT NOT NULL,
+  recorded_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+  FOREIGN KEY (season_id) REFERENCES "Seasons"(season_id) ON DELETE CASCADE,
+  FOREIGN KEY (match_id) REFERENCES "Matches"(match_id) ON DELETE CASCADE,
+  FOREIGN KEY (team_id) REFERENCES "Teams"(team_id) ON DELETE CASCADE
+);
+
+CREATE INDEX IF NOT EXISTS idx_standing_deltas_season_datetime ON "StandingDeltas"(season_id, match_datetime, delta_id);
+CREATE INDEX IF NOT EXISTS idx_standing_deltas_match ON "StandingDeltas"(match_id);
+
+CREATE OR REPLACE FUNCTION forbid_standing_delta_update()
+RETURNS TRIGGER AS $$
+BEGIN
+  RAISE EXCEPTION 'StandingDeltas rows are immutable, append a RETRACT row instead';
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trg_standing_deltas_immutable ON "StandingDeltas";
+CREATE TRIGGER trg_standing_deltas_immutable
+BEFORE UPDATE ON "StandingDeltas"
+FOR EACH ROW
+EXECUTE FUNCTION forbid_standing_delta_update();
+
+-- backfill: one APPLY row per team for every match already PROCESSED, same arithmetic as match_outcome
+-- (3 league points for a win). skipped for matches that already have log rows so a rerun is harmless
+WITH processed AS (
+  SELECT m.match_id, m.season_id, m.match_datetime, m.home_team_id, m.away_team_id,
+         m.winner_team_id, m.home_sets_won, m.away_sets_won,
+         COALESCE(SUM(s.home_team_score), 0) AS home_points,
+         COALESCE(SUM(s.away_team_score), 0) AS away_points
+  FROM "Matches" m
+  LEFT JOIN "Sets" s ON s.match_id = m.match_id
+  WHERE m.status = 'PROCESSED'
+    AND m.winner_team_id IS NOT NULL
+    AND NOT EXISTS (SELECT 1 FROM "StandingDeltas" d WHERE d.match_id = m.match_id)
+  GROUP BY m.match_id
+)
+INSERT INTO "StandingDeltas"
+(season_id, match_id, team_id, match_datetime, kind, matches_played, wins, losses,
+ sets_won, sets_lost, points_won, points_lost, league_points)
+SELECT season_id, match_id, home_team_id, match_datetime, 'APPLY', 1,
+       (winner_team_id = home_team_id)::int, (winner_team_id <> home_team_id)::int,
+       home_sets_won, away_sets_won, home_points, away_points,
+       CASE WHEN winner_team_id = home_team_id THEN 3 ELSE 0 END
+FROM processed
+UNION ALL
+SELECT season_id, match_id, away_team_id, match_datetime, 'APPLY', 1,
+       (winner_team_id = away_team_id)::int, (winner_team_id <> away_team_id)::int,
+       away_sets_won, home_sets_won, away_points, home_points,
+       CASE WHEN winner_team_id = away_team_id THEN 3 ELSE 0 END
+FROM processed;
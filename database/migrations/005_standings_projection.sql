@@ -0,0 +1,50 @@
+-- 005: ranked read model for the standings endpoint, kept in step with "LeagueStandings" by
+-- refresh_standings_projection. a database from before it has no table, and the app prepares
+-- the season_standings query on every pool connection, so it wont start until this has run.
+
+CREATE TABLE IF NOT EXISTS "StandingsProjection" (
+  season_id INT NOT NULL,
+  position INT NOT NULL,
+  standing_id INT NOT NULL,
+  team_id INT NOT NULL,
+  team_name VARCHAR(255) NOT NULL,
+  matches_played INT NOT NULL,
+  wins INT NOT NULL,
+  losses INT NOT NULL,
+  sets_won INT NOT NULL,
+  sets_lost INT NOT NULL,
+  set_diff INT NOT NULL,
+  points_won INT NOT NULL,
+  points_lost INT NOT NULL,
+  point_diff INT NOT NULL,
+  league_points INT NOT NULL,
+  refreshed_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+  PRIMARY KEY (season_id, position),
+  FOREIGN KEY (season_id) REFERENCES "Seasons"(season_id) ON DELETE CASCADE,
+  FOREIGN KEY (team_id) REFERENCES "Teams"(team_id) ON DELETE CASCADE
+);
+
+CREATE INDEX IF NOT EXISTS idx_standings_projection_team ON "StandingsProjection"(team_id);
+
+-- backfill every season from the current totals, ranked exactly like refresh_standings_projection.
+-- the projection is derived data, so rebuilding it on a rerun is harmless
+DELETE FROM "StandingsProjection";
+
+INSERT INTO "StandingsProjection"
+(season_id, position, standing_id, team_id, team_name,
+ matches_played, wins, losses, sets_won, sets_lost, set_diff,
+ points_won, points_lost, point_diff, league_points)
+SELECT
+  ls.season_id,
+  ROW_NUMBER() OVER (
+    PARTITION BY ls.season_id
+    ORDER BY ls.league_points DESC, (ls.sets_won - ls.sets_lost) DESC,
+             (ls.points_won - ls.points_lost) DESC, ls.team_id
+  ),
+  ls.standing_id,
+  ls.team_id,
+  t.name,
+  ls.matches_played, ls.wins, ls.losses, ls.sets_won, ls.sets_lost, ls.sets_won - ls.sets_lost,
+  ls.points_won, ls.points_lost, ls.points_won - ls.points_lost, ls.league_points
+FROM "LeagueStandings" ls
+JOIN "Teams" t ON ls.team_id = t.team_id;
@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+Apply the versioned migrations in database/migrations to an existing database.
+
+Each NNN_name.sql file runs once, in filename order, inside its own transaction, and is
+recorded in "SchemaMigrations". A database built from schema.sql starts with every
+migration that schema.sql already contains marked as applied.
+
+Usage:
+  PGUSER=postgres PGPASSWORD=secret python database/run_migrations.py
+  python database/run_migrations.py --list     # show applied / pending without running anything
+
+The script respects the standard PG* environment variables, with sensible local defaults.
+"""
+
+import os
+import sys
+from pathlib import Path
+import asyncpg
+import asyncio
+
+
+MIGRATIONS_DIR = Path(__file__).parent / "migrations"
+
+
+def _connection_params() -> dict:
+    connection_params = {
+        "host": os.environ.get("PGHOST", "localhost"),
+        "port": int(os.environ.get("PGPORT", 5432)),
+        "user": os.environ.get("PGUSER", "postgres"),
+        "password": os.environ.get("PGPASSWORD"),
+        "database": os.environ.get("PGDATABASE", "antonidebicki"),
+    }
+    # Enable SSL only for encryption if requested
+    if os.environ.get("PGSSLMODE") == "require":
+        connection_params["ssl"] = True
+    return connection_params
+
+
+def migration_files():
+    """(version, path) for every migration, version is the filename without .sql"""
+    return [(path.stem, path) for path in sorted(MIGRATIONS_DIR.glob("[0-9][0-9][0-9]_*.sql"))]
+
+
+async def main():
+    list_only = "--list" in sys.argv[1:]
+    connection_params = _connection_params()
+    print(f"Connecting to database: {connection_params['database']} at {connection_params['host']}:{connection_params['port']}")
+    conn = await asyncpg.connect(**connection_params)
+
+    try:
+        await conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS "SchemaMigrations" (
+              version VARCHAR(255) PRIMARY KEY,
+              applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+            """
+        )
+        applied = {row["version"] for row in await conn.fetch('SELECT version FROM "SchemaMigrations"')}
+
+        pending = [(version, path) for version, path in migration_files() if version not in applied]
+        for version, _ in migration_files():
+            print(f"  {'applied' if version in applied else 'pending'}  {version}")
+        if list_only:
+            return
+        if not pending:
+            print("✓ Database is up to date")
+            return
+
+        for version, path in pending:
+            sql = path.read_text(encoding="utf-8")
+            try:
+                async with conn.transaction():
+                    await conn.execute(sql)
+                    await conn.execute('INSERT INTO "SchemaMigrations" (version) VALUES ($1)', version)
+            except Exception as e:
+                print(f"✗ Migration {version} failed, rolled back: {e}", file=sys.stderr)
+                sys.exit(1)
+            print(f"✓ Applied {version}")
+    finally:
+        await conn.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -1,6 +1,10 @@
+DROP TABLE IF EXISTS "SchemaMigrations" CASCADE;
+DROP TABLE IF EXISTS "IdempotencyKeys" CASCADE;
 DROP TABLE IF EXISTS "Payments" CASCADE;
 DROP TABLE IF EXISTS "InvitationCodes" CASCADE;
 DROP TABLE IF EXISTS "ArchivedStandings" CASCADE;
+DROP TABLE IF EXISTS "StandingDeltas" CASCADE;
+DROP TABLE IF EXISTS "StandingsProjection" CASCADE;
 DROP TABLE IF EXISTS "LeagueStandings" CASCADE;
 DROP TABLE IF EXISTS "Substitutions" CASCADE;
 DROP TABLE IF EXISTS "Timeouts" CASCADE;
@@ -206,6 +210,59 @@ CREATE TABLE "LeagueStandings" (
   UNIQUE (season_id, team_id)
 );
 
+-- read model for the standings page, rebuilt from LeagueStandings by refresh_standings_projection,
+-- see database/migrations/005_standings_projection.sql
+-- position, diffs and team_name are stored so a read is just a range scan on the primary key
+CREATE TABLE "StandingsProjection" (
+  season_id INT NOT NULL,
+  position INT NOT NULL,
+  standing_id INT NOT NULL,
+  team_id INT NOT NULL,
+  team_name VARCHAR(255) NOT NULL,
+  matches_played INT NOT NULL,
+  wins INT NOT NULL,
+  losses INT NOT NULL,
+  sets_won INT NOT NULL,
+  sets_lost INT NOT NULL,
+  set_diff INT NOT NULL,
+  points_won INT NOT NULL,
+  points_lost INT NOT NULL,
+  point_diff INT NOT NULL,
+  league_points INT NOT NULL,
+  refreshed_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+  PRIMARY KEY (season_id, position),
+  FOREIGN KEY (season_id) REFERENCES "Seasons"(season_id) ON DELETE CASCADE,
+  FOREIGN KEY (team_id) REFERENCES "Teams"(team_id) ON DELETE CASCADE
+);
+
+CREATE INDEX idx_standings_projection_team ON "StandingsProjection"(team_id);
+
+-- append only log of what each processed match added to each team, see database/migrations/004_standing_deltas.sql.
+-- a correction appends RETRACT rows (the negated APPLY) rather than touching old rows
+CREATE TABLE "StandingDeltas" (
+  delta_id BIGSERIAL PRIMARY KEY,
+  season_id INT NOT NULL,
+  match_id INT NOT NULL,
+  team_id INT NOT NULL,
+  match_datetime TIMESTAMP,
+  kind VARCHAR(10) NOT NULL CHECK (kind IN ('APPLY', 'RETRACT')),
+  matches_played INT NOT NULL,
+  wins INT NOT NULL,
+  losses INT NOT NULL,
+  sets_won INT NOT NULL,
+  sets_lost INT NOT NULL,
+  points_won INT NOT NULL,
+  points_lost INT NOT NULL,
+  league_points INT NOT NULL,
+  recorded_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+  FOREIGN KEY (season_id) REFERENCES "Seasons"(season_id) ON DELETE CASCADE,
+  FOREIGN KEY (match_id) REFERENCES "Matches"(match_id) ON DELETE CASCADE,
+  FOREIGN KEY (team_id) REFERENCES "Teams"(team_id) ON DELETE CASCADE
+);
+
+CREATE INDEX idx_standing_deltas_season_datetime ON "StandingDeltas"(season_id, match_datetime, delta_id);
+CREATE INDEX idx_standing_deltas_match ON "StandingDeltas"(match_id);
+
 CREATE TABLE "ArchivedStandings" (
   archive_id SERIAL PRIMARY KEY,
   season_id INT NOT NULL,
@@ -258,6 +315,50 @@ CREATE TABLE "Payments" (
   )
 );
 
+-- secondary indexes for the route queries, kept in step with database/migrations/001_secondary_indexes.sql
+-- (season_)datetime indexes carry match_id for list_matches keyset pagination, see 002_match_keyset_indexes.sql
+CREATE INDEX idx_matches_season_datetime_id ON "Matches"(season_id, match_datetime DESC, match_id DESC);
+CREATE INDEX idx_matches_datetime_id ON "Matches"(match_datetime DESC, match_id DESC);
+CREATE INDEX idx_matches_home_team_datetime ON "Matches"(home_team_id, match_datetime DESC);
+CREATE INDEX idx_matches_away_team_datetime ON "Matches"(away_team_id, match_datetime DESC);
+CREATE INDEX idx_matches_season_finished ON "Matches"(season_id, match_datetime) WHERE status = 'FINISHED';
+CREATE INDEX idx_team_join_requests_user ON "TeamJoinRequests"(user_id, created_at DESC);
+CREATE INDEX idx_team_join_requests_invited_by ON "TeamJoinRequests"(invited_by_user_id, created_at DESC);
+CREATE INDEX idx_league_join_requests_invited_by ON "LeagueJoinRequests"(invited_by_user_id, created_at DESC);
+CREATE INDEX idx_league_join_requests_team ON "LeagueJoinRequests"(team_id, created_at DESC);
+CREATE INDEX idx_teams_created_by ON "Teams"(created_by_user_id);
+CREATE INDEX idx_seasons_league_start ON "Seasons"(league_id, start_date DESC);
+CREATE INDEX idx_archived_standings_season_position ON "ArchivedStandings"(season_id, final_position);
+CREATE INDEX idx_team_members_user ON "TeamMembers"(user_id);
+
+-- stored responses for Idempotency-Key retries, see database/migrations/003_idempotency_keys.sql
+CREATE TABLE "IdempotencyKeys" (
+  user_id INT NOT NULL,
+  scope VARCHAR(100) NOT NULL,
+  idempotency_key VARCHAR(255) NOT NULL,
+  request_fingerprint TEXT NOT NULL,
+  response JSONB,
+  created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+  PRIMARY KEY (user_id, scope, idempotency_key),
+  FOREIGN KEY (user_id) REFERENCES "Users"(user_id) ON DELETE CASCADE
+);
+
+CREATE INDEX idx_idempotency_keys_created ON "IdempotencyKeys"(created_at);
+
+-- which files in database/migrations have been applied (see database/run_migrations.py).
+-- a fresh schema already contains everything up to the versions inserted here
+CREATE TABLE "SchemaMigrations" (
+  version VARCHAR(255) PRIMARY KEY,
+  applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+INSERT INTO "SchemaMigrations" (version) VALUES
+  ('001_secondary_indexes'),
+  ('002_match_keyset_indexes'),
+  ('003_idempotency_keys'),
+  ('004_standing_deltas'),
+  ('005_standings_projection');
+
 CREATE OR REPLACE FUNCTION enforce_set_rules()
 RETURNS TRIGGER AS $$
 DECLARE
@@ -359,4 +460,16 @@ $$ LANGUAGE plpgsql;
 CREATE TRIGGER trg_matches_finalize_on_finish
 BEFORE UPDATE ON "Matches"
 FOR EACH ROW
-EXECUTE FUNCTION finalize_match_on_finish();
\ No newline at end of file
+EXECUTE FUNCTION finalize_match_on_finish();
+
+CREATE OR REPLACE FUNCTION forbid_standing_delta_update()
+RETURNS TRIGGER AS $$
+BEGIN
+  RAISE EXCEPTION 'StandingDeltas rows are immutable, append a RETRACT row instead';
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER trg_standing_deltas_immutable
+BEFORE UPDATE ON "StandingDeltas"
+FOR EACH ROW
+EXECUTE FUNCTION forbid_standing_delta_update();
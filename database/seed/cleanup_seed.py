@@ -100,10 +100,18 @@ async def cleanup_seed_data(skip_confirm: bool = False):
                 deleted = await connection.execute('DELETE FROM "SeasonTeams"')
                 print(f"✓ Deleted season team assignments")
                 
+                # Delete the standings delta log (references matches)
+                deleted = await connection.execute('DELETE FROM "StandingDeltas"')
+                print(f"✓ Deleted standings deltas")
+                
                 # Delete matches (if any exist)
                 deleted = await connection.execute('DELETE FROM "Matches"')
                 print(f"✓ Deleted matches")
                 
+                # Delete the standings projection (rebuilt from league standings)
+                deleted = await connection.execute('DELETE FROM "StandingsProjection"')
+                print(f"✓ Deleted standings projection")
+                
                 # Delete league standings (if any exist)
                 deleted = await connection.execute('DELETE FROM "LeagueStandings"')
                 print(f"✓ Deleted league standings")
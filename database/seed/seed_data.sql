@@ -19,8 +19,10 @@ BEGIN;
 -- ============================================================================
 
 -- Delete in correct order to respect foreign key constraints
+DELETE FROM "StandingDeltas";
 DELETE FROM "Sets" WHERE match_id IN (SELECT match_id FROM "Matches");
 DELETE FROM "Matches";
+DELETE FROM "StandingsProjection";
 DELETE FROM "LeagueStandings";
 DELETE FROM "ArchivedStandings";
 DELETE FROM "SeasonTeams";
@@ -883,6 +885,22 @@ WHERE s.name = '2025/26 Season'
   AND s.league_id = (SELECT league_id FROM "Leagues" WHERE name = 'North West Division')
 ON CONFLICT (season_id, team_id) DO NOTHING;
 
+-- Build the ranked standings projection the standings endpoint reads from
+INSERT INTO "StandingsProjection" (season_id, position, standing_id, team_id, team_name, matches_played, wins, losses, sets_won, sets_lost, set_diff, points_won, points_lost, point_diff, league_points)
+SELECT 
+    ls.season_id,
+    ROW_NUMBER() OVER (
+        PARTITION BY ls.season_id
+        ORDER BY ls.league_points DESC, (ls.sets_won - ls.sets_lost) DESC, (ls.points_won - ls.points_lost) DESC, ls.team_id
+    ),
+    ls.standing_id,
+    ls.team_id,
+    t.name,
+    ls.matches_played, ls.wins, ls.losses, ls.sets_won, ls.sets_lost, ls.sets_won - ls.sets_lost,
+    ls.points_won, ls.points_lost, ls.points_won - ls.points_lost, ls.league_points
+FROM "LeagueStandings" ls
+JOIN "Teams" t ON ls.team_id = t.team_id;
+
 COMMIT;
 
 -- ============================================================================